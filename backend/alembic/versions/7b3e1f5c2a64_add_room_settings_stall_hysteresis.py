@@ -0,0 +1,52 @@
+"""add room settings stall hysteresis
+
+Revision ID: 7b3e1f5c2a64
+Revises: 4c2d8b7e9a10
+Create Date: 2026-10-19 10:20:00.000000
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "7b3e1f5c2a64"
+down_revision: str | None = "4c2d8b7e9a10"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("room_settings", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "stall_min_duration_ms",
+                sa.Integer(),
+                server_default="500",
+                nullable=False,
+            )
+        )
+        batch_op.add_column(
+            sa.Column(
+                "ready_min_duration_ms",
+                sa.Integer(),
+                server_default="1000",
+                nullable=False,
+            )
+        )
+        batch_op.add_column(
+            sa.Column(
+                "stall_flap_penalty_ms",
+                sa.Integer(),
+                server_default="1000",
+                nullable=False,
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("room_settings", schema=None) as batch_op:
+        batch_op.drop_column("stall_flap_penalty_ms")
+        batch_op.drop_column("ready_min_duration_ms")
+        batch_op.drop_column("stall_min_duration_ms")
@@ -0,0 +1,112 @@
+"""add hot query composite indexes
+
+Revision ID: 9a4d6e2b7c15
+Revises: 7b3e1f5c2a64
+Create Date: 2026-10-19 12:30:00.000000
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+
+revision: str = "9a4d6e2b7c15"
+down_revision: str | None = "7b3e1f5c2a64"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("messages", schema=None) as batch_op:
+        batch_op.create_index("idx_messages_room_id_id", ["room_id", "id"], unique=False)
+        batch_op.drop_index("ix_messages_room_id")
+
+    with op.batch_alter_table("notifications", schema=None) as batch_op:
+        batch_op.create_index(
+            "idx_notifications_recipient_user_id_is_read",
+            ["recipient_user_id", "is_read"],
+            unique=False,
+        )
+        batch_op.create_index(
+            "idx_notifications_recipient_user_id_created_at",
+            ["recipient_user_id", "created_at"],
+            unique=False,
+        )
+        batch_op.drop_index("ix_notifications_recipient_user_id")
+
+    with op.batch_alter_table("user_emoji_usages", schema=None) as batch_op:
+        batch_op.create_index(
+            "idx_user_emoji_usages_user_id_provider_last_used_at",
+            ["user_id", "provider", "last_used_at"],
+            unique=False,
+        )
+        batch_op.drop_index("idx_user_emoji_usages_user_id_last_used_at")
+
+    with op.batch_alter_table("user_avatar_assets", schema=None) as batch_op:
+        batch_op.create_index(
+            "idx_user_avatar_assets_user_id_is_deleted_id",
+            ["user_id", "is_deleted", "id", "media_asset_id"],
+            unique=False,
+        )
+        batch_op.drop_index("ix_user_avatar_assets_user_id")
+
+    with op.batch_alter_table("media_assets", schema=None) as batch_op:
+        batch_op.create_index(
+            "idx_media_assets_asset_type_status_expires_at",
+            ["asset_type", "status", "expires_at"],
+            unique=False,
+        )
+
+    with op.batch_alter_table("room_members", schema=None) as batch_op:
+        batch_op.create_index("idx_room_members_user_id", ["user_id"], unique=False)
+        batch_op.create_index(
+            "idx_room_members_room_id_joined_at",
+            ["room_id", "joined_at", "user_id"],
+            unique=False,
+        )
+
+    with op.batch_alter_table("room_join_requests", schema=None) as batch_op:
+        batch_op.create_index(
+            "idx_room_join_requests_room_id_created_at",
+            ["room_id", "created_at"],
+            unique=False,
+        )
+        batch_op.drop_index("ix_room_join_requests_room_id")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("room_join_requests", schema=None) as batch_op:
+        batch_op.create_index("ix_room_join_requests_room_id", ["room_id"], unique=False)
+        batch_op.drop_index("idx_room_join_requests_room_id_created_at")
+
+    with op.batch_alter_table("room_members", schema=None) as batch_op:
+        batch_op.drop_index("idx_room_members_room_id_joined_at")
+        batch_op.drop_index("idx_room_members_user_id")
+
+    with op.batch_alter_table("media_assets", schema=None) as batch_op:
+        batch_op.drop_index("idx_media_assets_asset_type_status_expires_at")
+
+    with op.batch_alter_table("user_avatar_assets", schema=None) as batch_op:
+        batch_op.create_index("ix_user_avatar_assets_user_id", ["user_id"], unique=False)
+        batch_op.drop_index("idx_user_avatar_assets_user_id_is_deleted_id")
+
+    with op.batch_alter_table("user_emoji_usages", schema=None) as batch_op:
+        batch_op.create_index(
+            "idx_user_emoji_usages_user_id_last_used_at",
+            ["user_id", "last_used_at"],
+            unique=False,
+        )
+        batch_op.drop_index("idx_user_emoji_usages_user_id_provider_last_used_at")
+
+    with op.batch_alter_table("notifications", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_notifications_recipient_user_id",
+            ["recipient_user_id"],
+            unique=False,
+        )
+        batch_op.drop_index("idx_notifications_recipient_user_id_created_at")
+        batch_op.drop_index("idx_notifications_recipient_user_id_is_read")
+
+    with op.batch_alter_table("messages", schema=None) as batch_op:
+        batch_op.create_index("ix_messages_room_id", ["room_id"], unique=False)
+        batch_op.drop_index("idx_messages_room_id_id")
@@ -0,0 +1,53 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import PlainTextResponse
+
+from app.api.deps import get_realtime_manager, get_realtime_room_video_runtime_service
+from app.core.config import get_settings
+from app.core.error_reasons import ErrorReason
+from app.core.exceptions import UnauthorizedError
+from app.core.metrics import (
+    realtime_rooms_with_runtime,
+    registry,
+    ws_connections,
+    ws_subscriptions,
+)
+from app.realtime.manager import RealtimeManager
+from app.realtime.room_video_runtime import RoomVideoRuntimeService
+
+settings = get_settings()
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def require_metrics_token(authorization: str | None = Header(None)) -> None:
+    if not settings.metrics_token:
+        return
+    if authorization is None:
+        raise UnauthorizedError(
+            "Missing metrics token",
+            reason=ErrorReason.MISSING_AUTHORIZATION_TOKEN,
+        )
+    if not hmac.compare_digest(authorization, f"Bearer {settings.metrics_token}"):
+        raise UnauthorizedError("Invalid metrics token", reason=ErrorReason.INVALID_TOKEN)
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+    dependencies=[Depends(require_metrics_token)],
+)
+async def get_metrics(
+    manager: RealtimeManager = Depends(get_realtime_manager),
+    video_runtime_service: RoomVideoRuntimeService = Depends(get_realtime_room_video_runtime_service),
+) -> PlainTextResponse:
+    # 运行时类指标在抓取时读取当前快照，不在热路径上维护
+    ws_connections.set(manager.count_connections())
+    for channel_kind, count in manager.count_subscriptions_by_channel_kind().items():
+        ws_subscriptions.set(count, channel_kind=channel_kind)
+    realtime_rooms_with_runtime.set(video_runtime_service.count_rooms())
+
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, Query
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -6,6 +8,7 @@ from app.core.database import get_db
 from app.core.error_reasons import ErrorReason
 from app.core.exceptions import NotFoundError
 from app.modules.media.constants import MediaAssetType
+from app.modules.media.models import MediaAsset
 from app.modules.media.repository import MediaRepository
 from app.modules.media.service import MediaService
 
@@ -15,11 +18,31 @@ repo = MediaRepository()
 media_service = MediaService()
 
 
+async def _find_variant_file(*, asset: MediaAsset, source: Path, width: int) -> Path | None:
+    derivatives = media_service.storage.derivatives
+    variant_width = derivatives.pick_width(
+        requested_width=width,
+        mime_type=asset.mime_type,
+        original_width=asset.width,
+    )
+    if variant_width is None:
+        return None
+
+    # 首次请求时在进程池中生成并缓存到磁盘，生成失败则退回原图
+    return await derivatives.get_or_render_variant(
+        source=source,
+        asset_type=asset.asset_type,
+        storage_key=asset.storage_key,
+        width=variant_width,
+    )
+
+
 async def _serve_media_file(
     *,
     db: AsyncSession,
     asset_type: str,
     storage_key: str,
+    width: int | None = None,
 ) -> FileResponse:
     asset = await repo.find_media_asset_by_type_and_storage_key(
         db,
@@ -56,6 +79,11 @@ async def _serve_media_file(
             details={"asset_type": asset.asset_type, "asset_id": asset.id},
         )
 
+    if width is not None:
+        variant_path = await _find_variant_file(asset=asset, source=path, width=width)
+        if variant_path is not None:
+            return FileResponse(str(variant_path), media_type="image/webp")
+
     return FileResponse(
         str(path),
         media_type=asset.mime_type,
@@ -65,34 +93,40 @@ async def _serve_media_file(
 @router.get("/avatar/{storage_key}")
 async def get_avatar_file(
     storage_key: str,
+    w: int | None = Query(default=None, ge=1, le=4096),
     db: AsyncSession = Depends(get_db),
 ):
     return await _serve_media_file(
         db=db,
         asset_type=MediaAssetType.AVATAR,
         storage_key=storage_key,
+        width=w,
     )
 
 
 @router.get("/image/{storage_key}")
 async def get_image_file(
     storage_key: str,
+    w: int | None = Query(default=None, ge=1, le=4096),
     db: AsyncSession = Depends(get_db),
 ):
     return await _serve_media_file(
         db=db,
         asset_type=MediaAssetType.IMAGE,
         storage_key=storage_key,
+        width=w,
     )
 
 
 @router.get("/sticker/{storage_key}")
 async def get_sticker_file(
     storage_key: str,
+    w: int | None = Query(default=None, ge=1, le=4096),
     db: AsyncSession = Depends(get_db),
 ):
     return await _serve_media_file(
         db=db,
         asset_type=MediaAssetType.STICKER,
         storage_key=storage_key,
+        width=w,
     )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, File, Query, UploadFile
+from fastapi import APIRouter, Depends, File, Query, Request, Response, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
@@ -54,6 +54,8 @@ async def upload_image(
         url=media_service.get_media_asset_url(asset),
         mime_type=asset.mime_type,
         file_size=asset.file_size,
+        width=asset.width,
+        height=asset.height,
         status=asset.status,
     )
 
@@ -75,6 +77,8 @@ async def upload_sticker(
         url=media_service.get_media_asset_url(asset),
         mime_type=asset.mime_type,
         file_size=asset.file_size,
+        width=asset.width,
+        height=asset.height,
         status=asset.status,
     )
 
@@ -177,12 +181,20 @@ async def update_user_sticker_library(
     return {"message": "ok"}
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
 @router.get("/emojis", response_model=EmojiListResponse)
-async def get_emojis() -> EmojiListResponse:
-    items = await media_service.get_visible_emojis()
-    return EmojiListResponse(
-        items=[EmojiResponse(**item) for item in items],
-    )
+async def get_emojis(request: Request) -> Response:
+    body, etag = await media_service.get_encoded_visible_emojis()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/emojis/recent", response_model=EmojiListResponse)
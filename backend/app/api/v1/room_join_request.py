@@ -13,12 +13,16 @@ from app.modules.rooms.join_request.schemas import (
     RoomJoinRequestResponse,
 )
 from app.modules.rooms.join_request.service import RoomJoinRequestService
+from app.modules.rooms.membership.schemas import RoomMemberResponse
+from app.modules.rooms.membership.service import RoomMembershipService
 from app.modules.users.models import User
+from app.realtime.constants import RoomMembersChangeType
 from app.realtime.publisher import RealtimePublisher
 
 router = APIRouter(prefix="/join-requests", tags=["join-requests"])
 
 join_request_service = RoomJoinRequestService()
+membership_service = RoomMembershipService()
 
 
 @router.get("", response_model=RoomJoinRequestListResponse)
@@ -80,7 +84,17 @@ async def approve_join_request(
         user=current_user,
     )
     if request.status == RoomJoinRequestStatus.APPROVED:
-        await publisher.publish_room_members(room_id=request.room_id)
+        member = await membership_service.find_room_member(
+            db,
+            room_id=request.room_id,
+            user_id=request.target_user_id,
+        )
+        await publisher.publish_room_members(
+            room_id=request.room_id,
+            change_type=RoomMembersChangeType.ADDED,
+            user_id=request.target_user_id,
+            member=RoomMemberResponse.model_validate(member) if member is not None else None,
+        )
     return RoomJoinRequestResponse.model_validate(request)
 
 
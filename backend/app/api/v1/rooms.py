@@ -39,7 +39,7 @@ from app.modules.rooms.settings.service import RoomSettingsService
 from app.modules.rooms.room.service import RoomService
 from app.modules.rooms.permissions import has_room_permission
 from app.modules.users.models import User
-from app.realtime.constants import SessionCloseReason
+from app.realtime.constants import RoomMembersChangeType, SessionCloseReason
 from app.realtime.manager import RealtimeManager
 from app.realtime.publisher import RealtimePublisher
 from app.realtime.rest_sync import close_room_sessions, close_room_user_session
@@ -119,8 +119,9 @@ async def patch_room(
         user=current_user,
         payload=payload,
     )
-    await publisher.publish_room_info(room_id=room_id)
-    return RoomResponse.model_validate(room)
+    response = RoomResponse.model_validate(room)
+    await publisher.publish_room_info(room=response)
+    return response
 
 
 @router.get("/{room_id}/settings", response_model=RoomSettingsResponse)
@@ -151,8 +152,9 @@ async def patch_room_settings(
         user=current_user,
         payload=payload,
     )
-    await publisher.publish_room_settings(room_id=room_id)
-    return RoomSettingsResponse.model_validate(settings)
+    response = RoomSettingsResponse.model_validate(settings)
+    await publisher.publish_room_settings(room_settings=response)
+    return response
 
 
 @router.delete("/{room_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -174,6 +176,7 @@ async def delete_room(
         room_id=room_id,
         reason=SessionCloseReason.ROOM_DELETED,
     )
+    publisher.clear_room_version(room_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -240,18 +243,26 @@ async def apply_room_join_request(
         user=current_user,
     )
     if request is None:
-        await publisher.publish_room_members(room_id=room_id)
+        member = await membership_service.find_room_member(
+            db,
+            room_id=room_id,
+            user_id=current_user.id,
+        )
+        await publisher.publish_room_members(
+            room_id=room_id,
+            change_type=RoomMembersChangeType.ADDED,
+            user_id=current_user.id,
+            member=RoomMemberResponse.model_validate(member) if member is not None else None,
+        )
         return
 
     reviewer_user_ids = await membership_service.get_room_user_ids_by_permission(
         db,
         room_id=room_id,
         permission=RoomPermission.REVIEW_JOIN_REQUEST,
+        exclude_user_id=current_user.id,
     )
-    for reviewer_user_id in reviewer_user_ids:
-        if reviewer_user_id == current_user.id:
-            continue
-        await publisher.publish_notification(user_id=reviewer_user_id)
+    await publisher.publish_notifications(user_ids=reviewer_user_ids)
 
 
 @router.post(
@@ -271,7 +282,7 @@ async def invite_room_join_request(
         target_user_id=payload.target_user_id,
         user=current_user,
     )
-    await publisher.publish_notification(user_id=payload.target_user_id)
+    notified_user_ids = [payload.target_user_id]
 
     role = await membership_service.find_room_role(
         db,
@@ -282,18 +293,17 @@ async def invite_room_join_request(
         role is not None
         and has_room_permission(role=role, permission=RoomPermission.REVIEW_JOIN_REQUEST)
     )
-    if can_review:
-        return
+    if not can_review:
+        notified_user_ids.extend(
+            await membership_service.get_room_user_ids_by_permission(
+                db,
+                room_id=room_id,
+                permission=RoomPermission.REVIEW_JOIN_REQUEST,
+                exclude_user_id=current_user.id,
+            )
+        )
 
-    reviewer_user_ids = await membership_service.get_room_user_ids_by_permission(
-        db,
-        room_id=room_id,
-        permission=RoomPermission.REVIEW_JOIN_REQUEST,
-    )
-    for reviewer_user_id in reviewer_user_ids:
-        if reviewer_user_id == current_user.id:
-            continue
-        await publisher.publish_notification(user_id=reviewer_user_id)
+    await publisher.publish_notifications(user_ids=notified_user_ids)
 
 
 @router.delete(
@@ -324,7 +334,11 @@ async def leave_room(
         user_id=current_user.id,
         reason=SessionCloseReason.LEFT_ROOM,
     )
-    await publisher.publish_room_members(room_id=room_id)
+    await publisher.publish_room_members(
+        room_id=room_id,
+        change_type=RoomMembersChangeType.REMOVED,
+        user_id=current_user.id,
+    )
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -346,8 +360,14 @@ async def set_room_member_manager(
         is_manager=True,
         current_user=current_user,
     )
-    await publisher.publish_room_members(room_id=room_id)
-    return RoomMemberResponse.model_validate(member)
+    response = RoomMemberResponse.model_validate(member)
+    await publisher.publish_room_members(
+        room_id=room_id,
+        change_type=RoomMembersChangeType.ROLE_CHANGED,
+        user_id=target_user_id,
+        member=response,
+    )
+    return response
 
 
 @router.delete(
@@ -368,8 +388,14 @@ async def unset_room_member_manager(
         is_manager=False,
         current_user=current_user,
     )
-    await publisher.publish_room_members(room_id=room_id)
-    return RoomMemberResponse.model_validate(member)
+    response = RoomMemberResponse.model_validate(member)
+    await publisher.publish_room_members(
+        room_id=room_id,
+        change_type=RoomMembersChangeType.ROLE_CHANGED,
+        user_id=target_user_id,
+        member=response,
+    )
+    return response
 
 
 @router.delete(
@@ -402,5 +428,9 @@ async def remove_room_member(
         user_id=target_user_id,
         reason=SessionCloseReason.REMOVED_FROM_ROOM,
     )
-    await publisher.publish_room_members(room_id=room_id)
+    await publisher.publish_room_members(
+        room_id=room_id,
+        change_type=RoomMembersChangeType.REMOVED,
+        user_id=target_user_id,
+    )
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -12,17 +12,47 @@ class Settings(BaseSettings):
     debug: bool = Field(True, alias="DEBUG")
     api_v1_prefix: str = "/api/v1"
     log_level: str = Field("INFO", alias="LOG_LEVEL")
+    log_format: str = Field("text", alias="LOG_FORMAT")
     log_sql: bool = Field(False, alias="LOG_SQL")
     log_access_exclude_paths: list[str] = Field(
-        default_factory=lambda: ["/health"],
+        default_factory=lambda: ["/health", "/metrics"],
         alias="LOG_ACCESS_EXCLUDE_PATHS",
     )
     log_uvicorn_access: bool = Field(False, alias="LOG_UVICORN_ACCESS")
     log_uvicorn_level: str = Field("WARNING", alias="LOG_UVICORN_LEVEL")
+    # 按 event 名采样 / 每秒限流，key 支持以 * 结尾的前缀
+    log_sample_rates: dict[str, float] = Field(
+        default_factory=lambda: {"ws.user_resource_status": 0.01},
+        alias="LOG_SAMPLE_RATES",
+    )
+    log_rate_limits: dict[str, int] = Field(
+        default_factory=lambda: {"ws.*": 100},
+        alias="LOG_RATE_LIMITS",
+    )
 
     # 数据目录 / DB
     data_dir: str = Field("../data", alias="DATA_DIR")
     db_filename: str = Field("iCinema.db", alias="DB_FILENAME")
+    # 单个请求 / WS 命令内同一语句形状执行达到该次数时记 N+1 告警
+    db_n_plus_one_threshold: int = Field(5, alias="DB_N_PLUS_ONE_THRESHOLD", ge=2)
+    # 消息写入合并窗口：窗口内多个请求的消息在同一事务中提交；0 表示每条消息单独提交
+    message_write_batch_window_ms: int = Field(
+        0, alias="MESSAGE_WRITE_BATCH_WINDOW_MS", ge=0
+    )
+    message_write_batch_max_size: int = Field(
+        100, alias="MESSAGE_WRITE_BATCH_MAX_SIZE", ge=1
+    )
+    # 进程内缓存的用户头像 storage_key 条数上限，超出后淘汰最久未访问的用户
+    avatar_key_cache_max_entries: int = Field(
+        50000, alias="AVATAR_KEY_CACHE_MAX_ENTRIES", ge=1
+    )
+    # 表情使用记录先在内存中聚合，按间隔批量写库；积压条数达到上限时提前写入
+    emoji_usage_flush_interval_ms: int = Field(
+        5000, alias="EMOJI_USAGE_FLUSH_INTERVAL_MS", ge=1
+    )
+    emoji_usage_flush_max_pending: int = Field(
+        1000, alias="EMOJI_USAGE_FLUSH_MAX_PENDING", ge=1
+    )
 
     # 上传目录
     upload_dir: str | None = Field(default=None, alias="UPLOAD_DIR")
@@ -31,6 +61,17 @@ class Settings(BaseSettings):
     sticker_subdir: str = Field("stickers", alias="STICKER_SUBDIR")
     video_subdir: str = Field("videos", alias="VIDEO_SUBDIR")
     feedback_image_subdir: str = Field("feedback", alias="FEEDBACK_IMAGE_SUBDIR")
+    derivative_subdir: str = Field("derivatives", alias="DERIVATIVE_SUBDIR")
+
+    # 图片衍生图：解码在独立进程池中进行；0 表示关闭，?w= 请求直接返回原图
+    media_derivative_workers: int = Field(2, alias="MEDIA_DERIVATIVE_WORKERS", ge=0)
+    # ?w= 向上取整到这些宽度档位，磁盘上每张图最多缓存这么多份
+    media_derivative_widths: list[int] = Field(
+        [48, 96, 192, 480, 960], alias="MEDIA_DERIVATIVE_WIDTHS"
+    )
+    media_derivative_webp_quality: int = Field(
+        80, alias="MEDIA_DERIVATIVE_WEBP_QUALITY", ge=1, le=100
+    )
 
     # JWT
     jwt_secret_key: str = Field(..., alias="JWT_SECRET_KEY")
@@ -44,7 +85,7 @@ class Settings(BaseSettings):
     sticker_public_prefix: str = Field("/sticker", alias="STICKER_PUBLIC_PREFIX")
     video_public_prefix: str = Field("/video", alias="VIDEO_PUBLIC_PREFIX")
 
-    # Emoji catalog（远程）
+    # Emoji catalog（远程，支持 file:// 本地源）
     emoji_catalog_url: str = Field(
         "https://koishi.js.org/QFace/assets/qq_emoji/_index.json",
         alias="EMOJI_CATALOG_URL",
@@ -61,11 +102,55 @@ class Settings(BaseSettings):
         10,
         alias="EMOJI_CATALOG_TIMEOUT_SECONDS",
     )
+    emoji_catalog_snapshot_filename: str = Field(
+        "emoji_catalog.json",
+        alias="EMOJI_CATALOG_SNAPSHOT_FILENAME",
+    )
 
     # WS
     ws_auth_timeout_seconds: int = Field(
         10, alias="WS_AUTH_TIMEOUT_SECONDS", ge=1
     )
+    # 超过该时长未收到任何客户端帧的连接会被服务端关闭（客户端心跳间隔 25s）
+    ws_idle_timeout_seconds: int = Field(
+        75, alias="WS_IDLE_TIMEOUT_SECONDS", ge=1
+    )
+    ws_idle_reap_interval_seconds: int = Field(
+        15, alias="WS_IDLE_REAP_INTERVAL_SECONDS", ge=1
+    )
+    # 同一房间 play/pause/seek 广播的合并窗口，窗口内只广播最终状态；0 表示不合并
+    realtime_playback_coalesce_window_ms: int = Field(
+        80, alias="REALTIME_PLAYBACK_COALESCE_WINDOW_MS", ge=0
+    )
+    # 同一房间资源状态上报的聚合窗口，窗口内统一判断卡顿自动暂停/恢复；0 表示逐条处理
+    realtime_resource_status_window_ms: int = Field(
+        200, alias="REALTIME_RESOURCE_STATUS_WINDOW_MS", ge=0
+    )
+    # 房间播放运行时快照：定期及停机时写入数据目录，启动时在接受 /ws 连接前恢复
+    realtime_runtime_snapshot_enabled: bool = Field(
+        True, alias="REALTIME_RUNTIME_SNAPSHOT_ENABLED"
+    )
+    realtime_runtime_snapshot_filename: str = Field(
+        "realtime_runtime.json", alias="REALTIME_RUNTIME_SNAPSHOT_FILENAME"
+    )
+    realtime_runtime_snapshot_interval_seconds: int = Field(
+        10, alias="REALTIME_RUNTIME_SNAPSHOT_INTERVAL_SECONDS", ge=1
+    )
+    # 超过该时长的快照视为过期，不再恢复
+    realtime_runtime_snapshot_max_age_seconds: int = Field(
+        600, alias="REALTIME_RUNTIME_SNAPSHOT_MAX_AGE_SECONDS", ge=1
+    )
+    # 从快照恢复或房间变空后，该时长内无人进入的房间运行时会被清理
+    realtime_runtime_restore_grace_seconds: int = Field(
+        120, alias="REALTIME_RUNTIME_RESTORE_GRACE_SECONDS", ge=1
+    )
+
+    # Metrics
+    # /metrics 默认不注册；开启后若配置了 token，抓取方需带 Authorization: Bearer <token>
+    metrics_enabled: bool = Field(False, alias="METRICS_ENABLED")
+    metrics_token: str = Field("", alias="METRICS_TOKEN")
+    # 后台任务进程没有 HTTP 服务，指标写入该文件供 node_exporter textfile collector 采集；为空则不写
+    jobs_metrics_textfile: str = Field("", alias="JOBS_METRICS_TEXTFILE")
 
     # CORS
     cors_origins: list[str] = ["*"]
@@ -89,6 +174,14 @@ class Settings(BaseSettings):
     def database_url(self) -> str:
         return f"sqlite+aiosqlite:///{self.db_path.as_posix()}"
 
+    @property
+    def emoji_catalog_snapshot_path(self) -> Path:
+        return (self.data_dir_path / self.emoji_catalog_snapshot_filename).resolve()
+
+    @property
+    def realtime_runtime_snapshot_path(self) -> Path:
+        return (self.data_dir_path / self.realtime_runtime_snapshot_filename).resolve()
+
     @property
     def alembic_database_url(self) -> str:
         return self.database_url.replace("+aiosqlite", "")
@@ -119,6 +212,10 @@ class Settings(BaseSettings):
     def feedback_image_dir_path(self) -> Path:
         return (self.upload_dir_path / self.feedback_image_subdir).resolve()
 
+    @property
+    def derivative_dir_path(self) -> Path:
+        return (self.upload_dir_path / self.derivative_subdir).resolve()
+
 @lru_cache
 def get_settings() -> Settings:
     return Settings()
@@ -1,5 +1,13 @@
-from collections.abc import AsyncGenerator
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import AsyncGenerator, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
@@ -7,8 +15,16 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from app.core.config import get_settings
+from app.core.logging import log_extra
+from app.core.metrics import (
+    db_n_plus_one_total,
+    db_session_acquire_seconds,
+    db_statements,
+    db_time_seconds,
+)
 
 settings = get_settings()
+logger = logging.getLogger("app.db")
 
 engine = create_async_engine(
     settings.database_url,
@@ -24,7 +40,86 @@ AsyncSessionLocal = async_sessionmaker(
     autocommit=False,
 )
 
+# IN (?, ?, ?) 的占位符个数随参数变化，归一成同一种语句形状
+_IN_PLACEHOLDERS_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    return _IN_PLACEHOLDERS_RE.sub("(?...)", " ".join(statement.split()))
+
+
+@dataclass
+class QueryStats:
+    statements: int = 0
+    duration_seconds: float = 0.0
+    shapes: Counter[str] = field(default_factory=Counter)
+
+    def repeated_shapes(self, threshold: int) -> dict[str, int]:
+        return {shape: count for shape, count in self.shapes.items() if count >= threshold}
+
+
+# 当前请求 / WS 命令上激活的统计；允许嵌套，测试可在请求外层再套一层
+_query_collectors: ContextVar[tuple[QueryStats, ...]] = ContextVar(
+    "query_collectors",
+    default=(),
+)
+
+
+@contextmanager
+def collect_query_stats() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _query_collectors.set((*_query_collectors.get(), stats))
+    try:
+        yield stats
+    finally:
+        _query_collectors.reset(token)
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+    started_at = conn.info["query_started_at"].pop()
+    collectors = _query_collectors.get()
+    if not collectors:
+        return
+
+    elapsed = time.perf_counter() - started_at
+    shape = statement_shape(statement)
+    for stats in collectors:
+        stats.statements += 1
+        stats.duration_seconds += elapsed
+        stats.shapes[shape] += 1
+
+
+def observe_query_stats(stats: QueryStats, *, source: str, target: str) -> None:
+    db_statements.observe(stats.statements, source=source)
+    db_time_seconds.observe(stats.duration_seconds, source=source)
+
+    for shape, count in stats.repeated_shapes(settings.db_n_plus_one_threshold).items():
+        db_n_plus_one_total.inc(source=source)
+        logger.warning(
+            "repeated sql statement source=%s target=%s count=%s statement=%s",
+            source,
+            target,
+            count,
+            shape[:200],
+            **log_extra(
+                "db.n_plus_one",
+                source=source,
+                target=target,
+                count=count,
+                statement=shape[:200],
+            ),
+        )
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
+        started_at = time.perf_counter()
+        await session.connection()
+        db_session_acquire_seconds.observe(time.perf_counter() - started_at)
         yield session
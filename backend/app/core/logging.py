@@ -1,7 +1,17 @@
 from __future__ import annotations
 
+import atexit
+import copy
+import json
 import logging
+import queue
+import random
+import time
+from collections.abc import Mapping
 from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any
 
 from app.core.config import Settings
@@ -9,6 +19,7 @@ from app.core.config import Settings
 _request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
 _user_id: ContextVar[int | None] = ContextVar("user_id", default=None)
 _configured = False
+_listener: QueueListener | None = None
 
 _LOG_RECORD_RESERVED_KEYS = set(logging.LogRecord(
     name="",
@@ -37,8 +48,102 @@ class ContextFormatter(logging.Formatter):
         return super().format(record)
 
 
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", None)
+        payload: dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": _json_context_value(record, "request_id", _request_id),
+            "user_id": _json_context_value(record, "user_id", _user_id),
+            "event": _json_context_value(record, "event"),
+            "fields": fields if isinstance(fields, dict) else {},
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+@dataclass(slots=True)
+class _RateLimitWindow:
+    started_at: float
+    count: int = 1
+    suppressed: int = 0
+
+
+class EventSamplingFilter(logging.Filter):
+    # 按 log_extra 的 event 名做采样和每秒限流，只作用于 INFO 及以下级别。
+    # 规则 key 可以是完整事件名，也可以是以 * 结尾的前缀，例如 "ws.*"。
+    def __init__(
+        self,
+        *,
+        sample_rates: Mapping[str, float],
+        rate_limits: Mapping[str, int],
+    ) -> None:
+        super().__init__()
+        self.sample_rates = dict(sample_rates)
+        self.rate_limits = dict(rate_limits)
+        self._rules: dict[str, tuple[float | None, int | None]] = {}
+        self._windows: dict[str, _RateLimitWindow] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None)
+        if not event or record.levelno > logging.INFO:
+            return True
+
+        sample_rate, rate_limit = self._get_rules(event)
+        if sample_rate is not None and random.random() >= sample_rate:
+            return False
+        if rate_limit is None:
+            return True
+
+        now = time.monotonic()
+        window = self._windows.get(event)
+        if window is None or now - window.started_at >= 1.0:
+            self._windows[event] = _RateLimitWindow(started_at=now)
+            # 上一个窗口被限流丢弃的条数附在新窗口的第一条日志上
+            if window is not None and window.suppressed and isinstance(
+                getattr(record, "fields", None), dict
+            ):
+                record.fields = {**record.fields, "rate_limited": window.suppressed}
+            return True
+
+        if window.count >= rate_limit:
+            window.suppressed += 1
+            return False
+
+        window.count += 1
+        return True
+
+    def _get_rules(self, event: str) -> tuple[float | None, int | None]:
+        rules = self._rules.get(event)
+        if rules is None:
+            rules = (
+                _match_event_rule(self.sample_rates, event),
+                _match_event_rule(self.rate_limits, event),
+            )
+            self._rules[event] = rules
+        return rules
+
+
+class ContextQueueHandler(QueueHandler):
+    # 格式化和 stdout 写入交给 QueueListener 线程；日志上下文保存在 ContextVar 中，
+    # 因此需要在调用方上下文里先把 request_id / user_id 写入 record。
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if not hasattr(record, "request_id"):
+            record.request_id = _request_id.get() or "-"
+        if not hasattr(record, "user_id"):
+            record.user_id = _user_id.get() or "-"
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
 def configure_logging(settings: Settings, *, force: bool = False) -> None:
-    global _configured
+    global _configured, _listener
     if _configured and not force:
         return
 
@@ -46,17 +151,34 @@ def configure_logging(settings: Settings, *, force: bool = False) -> None:
     uvicorn_level = getattr(logging, settings.log_uvicorn_level.upper(), logging.WARNING)
 
     handler = logging.StreamHandler()
-    handler.setFormatter(
-        ContextFormatter(
-            "%(asctime)s %(levelname)s %(name)s "
-            "request_id=%(request_id)s user_id=%(user_id)s event=%(event)s "
-            "fields=%(fields)s - %(message)s"
+    if settings.log_format.lower() == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(
+            ContextFormatter(
+                "%(asctime)s %(levelname)s %(name)s "
+                "request_id=%(request_id)s user_id=%(user_id)s event=%(event)s "
+                "fields=%(fields)s - %(message)s"
+            )
         )
-    )
+
+    stop_logging_listener()
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
 
     root_logger = logging.getLogger()
     root_logger.handlers.clear()
-    root_logger.addHandler(handler)
+    queue_handler = ContextQueueHandler(log_queue)
+    if settings.log_sample_rates or settings.log_rate_limits:
+        # 在入队前过滤，被丢弃的记录不会产生任何格式化开销
+        queue_handler.addFilter(
+            EventSamplingFilter(
+                sample_rates=settings.log_sample_rates,
+                rate_limits=settings.log_rate_limits,
+            )
+        )
+    root_logger.addHandler(queue_handler)
     root_logger.setLevel(level)
 
     app_logger = logging.getLogger("app")
@@ -74,14 +196,16 @@ def configure_logging(settings: Settings, *, force: bool = False) -> None:
     )
     _configured = True
     logging.getLogger("app.startup").info(
-        "logging configured level=%s log_sql=%s log_uvicorn_access=%s log_uvicorn_level=%s",
+        "logging configured level=%s format=%s log_sql=%s log_uvicorn_access=%s log_uvicorn_level=%s",
         settings.log_level.upper(),
+        settings.log_format.lower(),
         settings.log_sql,
         settings.log_uvicorn_access,
         settings.log_uvicorn_level.upper(),
         **log_extra(
             "logging.configured",
             level=settings.log_level.upper(),
+            format=settings.log_format.lower(),
             log_sql=settings.log_sql,
             log_uvicorn_access=settings.log_uvicorn_access,
             log_uvicorn_level=settings.log_uvicorn_level.upper(),
@@ -89,6 +213,19 @@ def configure_logging(settings: Settings, *, force: bool = False) -> None:
     )
 
 
+def stop_logging_listener() -> None:
+    global _listener
+    if _listener is None:
+        return
+
+    # stop() 会先把队列中剩余的日志写完再退出
+    _listener.stop()
+    _listener = None
+
+
+atexit.register(stop_logging_listener)
+
+
 def set_log_context(*, request_id: str | None = None, user_id: int | None = None) -> None:
     if request_id is not None:
         _request_id.set(request_id)
@@ -115,6 +252,34 @@ def log_extra(event: str, **values: Any) -> dict[str, Any]:
     return {"extra": extra}
 
 
+def _json_context_value(
+    record: logging.LogRecord,
+    key: str,
+    context: ContextVar[Any] | None = None,
+) -> Any:
+    # 文本格式用 "-" 占位，JSON 输出统一为 null
+    value = getattr(record, key, None)
+    if value is None and context is not None:
+        value = context.get()
+    return None if value == "-" else value
+
+
+def _match_event_rule(rules: Mapping[str, Any], event: str) -> Any:
+    if event in rules:
+        return rules[event]
+
+    matched_prefix = ""
+    matched_value = None
+    for key, value in rules.items():
+        if not key.endswith("*"):
+            continue
+        prefix = key[:-1]
+        if event.startswith(prefix) and len(prefix) >= len(matched_prefix):
+            matched_prefix = prefix
+            matched_value = value
+    return matched_value
+
+
 def _format_fields(fields: dict[str, Any]) -> str:
     if not fields:
         return "-"
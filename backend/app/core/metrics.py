@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import TypeVar
+
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+DEFAULT_SIZE_BUCKETS: tuple[float, ...] = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def _escape_label_value(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str]) -> str:
+    if not labelnames:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape_label_value(value)}"'
+        for name, value in zip(labelnames, labelvalues)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        *,
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _label_values(self, labels: dict[str, object]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+            *self._render_samples(),
+        ]
+
+    def _render_samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        *,
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        super().__init__(name, documentation, labelnames=labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: object) -> None:
+        self._values[self._label_values(labels)] = float(value)
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    def _render_samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+            for labelvalues, value in sorted(self._values.items())
+        ]
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        *,
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        super().__init__(name, documentation, labelnames=labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._label_values(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _render_samples(self) -> list[str]:
+        return [
+            f"{self.name}_total{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+            for labelvalues, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        *,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames=labelnames)
+        self.buckets = tuple(sorted(float(bucket) for bucket in buckets))
+        # 每组 label 保存：各 bucket 的非累计计数（最后一格为 +Inf）、总和、总数
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._label_values(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+            self._series[key] = series
+
+        bucket_counts, totals = series
+        bucket_counts[bisect_left(self.buckets, value)] += 1
+        totals[0] += value
+        totals[1] += 1
+
+    def _render_samples(self) -> list[str]:
+        lines: list[str] = []
+        bucket_labelnames = (*self.labelnames, "le")
+        for labelvalues, (bucket_counts, totals) in sorted(self._series.items()):
+            cumulative = 0
+            for upper_bound, count in zip((*self.buckets, math.inf), bucket_counts):
+                cumulative += count
+                bucket_labels = _format_labels(
+                    bucket_labelnames,
+                    (*labelvalues, _format_value(upper_bound)),
+                )
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(totals[0])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(totals[1])}")
+        return lines
+
+
+MetricT = TypeVar("MetricT", bound=_Metric)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: MetricT) -> MetricT:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        *,
+        labelnames: Sequence[str] = (),
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames=labelnames))
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        *,
+        labelnames: Sequence[str] = (),
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labelnames=labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        *,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(
+            Histogram(name, documentation, labelnames=labelnames, buckets=buckets)
+        )
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# 进程级注册表：同一进程内的 HTTP、WS 和后台任务共享同一份指标
+registry = MetricsRegistry()
+
+http_request_duration_seconds = registry.histogram(
+    "icinema_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    labelnames=("method", "route", "status_code"),
+)
+db_session_acquire_seconds = registry.histogram(
+    "icinema_db_session_acquire_seconds",
+    "Time spent acquiring a database connection for a request session.",
+)
+db_statements = registry.histogram(
+    "icinema_db_statements",
+    "SQL statements issued per HTTP request or WS command.",
+    labelnames=("source",),
+    buckets=DEFAULT_SIZE_BUCKETS,
+)
+db_time_seconds = registry.histogram(
+    "icinema_db_time_seconds",
+    "Cumulative SQL execution time per HTTP request or WS command.",
+    labelnames=("source",),
+)
+db_n_plus_one_total = registry.counter(
+    "icinema_db_n_plus_one",
+    "Requests or WS commands that repeated one SQL statement shape past the threshold.",
+    labelnames=("source",),
+)
+message_write_batch_size = registry.histogram(
+    "icinema_message_write_batch_size",
+    "Messages committed per write batch transaction.",
+    buckets=DEFAULT_SIZE_BUCKETS,
+)
+media_derivative_render_seconds = registry.histogram(
+    "icinema_media_derivative_render_seconds",
+    "Time to render one resized WebP image variant in the process pool.",
+)
+avatar_key_cache_lookups_total = registry.counter(
+    "icinema_avatar_key_cache_lookups",
+    "User avatar key lookups served from the in-process cache or the database.",
+    labelnames=("result",),
+)
+emoji_usage_flush_rows = registry.histogram(
+    "icinema_emoji_usage_flush_rows",
+    "Buffered emoji usage rows upserted per flush.",
+    buckets=DEFAULT_SIZE_BUCKETS,
+)
+job_duration_seconds = registry.histogram(
+    "icinema_job_duration_seconds",
+    "Background job run duration.",
+    labelnames=("job", "status"),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+
+ws_connections = registry.gauge(
+    "icinema_ws_connections",
+    "Active WebSocket connections.",
+)
+ws_subscriptions = registry.gauge(
+    "icinema_ws_subscriptions",
+    "Active WebSocket channel subscriptions by channel kind.",
+    labelnames=("channel_kind",),
+)
+ws_publish_fanout_size = registry.histogram(
+    "icinema_ws_publish_fanout_size",
+    "Number of connections targeted by a single channel publish.",
+    labelnames=("channel_kind",),
+    buckets=DEFAULT_SIZE_BUCKETS,
+)
+ws_send_duration_seconds = registry.histogram(
+    "icinema_ws_send_duration_seconds",
+    "Latency of a single WebSocket send.",
+)
+realtime_rooms_with_runtime = registry.gauge(
+    "icinema_realtime_rooms_with_runtime",
+    "Rooms currently holding live video runtime state.",
+)
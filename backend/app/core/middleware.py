@@ -4,71 +4,103 @@ import logging
 import time
 from uuid import uuid4
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import get_settings
+from app.core.database import collect_query_stats, observe_query_stats
 from app.core.logging import clear_log_context, log_extra, set_log_context
+from app.core.metrics import http_request_duration_seconds
 
 access_logger = logging.getLogger("app.http.access")
 error_logger = logging.getLogger("app.http.error")
 settings = get_settings()
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next) -> Response:  # noqa: ANN001
-        request_id = request.headers.get("X-Request-ID") or uuid4().hex
-        request.state.request_id = request_id
+class RequestLoggingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("X-Request-ID") or uuid4().hex
+        # 与 request.state 共享同一个 dict，鉴权依赖写入的 user_id 也会落在这里
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
         set_log_context(request_id=request_id)
 
+        method = scope["method"]
+        path = scope["path"]
         started_at = time.perf_counter()
         status_code = 500
-        should_log_access = request.url.path not in settings.log_access_exclude_paths
+        should_log_access = path not in settings.log_access_exclude_paths
 
-        try:
-            response = await call_next(request)
-            status_code = response.status_code
-            return response
-        except Exception:
-            duration_ms = round((time.perf_counter() - started_at) * 1000, 2)
-            error_logger.exception(
-                "unhandled http exception method=%s path=%s duration_ms=%s",
-                request.method,
-                request.url.path,
-                duration_ms,
-                **log_extra(
-                    "http.exception",
-                    method=request.method,
-                    path=request.url.path,
-                    duration_ms=duration_ms,
-                ),
-            )
-            raise
-        finally:
-            duration_ms = round((time.perf_counter() - started_at) * 1000, 2)
-            user_id = getattr(request.state, "user_id", None)
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
 
-            if should_log_access:
-                access_logger.info(
-                    "method=%s path=%s status_code=%s duration_ms=%s client_ip=%s",
-                    request.method,
-                    request.url.path,
-                    status_code,
+        with collect_query_stats() as query_stats:
+            try:
+                await self.app(scope, receive, send_with_request_id)
+            except Exception:
+                duration_ms = round((time.perf_counter() - started_at) * 1000, 2)
+                error_logger.exception(
+                    "unhandled http exception method=%s path=%s duration_ms=%s",
+                    method,
+                    path,
                     duration_ms,
-                    request.client.host if request.client else None,
                     **log_extra(
-                        "http.request",
-                        method=request.method,
-                        path=request.url.path,
-                        status_code=status_code,
+                        "http.exception",
+                        method=method,
+                        path=path,
                         duration_ms=duration_ms,
-                        client_ip=request.client.host if request.client else None,
-                        user_id=user_id if user_id is not None else "-",
                     ),
                 )
+                raise
+            finally:
+                duration_seconds = time.perf_counter() - started_at
+                duration_ms = round(duration_seconds * 1000, 2)
+                user_id = state.get("user_id")
+                route_path = getattr(scope.get("route"), "path", "-")
+                http_request_duration_seconds.observe(
+                    duration_seconds,
+                    method=method,
+                    route=route_path,
+                    status_code=status_code,
+                )
+                observe_query_stats(query_stats, source="http", target=f"{method} {route_path}")
+                db_ms = round(query_stats.duration_seconds * 1000, 2)
+
+                if should_log_access:
+                    client = scope.get("client")
+                    client_ip = client[0] if client else None
+                    access_logger.info(
+                        "method=%s path=%s status_code=%s duration_ms=%s client_ip=%s "
+                        "db_statements=%s db_ms=%s",
+                        method,
+                        path,
+                        status_code,
+                        duration_ms,
+                        client_ip,
+                        query_stats.statements,
+                        db_ms,
+                        **log_extra(
+                            "http.request",
+                            method=method,
+                            path=path,
+                            status_code=status_code,
+                            duration_ms=duration_ms,
+                            client_ip=client_ip,
+                            user_id=user_id if user_id is not None else "-",
+                            db_statements=query_stats.statements,
+                            db_ms=db_ms,
+                        ),
+                    )
 
-            response = locals().get("response")
-            if response is not None:
-                response.headers["X-Request-ID"] = request_id
-            clear_log_context()
+                clear_log_context()
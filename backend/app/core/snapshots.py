@@ -0,0 +1,18 @@
+import json
+import os
+from pathlib import Path
+
+
+# 进程内状态落盘用的 JSON 快照；内容结构由调用方自行校验
+def read_json_snapshot(path: Path) -> object | None:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def write_json_snapshot(path: Path, snapshot: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(json.dumps(snapshot, ensure_ascii=False), encoding="utf-8")
+    # 先写临时文件再原子替换，进程中途退出也不会留下半个快照
+    os.replace(tmp_path, path)
@@ -23,6 +23,7 @@ async def ensure_runtime_paths() -> None:
     settings.sticker_dir_path.mkdir(parents=True, exist_ok=True)
     settings.video_dir_path.mkdir(parents=True, exist_ok=True)
     settings.feedback_image_dir_path.mkdir(parents=True, exist_ok=True)
+    settings.derivative_dir_path.mkdir(parents=True, exist_ok=True)
 
 
 def _build_alembic_config() -> Config:
@@ -4,13 +4,22 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.router import api_router
+from app.api.metrics import router as metrics_router
 from app.api.public_resources import router as public_resources_router
 from app.core.config import get_settings
 from app.core.exceptions import register_exception_handlers
 from app.core.logging import configure_logging
 from app.core.middleware import RequestLoggingMiddleware
 from app.core.startup import initialize_runtime
-from app.realtime.bootstrap import setup_realtime
+from app.modules.media.derivatives import media_derivative_pipeline
+from app.modules.media.emoji_catalog import emoji_catalog_service
+from app.modules.media.emoji_usage_recorder import emoji_usage_recorder
+from app.modules.messages.write_batcher import message_write_batcher
+from app.realtime.bootstrap import (
+    setup_realtime,
+    start_realtime_tasks,
+    stop_realtime_tasks,
+)
 from app.realtime.ws_router import router as ws_router
 
 settings = get_settings()
@@ -19,7 +28,14 @@ settings = get_settings()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await initialize_runtime()
+    await emoji_catalog_service.start()
+    await start_realtime_tasks(app)
     yield
+    await stop_realtime_tasks(app)
+    await message_write_batcher.stop()
+    await emoji_usage_recorder.stop()
+    await media_derivative_pipeline.stop()
+    await emoji_catalog_service.stop()
 
 
 def create_app() -> FastAPI:
@@ -47,6 +63,8 @@ def create_app() -> FastAPI:
     app.include_router(public_resources_router)
     app.include_router(api_router, prefix=settings.api_v1_prefix)
     app.include_router(ws_router)
+    if settings.metrics_enabled:
+        app.include_router(metrics_router)
 
     @app.get("/health")
     async def health() -> dict[str, str]:
@@ -0,0 +1,70 @@
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.metrics import avatar_key_cache_lookups_total
+
+settings = get_settings()
+
+
+class AvatarKeyCache:
+    def __init__(self) -> None:
+        self.max_entries = settings.avatar_key_cache_max_entries
+        # user_id -> 当前头像 storage_key；没有头像的用户记为 None，同样命中缓存
+        self._keys: OrderedDict[int, str | None] = OrderedDict()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get_many(self, user_ids: list[int]) -> tuple[dict[int, str | None], list[int]]:
+        found: dict[int, str | None] = {}
+        missing: list[int] = []
+        for user_id in dict.fromkeys(user_ids):
+            if user_id in self._keys:
+                self._keys.move_to_end(user_id)
+                found[user_id] = self._keys[user_id]
+            else:
+                missing.append(user_id)
+
+        if found:
+            avatar_key_cache_lookups_total.inc(len(found), result="hit")
+        if missing:
+            avatar_key_cache_lookups_total.inc(len(missing), result="miss")
+        return found, missing
+
+    def set_many(self, avatar_keys: dict[int, str | None], *, generation: int) -> None:
+        # 查询期间有头像变更时丢弃这批结果，避免把旧头像写回缓存
+        if generation != self._generation:
+            return
+
+        for user_id, storage_key in avatar_keys.items():
+            self._keys[user_id] = storage_key
+            self._keys.move_to_end(user_id)
+        while len(self._keys) > self.max_entries:
+            self._keys.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._generation += 1
+        self._keys.pop(user_id, None)
+
+    def invalidate_on_commit(self, db: AsyncSession, user_id: int) -> None:
+        # 提交前其他请求仍会读到旧头像，提交后再失效一次
+        self.invalidate(user_id)
+        event.listen(
+            db.sync_session,
+            "after_commit",
+            lambda session: self.invalidate(user_id),
+            once=True,
+        )
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._keys.clear()
+
+
+# 进程内共享，头像变更后所有请求立即看到新的 storage_key
+avatar_key_cache = AvatarKeyCache()
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from pathlib import Path
+
+from app.core.config import get_settings
+from app.core.logging import log_extra
+from app.core.metrics import media_derivative_render_seconds
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow 未安装时不解析尺寸也不生成衍生图，原图照常服务
+    Image = None
+    ImageOps = None
+
+settings = get_settings()
+logger = logging.getLogger("app.media.derivatives")
+
+# 动图转成静态 WebP 会丢帧，始终返回原图
+SKIPPED_MIME_TYPES = {"image/gif"}
+
+
+def probe_image_size(content: bytes) -> tuple[int, int] | None:
+    # 只读文件头即可拿到尺寸，无法识别的文件不拒收，尺寸留空
+    try:
+        with Image.open(BytesIO(content)) as image:
+            return image.size
+    except Exception:  # noqa: BLE001
+        return None
+
+
+def render_webp_variant(source: str, target: str, width: int, quality: int) -> None:
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        # 只缩小不放大，高度按原图比例计算
+        image.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+        if image.mode not in {"RGB", "RGBA"}:
+            image = image.convert("RGBA")
+
+        tmp_path = f"{target}.tmp"
+        image.save(tmp_path, "WEBP", quality=quality, method=4)
+    os.replace(tmp_path, target)
+
+
+class MediaDerivativePipeline:
+    def __init__(self) -> None:
+        self.workers = settings.media_derivative_workers
+        self.widths = sorted(set(settings.media_derivative_widths))
+        self.quality = settings.media_derivative_webp_quality
+        self.base_dir = settings.derivative_dir_path
+        self._executor: ProcessPoolExecutor | None = None
+        self._rendering: dict[Path, asyncio.Future[None]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return Image is not None and self.workers > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn 启动的子进程不继承事件循环和数据库连接
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _drop_broken_executor(self, executor: ProcessPoolExecutor) -> None:
+        # 子进程被杀（如解码超大图时 OOM）后整个进程池不可再用，下次调用重建
+        if self._executor is executor:
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def probe_size(self, *, content: bytes, mime_type: str) -> tuple[int, int] | None:
+        if Image is None or not mime_type.startswith("image/"):
+            return None
+        # 只读文件头，放在线程里即可，不必把整份上传内容序列化给子进程
+        return await asyncio.to_thread(probe_image_size, content)
+
+    def pick_width(
+        self,
+        *,
+        requested_width: int,
+        mime_type: str,
+        original_width: int | None,
+    ) -> int | None:
+        if not self.enabled or mime_type in SKIPPED_MIME_TYPES:
+            return None
+
+        width = next((width for width in self.widths if width >= requested_width), None)
+        if width is None:
+            return None
+        # 档位不小于原图宽度时缩放没有意义，直接返回原图
+        if original_width is not None and width >= original_width:
+            return None
+        return width
+
+    def get_variant_path(self, *, asset_type: str, storage_key: str, width: int) -> Path:
+        return self.base_dir / asset_type / f"{storage_key}.w{width}.webp"
+
+    async def get_or_render_variant(
+        self,
+        *,
+        source: Path,
+        asset_type: str,
+        storage_key: str,
+        width: int,
+    ) -> Path | None:
+        target = self.get_variant_path(
+            asset_type=asset_type,
+            storage_key=storage_key,
+            width=width,
+        )
+        if target.exists():
+            return target
+
+        # 同一衍生图的并发请求只渲染一次
+        future = self._rendering.get(target)
+        if future is None:
+            future = asyncio.ensure_future(self._render(source, target, width))
+            self._rendering[target] = future
+            future.add_done_callback(lambda _: self._rendering.pop(target, None))
+
+        try:
+            await asyncio.shield(future)
+        except Exception:  # noqa: BLE001
+            logger.warning(
+                "media derivative render failed storage_key=%s width=%s",
+                storage_key,
+                width,
+                exc_info=True,
+                **log_extra(
+                    "media.derivative_render_failed",
+                    asset_type=asset_type,
+                    storage_key=storage_key,
+                    width=width,
+                ),
+            )
+            return None
+        return target
+
+    async def _render(self, source: Path, target: Path, width: int) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        started_at = time.perf_counter()
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(
+                executor,
+                render_webp_variant,
+                str(source),
+                str(target),
+                width,
+                self.quality,
+            )
+        except BrokenProcessPool:
+            self._drop_broken_executor(executor)
+            raise
+        media_derivative_render_seconds.observe(time.perf_counter() - started_at)
+
+    def delete_variants(self, *, asset_type: str, storage_key: str) -> None:
+        for width in self.widths:
+            self.get_variant_path(
+                asset_type=asset_type,
+                storage_key=storage_key,
+                width=width,
+            ).unlink(missing_ok=True)
+
+    async def stop(self) -> None:
+        executor = self._executor
+        self._executor = None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+
+# 进程池开销大，整个进程共享一个
+media_derivative_pipeline = MediaDerivativePipeline()
@@ -1,109 +1,258 @@
 import asyncio
+import contextvars
+import hashlib
 import json
+import logging
 from datetime import datetime, timedelta, timezone
-from urllib.parse import urljoin
-from urllib.request import urlopen
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+from urllib.request import url2pathname, urlopen
 
 from app.core.config import get_settings
+from app.core.logging import log_extra
+from app.core.snapshots import read_json_snapshot, write_json_snapshot
 from app.modules.media.constants import EmojiProvider
 
 settings = get_settings()
+logger = logging.getLogger("app.media.emoji_catalog")
+
+FAILED_REFRESH_RETRY_SECONDS = 60
 
 
 def _download_text(url: str, timeout: int) -> str:
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        # 离线部署可以把 catalog 放在本地：file:///srv/qface/_index.json
+        return Path(url2pathname(parsed.path)).read_text(encoding="utf-8")
+
     with urlopen(url, timeout=timeout) as resp:
         data = resp.read()
     return data.decode("utf-8")
 
 
-class EmojiCatalogService:
-    def __init__(self) -> None:
-        self._items: list[dict] = []
-        self._item_map: dict[str, dict] = {}
-        self._expires_at: datetime | None = None
-        self._lock = asyncio.Lock()
+def _parse_catalog(raw: object) -> list[dict]:
+    if not isinstance(raw, list):
+        raise ValueError("Emoji catalog root must be a list")
 
-    async def _fetch_catalog(self) -> tuple[list[dict], dict[str, dict]]:
-        text = await asyncio.to_thread(
-            _download_text,
-            settings.emoji_catalog_url,
-            settings.emoji_catalog_timeout_seconds,
-        )
-        raw = json.loads(text)
+    items: list[dict] = []
 
-        if not isinstance(raw, list):
-            raise ValueError("Emoji catalog root must be a list")
+    for row in raw:
+        emoji_id = str(row.get("emojiId") or "").strip()
+        is_hide = bool(row.get("isHide", False))
+        raw_assets = row.get("assets") or []
 
-        items: list[dict] = []
-        item_map: dict[str, dict] = {}
+        if not emoji_id:
+            continue
+        if is_hide:
+            continue
+        if not raw_assets:
+            continue
 
-        for row in raw:
-            emoji_id = str(row.get("emojiId") or "").strip()
-            is_hide = bool(row.get("isHide", False))
-            raw_assets = row.get("assets") or []
-
-            if not emoji_id:
-                continue
-            if is_hide:
-                continue
-            if not raw_assets:
+        assets: list[dict] = []
+        for asset in raw_assets:
+            path = str(asset.get("path") or "").strip()
+            if not path:
                 continue
 
-            assets: list[dict] = []
-            for asset in raw_assets:
-                path = str(asset.get("path") or "").strip()
-                if not path:
-                    continue
-
-                assets.append(
-                    {
-                        "type": int(asset.get("type", 0)),
-                        "name": str(asset.get("name") or ""),
-                        "path": path,
-                        "url": urljoin(settings.emoji_public_base_url.rstrip("/") + "/", path.lstrip("/")),
-                    }
-                )
+            assets.append(
+                {
+                    "type": int(asset.get("type", 0)),
+                    "name": str(asset.get("name") or ""),
+                    "path": path,
+                    "url": urljoin(settings.emoji_public_base_url.rstrip("/") + "/", path.lstrip("/")),
+                }
+            )
 
-            if not assets:
-                continue
+        if not assets:
+            continue
 
-            item = {
+        items.append(
+            {
                 "provider": EmojiProvider.QFACE,
                 "id": emoji_id,
                 "describe": row.get("describe") or None,
                 "assets": assets,
             }
-            items.append(item)
-            item_map[emoji_id] = item
+        )
 
-        return items, item_map
+    return items
 
-    async def _ensure_loaded(self) -> None:
-        now = datetime.now(timezone.utc)
 
-        if self._expires_at is not None and now < self._expires_at and self._items:
-            return
+class EmojiCatalogService:
+    def __init__(self, *, snapshot_path: Path | None = None) -> None:
+        self.snapshot_path = snapshot_path or settings.emoji_catalog_snapshot_path
+        self._items: list[dict] = []
+        self._item_map: dict[str, dict] = {}
+        self._encoded_list: bytes = b""
+        self._etag: str = ""
+        self._expires_at: datetime | None = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task[None] | None = None
 
+    def _set_items(self, items: list[dict], *, expires_at: datetime) -> None:
+        self._items = items
+        self._item_map = {item["id"]: item for item in items}
+        # 每个 catalog 版本只编码一次，列表接口直接返回这份字节和对应的 ETag
+        self._encoded_list = json.dumps(
+            {"items": items},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        self._etag = f'"{hashlib.sha256(self._encoded_list).hexdigest()[:32]}"'
+        self._expires_at = expires_at
+
+    async def _fetch_catalog(self) -> list[dict]:
+        text = await asyncio.to_thread(
+            _download_text,
+            settings.emoji_catalog_url,
+            settings.emoji_catalog_timeout_seconds,
+        )
+        return _parse_catalog(json.loads(text))
+
+    async def load_snapshot(self) -> bool:
+        try:
+            snapshot = await asyncio.to_thread(read_json_snapshot, self.snapshot_path)
+            if snapshot is None:
+                return False
+            if not isinstance(snapshot, dict):
+                raise ValueError("Emoji catalog snapshot root must be an object")
+            if snapshot.get("source_url") != settings.emoji_catalog_url:
+                # 切换了 catalog 来源，旧快照不再可信，按没有快照处理
+                logger.info(
+                    "emoji catalog snapshot ignored, source changed url=%s",
+                    settings.emoji_catalog_url,
+                    **log_extra(
+                        "emoji_catalog.snapshot_source_changed",
+                        url=settings.emoji_catalog_url,
+                    ),
+                )
+                return False
+            fetched_at = datetime.fromisoformat(snapshot["fetched_at"])
+            items = snapshot["items"]
+            if not isinstance(items, list) or not all(
+                isinstance(item, dict) and "id" in item for item in items
+            ):
+                raise ValueError("Emoji catalog snapshot items are malformed")
+        except Exception:  # noqa: BLE001
+            logger.warning(
+                "emoji catalog snapshot invalid path=%s",
+                self.snapshot_path,
+                exc_info=True,
+                **log_extra("emoji_catalog.snapshot_invalid", path=str(self.snapshot_path)),
+            )
+            return False
+
+        self._set_items(
+            items,
+            expires_at=fetched_at + timedelta(seconds=settings.emoji_catalog_cache_ttl_seconds),
+        )
+        logger.info(
+            "emoji catalog snapshot loaded count=%s fetched_at=%s",
+            len(self._items),
+            snapshot["fetched_at"],
+            **log_extra(
+                "emoji_catalog.snapshot_loaded",
+                count=len(self._items),
+                fetched_at=snapshot["fetched_at"],
+            ),
+        )
+        return True
+
+    async def refresh(self, *, force: bool = True) -> None:
         async with self._lock:
-            now = datetime.now(timezone.utc)
-            if self._expires_at is not None and now < self._expires_at and self._items:
+            if not force and self._items and not self._is_stale():
                 return
 
+            now = datetime.now(timezone.utc)
             try:
-                items, item_map = await self._fetch_catalog()
-                self._items = items
-                self._item_map = item_map
-                self._expires_at = now + timedelta(seconds=settings.emoji_catalog_cache_ttl_seconds)
+                items = await self._fetch_catalog()
             except Exception:
+                # 有旧数据时继续服务旧数据，稍后重试
                 if self._items:
-                    self._expires_at = now + timedelta(seconds=60)
-                    return
+                    self._expires_at = now + timedelta(seconds=FAILED_REFRESH_RETRY_SECONDS)
                 raise
 
+            self._set_items(
+                items,
+                expires_at=now + timedelta(seconds=settings.emoji_catalog_cache_ttl_seconds),
+            )
+            await asyncio.to_thread(
+                write_json_snapshot,
+                self.snapshot_path,
+                {
+                    "source_url": settings.emoji_catalog_url,
+                    "fetched_at": now.isoformat(),
+                    "items": items,
+                },
+            )
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await self.refresh()
+        except Exception:  # noqa: BLE001
+            logger.warning(
+                "emoji catalog refresh failed url=%s",
+                settings.emoji_catalog_url,
+                exc_info=True,
+                **log_extra("emoji_catalog.refresh_failed", url=settings.emoji_catalog_url),
+            )
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        # 刷新由首个读到过期数据的请求触发，不能继承该请求的 contextvars（SQL 统计、日志 request_id）
+        self._refresh_task = asyncio.create_task(
+            self._refresh_in_background(),
+            context=contextvars.Context(),
+        )
+
+    def _is_stale(self) -> bool:
+        return self._expires_at is None or datetime.now(timezone.utc) >= self._expires_at
+
+    async def start(self) -> None:
+        await self.load_snapshot()
+        if self._is_stale():
+            self._schedule_refresh()
+
+    async def stop(self) -> None:
+        task = self._refresh_task
+        self._refresh_task = None
+        if task is None or task.done():
+            return
+
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _ensure_loaded(self) -> None:
+        if self._items:
+            # stale-while-revalidate：请求始终读内存，过期只触发后台刷新
+            if self._is_stale():
+                self._schedule_refresh()
+            return
+
+        # 既没有快照也没有成功拉取过时，只能在请求路径上等待首次加载
+        await self.refresh(force=False)
+
     async def get_visible_emojis(self) -> list[dict]:
         await self._ensure_loaded()
         return list(self._items)
 
+    async def get_encoded_emoji_list(self) -> tuple[bytes, str]:
+        await self._ensure_loaded()
+        return self._encoded_list, self._etag
+
     async def get_emoji(self, emoji_id: str) -> dict | None:
         await self._ensure_loaded()
-        return self._item_map.get(emoji_id)
\ No newline at end of file
+        return self._item_map.get(emoji_id)
+
+    async def get_emojis_by_ids(self, emoji_ids: list[str]) -> list[dict]:
+        await self._ensure_loaded()
+        item_map = self._item_map
+        return [item_map[emoji_id] for emoji_id in emoji_ids if emoji_id in item_map]
+
+
+# 进程内共享同一份 catalog，避免每个 MediaService 各自下载和缓存
+emoji_catalog_service = EmojiCatalogService()
@@ -0,0 +1,157 @@
+import asyncio
+import contextvars
+import logging
+from datetime import datetime, timezone
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.logging import log_extra
+from app.core.metrics import emoji_usage_flush_rows
+from app.modules.media.constants import EmojiProvider
+from app.modules.media.repository import MediaRepository
+
+settings = get_settings()
+logger = logging.getLogger("app.media.emoji_usage_recorder")
+
+# 单条 upsert 语句的行数上限，避免超出 SQLite 的绑定参数个数限制
+FLUSH_CHUNK_SIZE = 500
+
+# (user_id, provider) -> emoji_id -> 最近使用时间
+PendingUsages = dict[tuple[int, str], dict[str, datetime]]
+
+
+class EmojiUsageRecorder:
+    def __init__(self) -> None:
+        self.repo = MediaRepository()
+        self.flush_interval_seconds = settings.emoji_usage_flush_interval_ms / 1000
+        self.max_pending = settings.emoji_usage_flush_max_pending
+        self._pending: PendingUsages = {}
+        self._pending_count = 0
+        # 已从 _pending 取出、正在写库的批次；写完前查询仍要能看到
+        self._flushing: list[PendingUsages] = []
+        self._task: asyncio.Task[None] | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._stopping = False
+
+    def record(
+        self,
+        *,
+        user_id: int,
+        emoji_ids: list[str],
+        provider: str = EmojiProvider.QFACE,
+    ) -> None:
+        if not emoji_ids:
+            return
+
+        now = datetime.now(timezone.utc)
+        usages = self._pending.setdefault((user_id, provider), {})
+        for emoji_id in emoji_ids:
+            if emoji_id not in usages:
+                self._pending_count += 1
+            usages[emoji_id] = now
+
+        wakeup = self._ensure_worker()
+        if self._pending_count >= self.max_pending:
+            wakeup.set()
+
+    def get_pending_emoji_ids(
+        self,
+        *,
+        user_id: int,
+        provider: str = EmojiProvider.QFACE,
+    ) -> list[str]:
+        # 按最近使用时间倒序，同一表情取最新的一次
+        merged: dict[str, datetime] = {}
+        for pending in [*self._flushing, self._pending]:
+            for emoji_id, used_at in pending.get((user_id, provider), {}).items():
+                if emoji_id not in merged or used_at > merged[emoji_id]:
+                    merged[emoji_id] = used_at
+        return sorted(merged, key=merged.__getitem__, reverse=True)
+
+    def _ensure_worker(self) -> asyncio.Event:
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            # 后台写库跨越多个请求，不能继承首个请求的 contextvars（SQL 统计、日志 request_id）
+            self._task = asyncio.create_task(
+                self._run(self._wakeup),
+                context=contextvars.Context(),
+            )
+        return self._wakeup
+
+    async def _run(self, wakeup: asyncio.Event) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=self.flush_interval_seconds)
+            except TimeoutError:
+                pass
+            wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+
+        pending = self._pending
+        self._pending = {}
+        self._pending_count = 0
+        self._flushing.append(pending)
+
+        rows = [
+            {
+                "user_id": user_id,
+                "provider": provider,
+                "emoji_id": emoji_id,
+                "last_used_at": used_at,
+            }
+            for (user_id, provider), usages in pending.items()
+            for emoji_id, used_at in usages.items()
+        ]
+        try:
+            async with AsyncSessionLocal() as db:
+                for start in range(0, len(rows), FLUSH_CHUNK_SIZE):
+                    await self.repo.upsert_user_emoji_usages(
+                        db,
+                        rows=rows[start:start + FLUSH_CHUNK_SIZE],
+                    )
+                await db.commit()
+        except Exception:  # noqa: BLE001
+            logger.warning(
+                "emoji usage flush failed rows=%s, keeping them for the next flush",
+                len(rows),
+                exc_info=True,
+                **log_extra("media.emoji_usage_flush_failed", rows=len(rows)),
+            )
+            self._restore(pending)
+            return 0
+        finally:
+            self._flushing.remove(pending)
+
+        emoji_usage_flush_rows.observe(len(rows))
+        return len(rows)
+
+    def _restore(self, pending: PendingUsages) -> None:
+        # 写库期间同一表情可能又被使用，保留更新的时间
+        for key, usages in pending.items():
+            current = self._pending.setdefault(key, {})
+            for emoji_id, used_at in usages.items():
+                if emoji_id not in current:
+                    self._pending_count += 1
+                    current[emoji_id] = used_at
+                elif used_at > current[emoji_id]:
+                    current[emoji_id] = used_at
+
+    async def stop(self) -> None:
+        task = self._task
+        self._task = None
+        if task is not None and not task.done():
+            self._stopping = True
+            self._wakeup.set()
+            await task
+
+        # 停机前把剩余的使用记录写完
+        await self.flush()
+
+
+# 进程内共享同一份聚合缓冲，不同请求的使用记录才能合并写入
+emoji_usage_recorder = EmojiUsageRecorder()
@@ -20,6 +20,13 @@ class MediaAsset(Base):
     __tablename__ = "media_assets"
     __table_args__ = (
         UniqueConstraint("asset_type", "storage_key", name="uq_media_assets_asset_type_storage_key"),
+        # 过期清理任务按 expires_at 顺序批量取 active 图片
+        Index(
+            "idx_media_assets_asset_type_status_expires_at",
+            "asset_type",
+            "status",
+            "expires_at",
+        ),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -65,6 +72,16 @@ class MediaAsset(Base):
 
 class UserAvatarAsset(Base):
     __tablename__ = "user_avatar_assets"
+    __table_args__ = (
+        # 批量取头像按 (user_id, id) 倒序取每人最新一条；覆盖 media_asset_id 以免回表
+        Index(
+            "idx_user_avatar_assets_user_id_is_deleted_id",
+            "user_id",
+            "is_deleted",
+            "id",
+            "media_asset_id",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
@@ -72,7 +89,6 @@ class UserAvatarAsset(Base):
         Integer,
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     media_asset_id: Mapped[int] = mapped_column(
         Integer,
@@ -180,7 +196,12 @@ class UserEmojiUsage(Base):
     __tablename__ = "user_emoji_usages"
     __table_args__ = (
         UniqueConstraint("user_id", "provider", "emoji_id", name="uq_user_emoji_usages_user_provider_emoji"),
-        Index("idx_user_emoji_usages_user_id_last_used_at", "user_id", "last_used_at"),
+        Index(
+            "idx_user_emoji_usages_user_id_provider_last_used_at",
+            "user_id",
+            "provider",
+            "last_used_at",
+        ),
         Index("idx_user_emoji_usages_emoji_id", "emoji_id"),
     )
 
@@ -1,6 +1,7 @@
 import datetime
 
 from sqlalchemy import delete, desc, func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.modules.media.constants import MediaAssetStatus, MediaAssetType
@@ -389,7 +390,7 @@ class MediaRepository:
                 MediaAsset.asset_type == MediaAssetType.AVATAR,
                 MediaAsset.status == MediaAssetStatus.ACTIVE,
             )
-            .order_by(UserAvatarAsset.user_id.asc(), UserAvatarAsset.id.desc())
+            .order_by(UserAvatarAsset.user_id.desc(), UserAvatarAsset.id.desc())
         )
         return list(result.all())
 
@@ -421,7 +422,7 @@ class MediaRepository:
                 MediaAsset.expires_at.is_not(None),
                 MediaAsset.expires_at <= now,
             )
-            .order_by(MediaAsset.id.asc())
+            .order_by(MediaAsset.expires_at.asc(), MediaAsset.id.asc())
             .limit(limit)
         )
         return list(result.scalars().all())
@@ -441,60 +442,32 @@ class MediaRepository:
             .values(status=MediaAssetStatus.EXPIRED)
         )
 
-    async def find_user_emoji_usage(
-        self,
-        db: AsyncSession,
-        *,
-        user_id: int,
-        provider: str,
-        emoji_id: str,
-    ) -> UserEmojiUsage | None:
-        result = await db.execute(
-            select(UserEmojiUsage).where(
-                UserEmojiUsage.user_id == user_id,
-                UserEmojiUsage.provider == provider,
-                UserEmojiUsage.emoji_id == emoji_id,
-            )
-        )
-        return result.scalar_one_or_none()
-
-    async def create_user_emoji_usage(
-        self,
-        db: AsyncSession,
-        *,
-        user_id: int,
-        provider: str,
-        emoji_id: str,
-        last_used_at: datetime.datetime,
-    ) -> UserEmojiUsage:
-        row = UserEmojiUsage(
-            user_id=user_id,
-            provider=provider,
-            emoji_id=emoji_id,
-            last_used_at=last_used_at,
-        )
-        db.add(row)
-        await db.flush()
-        await db.refresh(row)
-        return row
-
-    async def touch_user_emoji_usage_last_used_at(
+    async def upsert_user_emoji_usages(
         self,
         db: AsyncSession,
         *,
-        user_id: int,
-        provider: str,
-        emoji_id: str,
-        last_used_at: datetime.datetime,
+        rows: list[dict],
     ) -> None:
+        if not rows:
+            return
+
+        stmt = sqlite_insert(UserEmojiUsage).values(rows)
+        # 多个进程各自聚合时写入顺序不定，只让更晚的使用时间覆盖已有记录
         await db.execute(
-            update(UserEmojiUsage)
-            .where(
-                UserEmojiUsage.user_id == user_id,
-                UserEmojiUsage.provider == provider,
-                UserEmojiUsage.emoji_id == emoji_id,
+            stmt.on_conflict_do_update(
+                index_elements=[
+                    UserEmojiUsage.user_id,
+                    UserEmojiUsage.provider,
+                    UserEmojiUsage.emoji_id,
+                ],
+                set_={
+                    "last_used_at": func.max(
+                        UserEmojiUsage.last_used_at,
+                        stmt.excluded.last_used_at,
+                    ),
+                    "updated_at": func.now(),
+                },
             )
-            .values(last_used_at=last_used_at)
         )
 
     async def get_recent_user_emoji_usages(
@@ -9,6 +9,8 @@ class MediaAssetUploadResponse(BaseModel):
     url: str
     mime_type: str
     file_size: int
+    width: int | None = None
+    height: int | None = None
     status: str
 
 
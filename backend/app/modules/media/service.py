@@ -13,7 +13,9 @@ from app.modules.media.constants import (
     MediaAssetType,
     StickerLibrarySource,
 )
-from app.modules.media.emoji_catalog import EmojiCatalogService
+from app.modules.media.avatar_key_cache import avatar_key_cache
+from app.modules.media.emoji_catalog import emoji_catalog_service
+from app.modules.media.emoji_usage_recorder import emoji_usage_recorder
 from app.modules.media.models import MediaAsset
 from app.modules.media.repository import MediaRepository
 from app.modules.media.storage import MediaStorageService
@@ -26,7 +28,9 @@ class MediaService:
     def __init__(self) -> None:
         self.repo = MediaRepository()
         self.storage = MediaStorageService()
-        self.emoji_catalog = EmojiCatalogService()
+        self.emoji_catalog = emoji_catalog_service
+        self.avatar_key_cache = avatar_key_cache
+        self.emoji_usage_recorder = emoji_usage_recorder
 
     def _normalize_datetime_to_utc_aware(self, value: datetime | None) -> datetime | None:
         if value is None:
@@ -108,6 +112,7 @@ class MediaService:
             media_asset_id=asset.id,
         )
 
+        self.avatar_key_cache.invalidate_on_commit(db, user.id)
         user.avatar_key = asset.storage_key
         return asset
 
@@ -506,10 +511,8 @@ class MediaService:
         db: AsyncSession,
         user_id: int,
     ) -> str | None:
-        asset = await self.repo.find_active_avatar_asset_by_user_id(db, user_id)
-        if not asset:
-            return None
-        return asset.storage_key
+        avatar_key_map = await self.get_user_avatar_storage_key_map(db, [user_id])
+        return avatar_key_map[user_id]
 
     async def get_user_avatar_storage_key_map(
         self,
@@ -519,14 +522,21 @@ class MediaService:
         if not user_ids:
             return {}
 
-        rows = await self.repo.find_active_avatar_storage_keys_by_user_ids(db, user_ids)
+        generation = self.avatar_key_cache.generation
+        avatar_key_map, missing_user_ids = self.avatar_key_cache.get_many(user_ids)
+        if not missing_user_ids:
+            return avatar_key_map
+
+        rows = await self.repo.find_active_avatar_storage_keys_by_user_ids(db, missing_user_ids)
 
-        avatar_key_map: dict[int, str | None] = {user_id: None for user_id in user_ids}
+        loaded: dict[int, str | None] = {user_id: None for user_id in missing_user_ids}
 
         for user_id, storage_key in rows:
-            if avatar_key_map[user_id] is None:
-                avatar_key_map[user_id] = storage_key
+            if loaded[user_id] is None:
+                loaded[user_id] = storage_key
 
+        self.avatar_key_cache.set_many(loaded, generation=generation)
+        avatar_key_map.update(loaded)
         return avatar_key_map
 
     async def get_media_assets_by_ids(
@@ -609,6 +619,9 @@ class MediaService:
     async def get_visible_emojis(self) -> list[dict]:
         return await self.emoji_catalog.get_visible_emojis()
 
+    async def get_encoded_visible_emojis(self) -> tuple[bytes, str]:
+        return await self.emoji_catalog.get_encoded_emoji_list()
+
     async def get_emoji(self, emoji_id: str) -> dict | None:
         return await self.emoji_catalog.get_emoji(emoji_id)
 
@@ -622,39 +635,18 @@ class MediaService:
             )
         return emoji
 
-    async def touch_user_emoji_usage_in_tx(
+    def record_user_emoji_usages(
         self,
-        db: AsyncSession,
         *,
         user_id: int,
-        emoji_id: str,
+        emoji_ids: list[str],
         provider: str = EmojiProvider.QFACE,
     ) -> None:
-        # This helper participates in the caller's transaction and does not commit.
-        now = datetime.now(timezone.utc)
-
-        usage = await self.repo.find_user_emoji_usage(
-            db,
+        # 只写入内存聚合缓冲，由后台定期批量落库，不占用调用方的事务
+        self.emoji_usage_recorder.record(
             user_id=user_id,
+            emoji_ids=emoji_ids,
             provider=provider,
-            emoji_id=emoji_id,
-        )
-        if usage is None:
-            await self.repo.create_user_emoji_usage(
-                db,
-                user_id=user_id,
-                provider=provider,
-                emoji_id=emoji_id,
-                last_used_at=now,
-            )
-            return
-
-        await self.repo.touch_user_emoji_usage_last_used_at(
-            db,
-            user_id=user_id,
-            provider=provider,
-            emoji_id=emoji_id,
-            last_used_at=now,
         )
 
     async def get_recent_emojis(
@@ -665,21 +657,24 @@ class MediaService:
         provider: str = EmojiProvider.QFACE,
         limit: int = 20,
     ) -> list[dict]:
-        usages = await self.repo.get_recent_user_emoji_usages(
-            db,
+        # 尚未落库的使用记录一定比库里的新，排在前面
+        emoji_ids = self.emoji_usage_recorder.get_pending_emoji_ids(
             user_id=user_id,
             provider=provider,
-            limit=limit,
-        )
-
-        items: list[dict] = []
-        for usage in usages:
-            emoji = await self.get_emoji(usage.emoji_id)
-            if emoji is None:
-                continue
-            items.append(emoji)
+        )[:limit]
+        if len(emoji_ids) < limit:
+            usages = await self.repo.get_recent_user_emoji_usages(
+                db,
+                user_id=user_id,
+                provider=provider,
+                limit=limit,
+            )
+            pending_ids = set(emoji_ids)
+            emoji_ids += [
+                usage.emoji_id for usage in usages if usage.emoji_id not in pending_ids
+            ][: limit - len(emoji_ids)]
 
-        return items
+        return await self.emoji_catalog.get_emojis_by_ids(emoji_ids)
 
     async def validate_message_image_asset(
         self,
@@ -10,6 +10,7 @@ from app.core.config import get_settings
 from app.core.error_reasons import ErrorReason
 from app.core.exceptions import BadRequestError
 from app.modules.media.constants import MediaAssetType
+from app.modules.media.derivatives import media_derivative_pipeline
 
 settings = get_settings()
 
@@ -38,6 +39,8 @@ class PreparedUploadFile:
 
 
 class MediaStorageService:
+    derivatives = media_derivative_pipeline
+
     AVATAR_ALLOWED_TYPES = {"image/png", "image/jpeg", "image/webp"}
     AVATAR_ALLOWED_EXTS = {".png", ".jpg", ".jpeg", ".webp"}
 
@@ -143,14 +146,18 @@ class MediaStorageService:
                 details={"asset_type": asset_type},
             )
 
+        # 尺寸在线程中读取图片文件头，不依赖衍生图进程池；供客户端预留布局和挑选衍生图宽度
+        size = await self.derivatives.probe_size(content=content, mime_type=content_type)
+        width, height = size or (None, None)
+
         return PreparedUploadFile(
             content=content,
             mime_type=content_type,
             file_size=len(content),
             sha256=hashlib.sha256(content).hexdigest(),
             ext=ext,
-            width=None,
-            height=None,
+            width=width,
+            height=height,
             duration_seconds=None,
         )
 
@@ -218,3 +225,4 @@ class MediaStorageService:
         path = self.get_file_path(asset_type=asset_type, storage_key=storage_key)
         if path.exists():
             path.unlink()
+        self.derivatives.delete_variants(asset_type=asset_type, storage_key=storage_key)
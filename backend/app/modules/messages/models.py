@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -10,6 +10,12 @@ from app.modules.users.models import User
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # 按房间倒序翻页：room_id 过滤 + id 排序 / id < before_id
+        Index("idx_messages_room_id_id", "room_id", "id"),
+    )
+    # INSERT 时用 RETURNING 带回 created_at / updated_at，写入后无需再 refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
 
@@ -28,7 +34,6 @@ class Message(Base):
         Integer,
         ForeignKey("rooms.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
 
     created_at: Mapped[datetime] = mapped_column(
@@ -22,9 +22,18 @@ class MessageRepository:
         )
         db.add(message)
         await db.flush()
-        await db.refresh(message)
         return message
 
+    async def create_messages(
+        self,
+        db: AsyncSession,
+        *,
+        messages: list[Message],
+    ) -> list[Message]:
+        db.add_all(messages)
+        await db.flush()
+        return messages
+
     async def create_message_resource_refs(
         self,
         db: AsyncSession,
@@ -45,18 +54,6 @@ class MessageRepository:
         db.add_all(rows)
         await db.flush()
 
-    async def find_message_by_id(
-        self,
-        db: AsyncSession,
-        message_id: int,
-    ) -> Message | None:
-        result = await db.execute(
-            select(Message)
-            .where(Message.id == message_id)
-            .options(selectinload(Message.sender))
-        )
-        return result.scalar_one_or_none()
-
     async def get_messages_by_room_id(
         self,
         db: AsyncSession,
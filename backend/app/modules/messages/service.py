@@ -2,9 +2,11 @@ import json
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
 from app.core.error_reasons import ErrorReason
-from app.core.exceptions import ForbiddenError, NotFoundError
+from app.core.exceptions import ForbiddenError
 from app.modules.media.constants import MediaAssetStatus, MediaAssetType
+from app.modules.media.models import MediaAsset
 from app.modules.media.service import MediaService
 from app.modules.messages.models import Message
 from app.modules.messages.repository import MessageRepository
@@ -23,22 +25,29 @@ from app.modules.messages.schemas import (
     TextSegmentIn,
     TextSegmentOut,
 )
+from app.modules.messages.write_batcher import (
+    PendingMessageWrite,
+    message_write_batcher,
+)
 from app.modules.rooms.constants import RoomPermission
-from app.modules.rooms.membership.service import RoomMembershipService
 from app.modules.rooms.permissions import require_room_permission
 from app.modules.rooms.room.service import RoomService
 from app.modules.users.models import User
 from app.modules.users.schemas import UserResponse
 from app.modules.users.service import UserService
 
+settings = get_settings()
+
 
 class MessageService:
     def __init__(self) -> None:
         self.repo = MessageRepository()
         self.media_service = MediaService()
         self.room_service = RoomService()
-        self.membership_service = RoomMembershipService()
         self.user_service = UserService()
+        self.write_batcher = (
+            message_write_batcher if settings.message_write_batch_window_ms > 0 else None
+        )
 
     async def create_message(
         self,
@@ -55,43 +64,53 @@ class MessageService:
             permission=RoomPermission.SEND_MESSAGE,
         )
 
-        media_asset_ids = await self._validate_message_content(
+        asset_map, used_emoji_ids = await self._validate_message_content(
             db,
             user=user,
             content=payload.content,
         )
+        await self.user_service.hydrate_user_avatar_key(db, user)
+
+        write = PendingMessageWrite(
+            room_id=room_id,
+            sender_user_id=user.id,
+            content=self._dump_content(payload.content),
+            media_asset_ids=sorted(asset_map),
+        )
+        if self.write_batcher is not None:
+            # 与并发请求的消息合并到同一事务提交，返回时消息已落盘
+            message = await self.write_batcher.submit(write)
+        else:
+            message = await self._write_message(db, write)
+
+        # 表情使用记录由后台聚合后批量写库，不拉长消息提交
+        self.media_service.record_user_emoji_usages(
+            user_id=user.id,
+            emoji_ids=sorted(used_emoji_ids),
+        )
 
-        content = self._dump_content(payload.content)
+        # 发送者和资源都已在校验阶段取到，提交后不再回查
+        content = self._apply_content_urls(self._load_content(write.content), asset_map)
+        return self._build_message_response(message, sender=user, content=content)
 
+    async def _write_message(self, db: AsyncSession, write: PendingMessageWrite) -> Message:
         message = await self.repo.create_message(
             db,
-            content=content,
-            sender_user_id=user.id,
-            room_id=room_id,
+            content=write.content,
+            sender_user_id=write.sender_user_id,
+            room_id=write.room_id,
         )
         message_id = message.id
 
-        if media_asset_ids:
+        if write.media_asset_ids:
             await self.repo.create_message_resource_refs(
                 db,
                 message_id=message_id,
-                media_asset_ids=sorted(media_asset_ids),
+                media_asset_ids=write.media_asset_ids,
             )
 
         await db.commit()
-
-        message = await self.repo.find_message_by_id(db, message_id)
-        if message is None:
-            raise NotFoundError(
-                "Message not found",
-                reason=ErrorReason.MESSAGE_NOT_FOUND,
-                details={"message_id": message_id},
-            )
-
-        if message.sender is not None:
-            await self.user_service.hydrate_user_avatar_key(db, message.sender)
-
-        return await self._build_message_response(db, message)
+        return message
 
     async def get_messages(
         self,
@@ -132,7 +151,10 @@ class MessageService:
 
         items = []
         for message in reversed(messages):
-            items.append(await self._build_message_response(db, message))
+            content = await self._enrich_content_urls(db, self._load_content(message.content))
+            items.append(
+                self._build_message_response(message, sender=message.sender, content=content)
+            )
 
         return MessageListResponse(
             items=items,
@@ -147,9 +169,7 @@ class MessageService:
         user_id: int,
         permission: RoomPermission,
     ) -> None:
-        await self.room_service.get_room_by_id(db, room_id)
-
-        role = await self.membership_service.find_room_role(
+        role = await self.room_service.get_room_role(
             db,
             room_id=room_id,
             user_id=user_id,
@@ -169,8 +189,8 @@ class MessageService:
         *,
         user: User,
         content: MessageContentIn,
-    ) -> set[int]:
-        media_asset_ids: set[int] = set()
+    ) -> tuple[dict[int, MediaAsset], set[str]]:
+        asset_map: dict[int, MediaAsset] = {}
         used_emoji_ids: set[str] = set()
 
         for segment in content.segments:
@@ -183,32 +203,23 @@ class MessageService:
                 continue
 
             if isinstance(segment, ImageSegmentIn):
-                await self.media_service.validate_message_image_asset(
+                asset_map[segment.id] = await self.media_service.validate_message_image_asset(
                     db,
                     asset_id=segment.id,
                 )
-                media_asset_ids.add(segment.id)
                 continue
 
             if isinstance(segment, StickerSegmentIn):
-                await self.media_service.validate_message_sticker_asset(
+                asset_map[segment.id] = await self.media_service.validate_message_sticker_asset(
                     db,
                     asset_id=segment.id,
                     user_id=user.id,
                 )
-                media_asset_ids.add(segment.id)
                 continue
 
             raise ValueError(f"Unsupported segment type: {segment.type}")
 
-        for emoji_id in used_emoji_ids:
-            await self.media_service.touch_user_emoji_usage_in_tx(
-                db,
-                user_id=user.id,
-                emoji_id=emoji_id,
-            )
-
-        return media_asset_ids
+        return asset_map, used_emoji_ids
 
     def _dump_content(self, content: MessageContentIn) -> str:
         return json.dumps(content.model_dump(mode="json"), ensure_ascii=False)
@@ -233,19 +244,18 @@ class MessageService:
 
         return MessageContentOut(segments=segments)
 
-    async def _build_message_response(
+    def _build_message_response(
         self,
-        db: AsyncSession,
         message: Message,
+        *,
+        sender: User | None,
+        content: MessageContentOut,
     ) -> MessageResponse:
-        content = self._load_content(message.content)
-        content = await self._enrich_content_urls(db, content)
-
         return MessageResponse(
             id=message.id,
             room_id=message.room_id,
             sender_user_id=message.sender_user_id,
-            sender=UserResponse.model_validate(message.sender) if message.sender is not None else None,
+            sender=UserResponse.model_validate(sender) if sender is not None else None,
             content=content,
             created_at=message.created_at,
             updated_at=message.updated_at,
@@ -269,8 +279,13 @@ class MessageService:
             db,
             list(asset_ids),
         )
-        asset_map = {asset.id: asset for asset in assets}
+        return self._apply_content_urls(content, {asset.id: asset for asset in assets})
 
+    def _apply_content_urls(
+        self,
+        content: MessageContentOut,
+        asset_map: dict[int, MediaAsset],
+    ) -> MessageContentOut:
         for segment in content.segments:
             if isinstance(segment, ImageSegmentOut):
                 asset = asset_map.get(segment.id)
@@ -0,0 +1,160 @@
+import asyncio
+import contextvars
+import logging
+from dataclasses import dataclass, field
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.logging import log_extra
+from app.core.metrics import message_write_batch_size
+from app.modules.messages.models import Message
+from app.modules.messages.repository import MessageRepository
+
+settings = get_settings()
+logger = logging.getLogger("app.messages.write_batcher")
+
+
+@dataclass
+class PendingMessageWrite:
+    room_id: int
+    sender_user_id: int
+    content: str
+    media_asset_ids: list[int] = field(default_factory=list)
+
+
+QueuedWrite = tuple[PendingMessageWrite, asyncio.Future[Message]]
+
+
+def _resolve(future: asyncio.Future[Message], message: Message) -> None:
+    # 调用方请求被取消时 future 已结束，消息照常落盘
+    if not future.done():
+        future.set_result(message)
+
+
+def _reject(future: asyncio.Future[Message], exc: BaseException) -> None:
+    if not future.done():
+        future.set_exception(exc)
+
+
+class MessageWriteBatcher:
+    def __init__(self) -> None:
+        self.repo = MessageRepository()
+        self.window_seconds = settings.message_write_batch_window_ms / 1000
+        self.max_batch_size = settings.message_write_batch_max_size
+        self._queue: asyncio.Queue[QueuedWrite | None] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._stopping = asyncio.Event()
+
+    async def submit(self, write: PendingMessageWrite) -> Message:
+        # 只有所在批次提交成功后才返回已落盘的消息，持久化语义与单条提交一致
+        future: asyncio.Future[Message] = asyncio.get_running_loop().create_future()
+        self._ensure_worker().put_nowait((write, future))
+        return await future
+
+    def _ensure_worker(self) -> asyncio.Queue[QueuedWrite | None]:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._task is None or self._task.done():
+            self._stopping.clear()
+            # 工作协程跨越多个请求，不能继承首个请求的 contextvars（SQL 统计、日志 request_id）
+            self._task = asyncio.create_task(
+                self._run(self._queue),
+                context=contextvars.Context(),
+            )
+        return self._queue
+
+    async def _run(self, queue: asyncio.Queue[QueuedWrite | None]) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+
+            if queue.qsize() < self.max_batch_size - 1:
+                await self._wait_window()
+
+            batch = [item]
+            stopping = False
+            while len(batch) < self.max_batch_size and not queue.empty():
+                item = queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _wait_window(self) -> None:
+        # 停机时不再等满窗口，立即提交已收集的消息
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=self.window_seconds)
+        except TimeoutError:
+            pass
+
+    async def _flush(self, batch: list[QueuedWrite]) -> None:
+        message_write_batch_size.observe(len(batch))
+        try:
+            messages = await self._commit([write for write, _ in batch])
+        except Exception as exc:  # noqa: BLE001
+            if len(batch) == 1:
+                _reject(batch[0][1], exc)
+                return
+
+            logger.warning(
+                "message write batch failed size=%s, retrying one by one",
+                len(batch),
+                exc_info=True,
+                **log_extra("messages.write_batch_failed", size=len(batch)),
+            )
+            # 单条失败不能连累同批次的其他消息
+            for write, future in batch:
+                try:
+                    [message] = await self._commit([write])
+                except Exception as single_exc:  # noqa: BLE001
+                    _reject(future, single_exc)
+                else:
+                    _resolve(future, message)
+            return
+
+        for (_, future), message in zip(batch, messages, strict=True):
+            _resolve(future, message)
+
+    async def _commit(self, writes: list[PendingMessageWrite]) -> list[Message]:
+        async with AsyncSessionLocal() as db:
+            messages = await self.repo.create_messages(
+                db,
+                messages=[
+                    Message(
+                        content=write.content,
+                        sender_user_id=write.sender_user_id,
+                        room_id=write.room_id,
+                    )
+                    for write in writes
+                ],
+            )
+
+            for write, message in zip(writes, messages, strict=True):
+                await self.repo.create_message_resource_refs(
+                    db,
+                    message_id=message.id,
+                    media_asset_ids=write.media_asset_ids,
+                )
+
+            await db.commit()
+            return messages
+
+    async def stop(self) -> None:
+        task = self._task
+        self._task = None
+        if task is None or task.done():
+            return
+
+        # 停机前写完已排队的消息，所有等待中的调用方都会拿到结果
+        self._stopping.set()
+        self._queue.put_nowait(None)
+        await task
+
+
+# 进程内共享同一个写入队列，才能把不同请求的消息合并到一次提交
+message_write_batcher = MessageWriteBatcher()
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -12,6 +12,14 @@ from app.modules.notifications.constants import (
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("idx_notifications_recipient_user_id_is_read", "recipient_user_id", "is_read"),
+        Index(
+            "idx_notifications_recipient_user_id_created_at",
+            "recipient_user_id",
+            "created_at",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
@@ -19,7 +27,6 @@ class Notification(Base):
         Integer,
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     actor_user_id: Mapped[int | None] = mapped_column(
         Integer,
@@ -1,4 +1,4 @@
-from sqlalchemy import func, select, update
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -28,6 +28,17 @@ class NotificationRepository:
         await db.refresh(notification)
         return notification
 
+    async def create_notifications(
+        self,
+        db: AsyncSession,
+        *,
+        values: list[dict[str, object]],
+    ) -> None:
+        if not values:
+            return
+
+        await db.execute(insert(Notification), values)
+
     async def find_notification_by_id(
         self,
         db: AsyncSession,
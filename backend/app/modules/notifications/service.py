@@ -103,6 +103,27 @@ class NotificationService:
             related_id=payload.related_id,
         )
 
+    async def create_notifications_in_tx(
+        self,
+        db: AsyncSession,
+        *,
+        payloads: list[NotificationCreate],
+    ) -> None:
+        # This helper participates in the caller's transaction and does not commit.
+        await self.repo.create_notifications(
+            db,
+            values=[
+                {
+                    "recipient_user_id": payload.recipient_user_id,
+                    "actor_user_id": payload.actor_user_id,
+                    "notification_type": payload.notification_type.value,
+                    "related_type": payload.related_type.value if payload.related_type else None,
+                    "related_id": payload.related_id,
+                }
+                for payload in payloads
+            ],
+        )
+
     async def create_notification(
         self,
         db: AsyncSession,
@@ -47,6 +47,13 @@ class RoomActiveSyncPermission(StrEnum):
     ALL_MEMBERS = "all_members"
 
 
+# 自动同步卡顿迟滞的默认值与上限（毫秒）
+DEFAULT_STALL_MIN_DURATION_MS = 500
+DEFAULT_READY_MIN_DURATION_MS = 1000
+DEFAULT_STALL_FLAP_PENALTY_MS = 1000
+MAX_STALL_HYSTERESIS_MS = 30000
+
+
 class RoomJoinRequestSource(StrEnum):
     APPLY = "apply"
     INVITE = "invite"
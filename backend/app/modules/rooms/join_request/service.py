@@ -98,16 +98,13 @@ class RoomJoinRequestService:
             db,
             room_id=room_id,
             permission=RoomPermission.REVIEW_JOIN_REQUEST,
+            exclude_user_id=user.id,
+        )
+        await self._send_room_join_request_notifications(
+            db,
+            recipient_user_ids=reviewer_user_ids,
+            request_id=request.id,
         )
-
-        for reviewer_user_id in reviewer_user_ids:
-            if reviewer_user_id == user.id:
-                continue
-            await self._send_room_join_request_notification(
-                db,
-                recipient_user_id=reviewer_user_id,
-                request_id=request.id,
-            )
 
         await db.commit()
         await db.refresh(request)
@@ -172,27 +169,22 @@ class RoomJoinRequestService:
             room_action_by_user_id=room_action_by_user_id,
         )
 
-        await self._send_room_join_request_notification(
-            db,
-            recipient_user_id=target_user_id,
-            request_id=request.id,
-        )
-
+        recipient_user_ids = [target_user_id]
         if not can_review:
-            reviewer_user_ids = await self.membership_service.get_room_user_ids_by_permission(
-                db,
-                room_id=room_id,
-                permission=RoomPermission.REVIEW_JOIN_REQUEST,
-            )
-
-            for reviewer_user_id in reviewer_user_ids:
-                if reviewer_user_id == user.id:
-                    continue
-                await self._send_room_join_request_notification(
+            recipient_user_ids.extend(
+                await self.membership_service.get_room_user_ids_by_permission(
                     db,
-                    recipient_user_id=reviewer_user_id,
-                    request_id=request.id,
+                    room_id=room_id,
+                    permission=RoomPermission.REVIEW_JOIN_REQUEST,
+                    exclude_user_id=user.id,
                 )
+            )
+
+        await self._send_room_join_request_notifications(
+            db,
+            recipient_user_ids=recipient_user_ids,
+            request_id=request.id,
+        )
 
         await db.commit()
         await db.refresh(request)
@@ -546,22 +538,25 @@ class RoomJoinRequestService:
             permission=RoomPermission.REVIEW_JOIN_REQUEST,
         )
 
-    async def _send_room_join_request_notification(
+    async def _send_room_join_request_notifications(
         self,
         db: AsyncSession,
         *,
-        recipient_user_id: int,
+        recipient_user_ids: list[int],
         request_id: int,
     ) -> None:
-        await self.notification_service.create_notification_in_tx(
+        await self.notification_service.create_notifications_in_tx(
             db,
-            payload=NotificationCreate(
-                recipient_user_id=recipient_user_id,
-                actor_user_id=None,
-                notification_type=NotificationType.WORKFLOW,
-                related_type=NotificationRelatedType.ROOM_JOIN_REQUEST,
-                related_id=request_id,
-            ),
+            payloads=[
+                NotificationCreate(
+                    recipient_user_id=recipient_user_id,
+                    actor_user_id=None,
+                    notification_type=NotificationType.WORKFLOW,
+                    related_type=NotificationRelatedType.ROOM_JOIN_REQUEST,
+                    related_id=request_id,
+                )
+                for recipient_user_id in recipient_user_ids
+            ],
         )
 
     async def _finalize(
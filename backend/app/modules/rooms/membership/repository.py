@@ -55,6 +55,26 @@ class RoomMembershipRepository:
         )
         return list(result.scalars().all())
 
+    async def get_member_user_ids_by_roles(
+        self,
+        db: AsyncSession,
+        *,
+        room_id: int,
+        roles: set[str],
+        exclude_user_id: int | None = None,
+    ) -> list[int]:
+        stmt = select(RoomMember.user_id).where(
+            RoomMember.room_id == room_id,
+            RoomMember.role.in_(roles),
+        )
+        if exclude_user_id is not None:
+            stmt = stmt.where(RoomMember.user_id != exclude_user_id)
+
+        result = await db.execute(
+            stmt.order_by(RoomMember.joined_at.asc(), RoomMember.user_id.asc())
+        )
+        return list(result.scalars().all())
+
     async def get_members_by_user_id(
         self,
         db: AsyncSession,
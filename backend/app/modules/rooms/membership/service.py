@@ -5,7 +5,11 @@ from app.core.exceptions import BadRequestError, ForbiddenError, NotFoundError
 from app.modules.rooms.constants import RoomPermission, RoomRole
 from app.modules.rooms.models import RoomMember
 from app.modules.rooms.membership.repository import RoomMembershipRepository
-from app.modules.rooms.permissions import require_room_permission, has_room_permission
+from app.modules.rooms.permissions import (
+    get_roles_by_permission,
+    has_room_permission,
+    require_room_permission,
+)
 from app.modules.users.models import User
 
 
@@ -83,19 +87,18 @@ class RoomMembershipService:
         *,
         room_id: int,
         permission: RoomPermission,
+        exclude_user_id: int | None = None,
     ) -> list[int]:
-        members = await self.repo.get_members_by_room_id(db, room_id=room_id)
-        user_ids = []
-        for member in members:
-            try:
-                role = RoomRole(member.role)
-            except ValueError:
-                continue
+        roles = get_roles_by_permission(permission)
+        if not roles:
+            return []
 
-            if has_room_permission(role=role, permission=permission):
-                user_ids.append(member.user_id)
-
-        return user_ids
+        return await self.repo.get_member_user_ids_by_roles(
+            db,
+            room_id=room_id,
+            roles={role.value for role in roles},
+            exclude_user_id=exclude_user_id,
+        )
 
     async def get_room_ids_by_permission(
         self,
@@ -1,12 +1,15 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
 from app.modules.users.models import User
 
 from app.modules.rooms.constants import (
+    DEFAULT_READY_MIN_DURATION_MS,
+    DEFAULT_STALL_FLAP_PENALTY_MS,
+    DEFAULT_STALL_MIN_DURATION_MS,
     RoomActiveSyncPermission,
     RoomJoinAuditMode,
     RoomJoinRequestAction,
@@ -104,6 +107,25 @@ class RoomSettings(Base):
         default=True,
         server_default="1",
     )
+    # 自动同步的卡顿迟滞：卡顿持续多久才暂停、恢复后稳定多久才续播、每次抖动追加的等待
+    stall_min_duration_ms: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=DEFAULT_STALL_MIN_DURATION_MS,
+        server_default=str(DEFAULT_STALL_MIN_DURATION_MS),
+    )
+    ready_min_duration_ms: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=DEFAULT_READY_MIN_DURATION_MS,
+        server_default=str(DEFAULT_READY_MIN_DURATION_MS),
+    )
+    stall_flap_penalty_ms: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=DEFAULT_STALL_FLAP_PENALTY_MS,
+        server_default=str(DEFAULT_STALL_FLAP_PENALTY_MS),
+    )
 
     created_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
@@ -123,6 +145,11 @@ class RoomSettings(Base):
 
 class RoomMember(Base):
     __tablename__ = "room_members"
+    __table_args__ = (
+        # 主键 (room_id, user_id) 只覆盖按房间查；按用户查所在房间需要单独索引
+        Index("idx_room_members_user_id", "user_id"),
+        Index("idx_room_members_room_id_joined_at", "room_id", "joined_at", "user_id"),
+    )
 
     room_id: Mapped[int] = mapped_column(
         Integer,
@@ -146,6 +173,9 @@ class RoomMember(Base):
 
 class RoomJoinRequest(Base):
     __tablename__ = "room_join_requests"
+    __table_args__ = (
+        Index("idx_room_join_requests_room_id_created_at", "room_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
 
@@ -153,7 +183,6 @@ class RoomJoinRequest(Base):
         Integer,
         ForeignKey("rooms.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     initiator_user_id: Mapped[int] = mapped_column(
         Integer,
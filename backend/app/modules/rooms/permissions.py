@@ -39,6 +39,14 @@ def get_permissions_by_role(role: RoomRole) -> set[RoomPermission]:
     return ROLE_PERMISSIONS.get(role, set())
 
 
+def get_roles_by_permission(permission: RoomPermission) -> set[RoomRole]:
+    return {
+        role
+        for role, permissions in ROLE_PERMISSIONS.items()
+        if permission in permissions
+    }
+
+
 def has_room_permission(role: RoomRole, permission: RoomPermission) -> bool:
     return permission in get_permissions_by_role(role)
 
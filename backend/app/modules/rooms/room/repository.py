@@ -37,6 +37,30 @@ class RoomRepository:
         )
         return result.scalar_one_or_none()
 
+    async def find_room_member_role(
+        self,
+        db: AsyncSession,
+        *,
+        room_id: int,
+        user_id: int,
+    ) -> tuple[bool, str | None]:
+        # 一次查询同时判断房间是否存在和当前用户在房间中的角色
+        result = await db.execute(
+            select(Room.id, RoomMember.role)
+            .outerjoin(
+                RoomMember,
+                and_(
+                    RoomMember.room_id == Room.id,
+                    RoomMember.user_id == user_id,
+                ),
+            )
+            .where(Room.id == room_id)
+        )
+        row = result.first()
+        if row is None:
+            return False, None
+        return True, row.role
+
     async def get_rooms(
         self,
         db: AsyncSession,
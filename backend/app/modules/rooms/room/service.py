@@ -56,6 +56,30 @@ class RoomService:
             )
         return room
 
+    async def get_room_role(
+        self,
+        db: AsyncSession,
+        *,
+        room_id: int,
+        user_id: int,
+    ) -> RoomRole | None:
+        room_exists, role = await self.repo.find_room_member_role(
+            db,
+            room_id=room_id,
+            user_id=user_id,
+        )
+        if not room_exists:
+            raise NotFoundError(
+                "Room not found",
+                reason=ErrorReason.ROOM_NOT_FOUND,
+                details={"room_id": room_id},
+            )
+
+        try:
+            return RoomRole(role) if role is not None else None
+        except ValueError:
+            return None
+
     async def get_accessible_room_by_id(
         self,
         db: AsyncSession,
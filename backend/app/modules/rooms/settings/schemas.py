@@ -1,6 +1,7 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.modules.rooms.constants import (
+    MAX_STALL_HYSTERESIS_MS,
     RoomActiveSyncPermission,
     RoomVideoSourceType,
     RoomSyncPolicy,
@@ -12,6 +13,9 @@ class RoomSettingsPatch(BaseModel):
     sync_policy: RoomSyncPolicy | None = None
     active_sync_permission: RoomActiveSyncPermission | None = None
     seek_auto_pause: bool | None = None
+    stall_min_duration_ms: int | None = Field(default=None, ge=0, le=MAX_STALL_HYSTERESIS_MS)
+    ready_min_duration_ms: int | None = Field(default=None, ge=0, le=MAX_STALL_HYSTERESIS_MS)
+    stall_flap_penalty_ms: int | None = Field(default=None, ge=0, le=MAX_STALL_HYSTERESIS_MS)
 
 
 class RoomSettingsResponse(BaseModel):
@@ -22,3 +26,6 @@ class RoomSettingsResponse(BaseModel):
     sync_policy: RoomSyncPolicy
     active_sync_permission: RoomActiveSyncPermission
     seek_auto_pause: bool
+    stall_min_duration_ms: int
+    ready_min_duration_ms: int
+    stall_flap_penalty_ms: int
@@ -175,6 +175,15 @@ class RoomSettingsService:
         if "seek_auto_pause" in updates:
             settings.seek_auto_pause = updates["seek_auto_pause"]
 
+        if "stall_min_duration_ms" in updates:
+            settings.stall_min_duration_ms = updates["stall_min_duration_ms"]
+
+        if "ready_min_duration_ms" in updates:
+            settings.ready_min_duration_ms = updates["ready_min_duration_ms"]
+
+        if "stall_flap_penalty_ms" in updates:
+            settings.stall_flap_penalty_ms = updates["stall_flap_penalty_ms"]
+
         settings = await self.repo.save_settings(db, settings)
         await db.commit()
         await db.refresh(settings)
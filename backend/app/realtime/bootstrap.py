@@ -1,9 +1,13 @@
 from fastapi import FastAPI
 
+from app.core.config import get_settings
 from app.realtime.manager import RealtimeManager
 from app.realtime.publisher import RealtimePublisher
 from app.realtime.room_presence import RoomPresenceService
 from app.realtime.room_video_runtime import RoomVideoRuntimeService
+from app.realtime.runtime_snapshot import RoomRuntimeSnapshotStore
+
+settings = get_settings()
 
 
 def setup_realtime(app: FastAPI) -> None:
@@ -14,4 +18,35 @@ def setup_realtime(app: FastAPI) -> None:
     app.state.realtime_manager = manager
     app.state.realtime_publisher = RealtimePublisher(manager)
     app.state.realtime_room_presence_service = room_presence_service
-    app.state.realtime_room_video_runtime_service = room_video_runtime_service
\ No newline at end of file
+    app.state.realtime_room_video_runtime_service = room_video_runtime_service
+    app.state.realtime_runtime_snapshot_store = (
+        RoomRuntimeSnapshotStore(
+            video_runtime_service=room_video_runtime_service,
+            presence_service=room_presence_service,
+        )
+        if settings.realtime_runtime_snapshot_enabled
+        else None
+    )
+
+
+async def start_realtime_tasks(app: FastAPI) -> None:
+    snapshot_store = app.state.realtime_runtime_snapshot_store
+    if snapshot_store is not None:
+        # lifespan 在 yield 之前执行，恢复完成后才会接受 /ws 连接
+        await snapshot_store.restore()
+        snapshot_store.start(
+            interval_seconds=settings.realtime_runtime_snapshot_interval_seconds,
+        )
+
+    app.state.realtime_manager.start_idle_reaper(
+        idle_timeout_seconds=settings.ws_idle_timeout_seconds,
+        interval_seconds=settings.ws_idle_reap_interval_seconds,
+    )
+
+
+async def stop_realtime_tasks(app: FastAPI) -> None:
+    await app.state.realtime_manager.stop_idle_reaper()
+
+    snapshot_store = app.state.realtime_runtime_snapshot_store
+    if snapshot_store is not None:
+        await snapshot_store.stop()
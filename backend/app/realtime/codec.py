@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from fastapi import WebSocket
+
+from app.realtime.constants import WsEncoding
+from app.realtime.protocol import WsMessage
+
+try:
+    import msgpack
+except ImportError:  # 未安装 msgpack 的部署只能协商到 json
+    msgpack = None
+
+
+def resolve_encoding(requested: WsEncoding) -> WsEncoding:
+    if requested == WsEncoding.MSGPACK and msgpack is None:
+        return WsEncoding.JSON
+    return requested
+
+
+class EncodedWsMessage:
+    def __init__(self, message: WsMessage) -> None:
+        self.data: dict[str, Any] = message.model_dump(mode="json")
+        self._frames: dict[WsEncoding, str | bytes] = {}
+
+    # 同一条消息对每种编码只序列化一次，fan-out 时所有连接复用同一帧
+    def frame(self, encoding: WsEncoding) -> str | bytes:
+        frame = self._frames.get(encoding)
+        if frame is None:
+            if encoding == WsEncoding.MSGPACK:
+                frame = msgpack.packb(self.data, use_bin_type=True)
+            else:
+                frame = json.dumps(self.data, ensure_ascii=False, separators=(",", ":"))
+            self._frames[encoding] = frame
+        return frame
+
+
+async def send_frame(websocket: WebSocket, frame: str | bytes) -> None:
+    # 文本帧始终是 JSON，二进制帧始终是 MessagePack
+    if isinstance(frame, bytes):
+        await websocket.send_bytes(frame)
+    else:
+        await websocket.send_text(frame)
+
+
+async def send_ws_message(
+    websocket: WebSocket,
+    message: WsMessage,
+    *,
+    encoding: WsEncoding = WsEncoding.JSON,
+) -> None:
+    await send_frame(websocket, EncodedWsMessage(message).frame(encoding))
@@ -15,6 +15,11 @@ class WsHeartbeatAction(StrEnum):
     PONG = "pong"
 
 
+class WsEncoding(StrEnum):
+    JSON = "json"
+    MSGPACK = "msgpack"
+
+
 class WsCommandAction(StrEnum):
     ROOM_ENTER = "room_enter"
     ROOM_LEAVE = "room_leave"
@@ -45,6 +50,7 @@ class WsEventType(StrEnum):
     PLAYBACK_SEEK = "playback_seek"
     ROOM_VIDEO_SOURCE_SET = "room_video_source_set"
     USER_RESOURCE_STATES = "user_resource_states"
+    USER_RESOURCE_STATES_DELTA = "user_resource_states_delta"
 
 
 class WsErrorCode(StrEnum):
@@ -63,6 +69,12 @@ class SessionCloseReason(StrEnum):
     ROOM_DELETED = "room_deleted"
 
 
+class RoomMembersChangeType(StrEnum):
+    ADDED = "added"
+    REMOVED = "removed"
+    ROLE_CHANGED = "role_changed"
+
+
 class ChannelKind(StrEnum):
     USER = "user"
     ROOM = "room"
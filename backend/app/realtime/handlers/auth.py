@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import log_extra
 from app.realtime.auth import authenticate_websocket_token
+from app.realtime.codec import resolve_encoding, send_ws_message
 from app.realtime.manager import RealtimeManager, WsConnection
 from app.realtime.protocol import WsAuthPayload, build_ack_message
 
@@ -24,26 +25,38 @@ class AuthHandler:
         payload: dict,
     ) -> WsConnection:
         if connection is not None:
-            await websocket.send_json(
-                build_ack_message().model_dump(mode="json")
+            await send_ws_message(
+                websocket,
+                build_ack_message(data={"encoding": connection.encoding}),
+                encoding=connection.encoding,
             )
             return connection
 
         auth_payload = WsAuthPayload.model_validate(payload)
         user = await authenticate_websocket_token(db, token=auth_payload.token)
-        connection = await manager.register_connection(user_id=user.id, websocket=websocket)
+        encoding = resolve_encoding(auth_payload.encoding)
+        connection = await manager.register_connection(
+            user_id=user.id,
+            websocket=websocket,
+            encoding=encoding,
+        )
         logger.info(
-            "ws authenticated user_id=%s connection_id=%s",
+            "ws authenticated user_id=%s connection_id=%s encoding=%s",
             user.id,
             connection.connection_id,
+            encoding,
             **log_extra(
                 "ws.authenticated",
                 user_id=user.id,
                 connection_id=connection.connection_id,
+                encoding=encoding,
             ),
         )
 
-        await websocket.send_json(
-            build_ack_message().model_dump(mode="json")
+        # ack 已按协商结果编码，客户端按帧类型解码后据 data.encoding 确认实际生效的编码
+        await send_ws_message(
+            websocket,
+            build_ack_message(data={"encoding": encoding}),
+            encoding=encoding,
         )
         return connection
@@ -1,16 +1,19 @@
 from __future__ import annotations
 
 import logging
+import time
 from typing import Any
 
 from fastapi import WebSocket
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.database import QueryStats, collect_query_stats, observe_query_stats
 from app.core.error_reasons import ErrorReason
 from app.core.exceptions import AppError, BadRequestError
 from app.core.logging import log_extra
-from app.realtime.constants import WsCommandAction, WsErrorCode, WsMessageType
+from app.realtime.codec import send_ws_message
+from app.realtime.constants import WsCommandAction, WsEncoding, WsErrorCode, WsMessageType
 from app.realtime.handlers.auth import AuthHandler
 from app.realtime.handlers.heartbeat import HeartbeatHandler
 from app.realtime.handlers.room import RoomCommandHandler
@@ -74,6 +77,7 @@ class RealtimeMessageHandler:
                 await self.heartbeat_handler.handle(
                     websocket=websocket,
                     payload=message.payload,
+                    encoding=self._encoding_of(connection),
                 )
                 return connection
 
@@ -81,19 +85,31 @@ class RealtimeMessageHandler:
                 connection = self._require_authenticated(connection)
                 command = WsCommandPayload.model_validate(message.payload or {})
 
-                ack_data = await self._dispatch_command(
-                    db=db,
-                    manager=manager,
-                    publisher=publisher,
-                    connection=connection,
-                    command=command,
-                )
+                started_at = time.perf_counter()
+                with collect_query_stats() as query_stats:
+                    try:
+                        ack_data = await self._dispatch_command(
+                            db=db,
+                            manager=manager,
+                            publisher=publisher,
+                            connection=connection,
+                            command=command,
+                        )
+                    finally:
+                        self._log_command_stats(
+                            connection=connection,
+                            command=command,
+                            duration_seconds=time.perf_counter() - started_at,
+                            query_stats=query_stats,
+                        )
 
-                await websocket.send_json(
+                await send_ws_message(
+                    websocket,
                     build_ack_message(
                         request_id=command.request_id,
                         data=ack_data,
-                    ).model_dump(mode="json")
+                    ),
+                    encoding=connection.encoding,
                 )
                 return connection
 
@@ -118,14 +134,16 @@ class RealtimeMessageHandler:
                     error_code=e.code,
                 ),
             )
-            await websocket.send_json(
+            await send_ws_message(
+                websocket,
                 build_error_message(
                     code=e.code,
                     request_id=request_id,
                     reason=e.reason,
                     message=e.message,
                     details=e.details,
-                ).model_dump(mode="json"),
+                ),
+                encoding=self._encoding_of(connection),
             )
             return connection
 
@@ -147,14 +165,16 @@ class RealtimeMessageHandler:
                     error_reason=ErrorReason.INVALID_WEBSOCKET_PAYLOAD,
                 ),
             )
-            await websocket.send_json(
+            await send_ws_message(
+                websocket,
                 build_error_message(
                     code=WsErrorCode.INVALID_PAYLOAD,
                     request_id=request_id,
                     reason=ErrorReason.INVALID_WEBSOCKET_PAYLOAD,
                     message="Invalid websocket payload",
                     details=details,
-                ).model_dump(mode="json"),
+                ),
+                encoding=self._encoding_of(connection),
             )
             return connection
 
@@ -202,6 +222,36 @@ class RealtimeMessageHandler:
             details={"action": command.action},
         )
 
+    @staticmethod
+    def _log_command_stats(
+        *,
+        connection: WsConnection,
+        command: WsCommandPayload,
+        duration_seconds: float,
+        query_stats: QueryStats,
+    ) -> None:
+        observe_query_stats(query_stats, source="ws", target=command.action)
+        duration_ms = round(duration_seconds * 1000, 2)
+        db_ms = round(query_stats.duration_seconds * 1000, 2)
+        logger.debug(
+            "ws command action=%s user_id=%s duration_ms=%s db_statements=%s db_ms=%s",
+            command.action,
+            connection.user_id,
+            duration_ms,
+            query_stats.statements,
+            db_ms,
+            **log_extra(
+                "ws.command",
+                user_id=connection.user_id,
+                connection_id=connection.connection_id,
+                request_id=command.request_id,
+                action=command.action,
+                duration_ms=duration_ms,
+                db_statements=query_stats.statements,
+                db_ms=db_ms,
+            ),
+        )
+
     @staticmethod
     def _extract_request_id(raw_message: dict) -> str | None:
         if not isinstance(raw_message, dict):
@@ -224,3 +274,8 @@ class RealtimeMessageHandler:
                 reason=ErrorReason.AUTHENTICATION_REQUIRED,
             )
         return connection
+
+    @staticmethod
+    def _encoding_of(connection: WsConnection | None) -> WsEncoding:
+        # 鉴权前还没有协商结果，按默认的 json 回复
+        return connection.encoding if connection is not None else WsEncoding.JSON
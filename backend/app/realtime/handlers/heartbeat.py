@@ -4,9 +4,32 @@ from fastapi import WebSocket
 
 from app.core.error_reasons import ErrorReason
 from app.core.exceptions import BadRequestError
-from app.realtime.constants import WsHeartbeatAction
+from app.realtime.codec import EncodedWsMessage, resolve_encoding, send_frame
+from app.realtime.constants import WsEncoding, WsHeartbeatAction, WsMessageType
 from app.realtime.protocol import WsHeartbeatPayload, build_pong_message
 
+# pong 内容固定，启动时按每种可用编码各编码一次，心跳路径上不再经过 pydantic
+_PONG_MESSAGE = EncodedWsMessage(build_pong_message())
+PONG_FRAMES = {
+    encoding: _PONG_MESSAGE.frame(encoding)
+    for encoding in {resolve_encoding(encoding) for encoding in WsEncoding}
+}
+PING_PAYLOAD = {"action": WsHeartbeatAction.PING.value}
+
+
+def is_ping_message(raw_message: object) -> bool:
+    return (
+        isinstance(raw_message, dict)
+        and raw_message.get("type") == WsMessageType.HEARTBEAT
+        and raw_message.get("payload") == PING_PAYLOAD
+        and raw_message.get("v", 1) == 1
+        and raw_message.keys() <= {"v", "type", "payload"}
+    )
+
+
+async def send_pong(websocket: WebSocket, *, encoding: WsEncoding = WsEncoding.JSON) -> None:
+    await send_frame(websocket, PONG_FRAMES[encoding])
+
 
 class HeartbeatHandler:
     async def handle(
@@ -14,7 +37,12 @@ class HeartbeatHandler:
         *,
         websocket: WebSocket,
         payload: dict | None,
+        encoding: WsEncoding = WsEncoding.JSON,
     ) -> None:
+        if payload == PING_PAYLOAD:
+            await send_pong(websocket, encoding=encoding)
+            return
+
         heartbeat_payload = WsHeartbeatPayload.model_validate(payload or {})
         if heartbeat_payload.action != WsHeartbeatAction.PING:
             raise BadRequestError(
@@ -27,6 +55,4 @@ class HeartbeatHandler:
                 },
             )
 
-        await websocket.send_json(
-            build_pong_message().model_dump(mode="json")
-        )
+        await send_pong(websocket, encoding=encoding)
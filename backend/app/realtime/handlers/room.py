@@ -17,7 +17,6 @@ from app.realtime.protocol import WsCommandPayload
 from app.realtime.publisher import RealtimePublisher
 from app.realtime.room_presence import RoomPresenceService
 from app.realtime.room_video_runtime import RoomVideoRuntimeService
-from app.realtime.state import RoomSnapshot
 
 logger = logging.getLogger("app.realtime")
 
@@ -91,22 +90,7 @@ class RoomCommandHandler:
         connection: WsConnection,
     ) -> dict[str, object]:
         room_id = self._require_active_room(connection)
-        room_video_source = await self.video_runtime_service.get_room_video_source(
-            room_id=room_id,
-        )
-        playback = await self.video_runtime_service.get_playback(room_id=room_id)
-        user_resource_states = await self.video_runtime_service.get_user_resource_states(
-            room_id=room_id,
-        )
-        return {
-            "room_video_source": (
-                room_video_source.model_dump(mode="json")
-                if room_video_source is not None
-                else None
-            ),
-            "playback": playback.model_dump(mode="json") if playback is not None else None,
-            "user_resource_states": user_resource_states.model_dump(mode="json"),
-        }
+        return await self.video_runtime_service.get_room_snapshot(room_id=room_id)
 
     async def _handle_room_enter(
         self,
@@ -146,20 +130,12 @@ class RoomCommandHandler:
             room_id=room_id,
         )
 
-        room_video_source = await self.video_runtime_service.get_room_video_source(
-            room_id=room_id
-        )
-        playback = await self.video_runtime_service.get_playback(room_id=room_id)
-        user_resource_states = await self.video_runtime_service.get_user_resource_states(
-            room_id=room_id,
-        )
-        snapshot = RoomSnapshot(
-            room_id=room_id,
-            present_user_ids=current_presence.present_user_ids,
-            room_video_source=room_video_source,
-            playback=playback,
-            user_resource_states=user_resource_states,
-        )
+        # 视频运行时在一次加锁内取得一致快照，序列化结果按版本复用
+        snapshot = {
+            **await self.video_runtime_service.get_room_snapshot(room_id=room_id),
+            "room_version": publisher.get_room_version(room_id),
+            "present_user_ids": list(current_presence.present_user_ids),
+        }
 
         if replaced_connection_id is not None:
             await publisher.publish_session_closed(
@@ -187,8 +163,8 @@ class RoomCommandHandler:
                     sync_policy=sync_policy,
                 )
                 if user_resource_states_update is not None:
-                    await publisher.publish_user_resource_states(
-                        user_resource_states=user_resource_states_update.user_resource_states,
+                    await publisher.publish_user_resource_states_delta(
+                        user_resource_states_delta=user_resource_states_update.user_resource_states_delta,
                     )
                     if (
                         user_resource_states_update.auto_action == AutoPlaybackAction.PLAY
@@ -221,7 +197,7 @@ class RoomCommandHandler:
             ),
         )
 
-        return snapshot.model_dump(mode="json")
+        return snapshot
 
     async def _handle_room_leave(
         self,
@@ -250,9 +226,12 @@ class RoomCommandHandler:
             sync_policy=sync_policy,
             room_empty=not presence.present_user_ids,
         )
-        if not session_exit_result.room_cleared and session_exit_result.user_resource_states is not None:
-            await publisher.publish_user_resource_states(
-                user_resource_states=session_exit_result.user_resource_states,
+        if (
+            not session_exit_result.room_cleared
+            and session_exit_result.user_resource_states_delta is not None
+        ):
+            await publisher.publish_user_resource_states_delta(
+                user_resource_states_delta=session_exit_result.user_resource_states_delta,
             )
             if (
                 session_exit_result.auto_action == AutoPlaybackAction.PLAY
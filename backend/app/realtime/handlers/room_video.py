@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,6 +10,9 @@ from app.core.error_reasons import ErrorReason
 from app.core.exceptions import BadRequestError, ForbiddenError
 from app.core.logging import log_extra
 from app.modules.rooms.constants import (
+    DEFAULT_READY_MIN_DURATION_MS,
+    DEFAULT_STALL_FLAP_PENALTY_MS,
+    DEFAULT_STALL_MIN_DURATION_MS,
     RoomActiveSyncPermission,
     RoomRole,
     RoomSyncPolicy,
@@ -18,11 +21,15 @@ from app.modules.rooms.constants import (
 from app.modules.rooms.membership.service import RoomMembershipService
 from app.modules.rooms.room.service import RoomService
 from app.modules.rooms.settings.service import RoomSettingsService
-from app.realtime.constants import AutoPlaybackAction, ResourceHealthStatusType, WsCommandAction
+from app.realtime.constants import ResourceHealthStatusType, WsCommandAction, WsEventType
 from app.realtime.manager import RealtimeManager, WsConnection
 from app.realtime.protocol import WsCommandPayload
 from app.realtime.publisher import RealtimePublisher
-from app.realtime.room_video_runtime import RoomVideoRuntimeService
+from app.realtime.room_video_runtime import (
+    RoomVideoRuntimeService,
+    StallHysteresisPolicy,
+    UserResourceStatusReport,
+)
 
 logger = logging.getLogger("app.realtime.video")
 
@@ -31,6 +38,7 @@ logger = logging.getLogger("app.realtime.video")
 class RoomVideoRuntimePolicy:
     sync_policy: RoomSyncPolicy
     active_sync_permission: RoomActiveSyncPermission
+    stall_hysteresis: StallHysteresisPolicy = field(default_factory=StallHysteresisPolicy)
 
 
 class RoomVideoCommandHandler:
@@ -74,6 +82,7 @@ class RoomVideoCommandHandler:
                 user_id=connection.user_id,
                 command=command,
                 sync_policy=policy.sync_policy,
+                stall_hysteresis=policy.stall_hysteresis,
             )
 
         self._require_active_sync_permission(
@@ -249,7 +258,10 @@ class RoomVideoCommandHandler:
             ),
         )
 
-        await publisher.publish_playback_play(playback=playback)
+        await publisher.publish_playback_coalesced(
+            event=WsEventType.PLAYBACK_PLAY,
+            playback=playback,
+        )
         return {
             "playback": playback.model_dump(mode="json"),
         }
@@ -298,7 +310,10 @@ class RoomVideoCommandHandler:
             ),
         )
 
-        await publisher.publish_playback_pause(playback=playback)
+        await publisher.publish_playback_coalesced(
+            event=WsEventType.PLAYBACK_PAUSE,
+            playback=playback,
+        )
         return {
             "playback": playback.model_dump(mode="json"),
         }
@@ -345,7 +360,10 @@ class RoomVideoCommandHandler:
             ),
         )
 
-        await publisher.publish_playback_seek(playback=playback)
+        await publisher.publish_playback_coalesced(
+            event=WsEventType.PLAYBACK_SEEK,
+            playback=playback,
+        )
         return {
             "playback": playback.model_dump(mode="json"),
         }
@@ -358,7 +376,8 @@ class RoomVideoCommandHandler:
         user_id: int,
         command: WsCommandPayload,
         sync_policy: RoomSyncPolicy,
-    ) -> dict[str, Any]:
+        stall_hysteresis: StallHysteresisPolicy,
+    ) -> None:
         data = command.data or {}
 
         status = self._parse_resource_health_status(data.get("status"))
@@ -379,15 +398,20 @@ class RoomVideoCommandHandler:
             field_name="error_message",
         )
 
-        result = await self.video_runtime_service.report_user_resource_status(
+        # 上报按房间窗口聚合，广播由窗口结束时的 publish_user_resource_states_update 统一发出
+        await self.video_runtime_service.submit_user_resource_status(
             room_id=room_id,
-            user_id=user_id,
-            status=status,
-            reported_at_ms=reported_at_ms,
+            report=UserResourceStatusReport(
+                user_id=user_id,
+                status=status,
+                reported_at_ms=reported_at_ms,
+                position_seconds=position_seconds,
+                error_code=error_code,
+                error_message=error_message,
+            ),
             sync_policy=sync_policy,
-            position_seconds=position_seconds,
-            error_code=error_code,
-            error_message=error_message,
+            on_update=publisher.publish_user_resource_states_update,
+            stall_hysteresis=stall_hysteresis,
         )
 
         logger.info(
@@ -404,23 +428,7 @@ class RoomVideoCommandHandler:
                 sync_policy=sync_policy,
             ),
         )
-
-        await publisher.publish_user_resource_states(
-            user_resource_states=result.user_resource_states,
-        )
-
-        if result.auto_action == AutoPlaybackAction.PAUSE and result.auto_playback is not None:
-            await publisher.publish_playback_pause(playback=result.auto_playback)
-        elif result.auto_action == AutoPlaybackAction.PLAY and result.auto_playback is not None:
-            await publisher.publish_playback_play(playback=result.auto_playback)
-
-        response: dict[str, Any] = {
-            "user_resource_states": result.user_resource_states.model_dump(mode="json")
-        }
-        if result.auto_playback is not None:
-            response["playback"] = result.auto_playback.model_dump(mode="json")
-            response["auto_action"] = result.auto_action.value
-        return response
+        return None
 
     async def _get_runtime_policy(
         self,
@@ -437,11 +445,21 @@ class RoomVideoCommandHandler:
             return RoomVideoRuntimePolicy(
                 sync_policy=RoomSyncPolicy.AUTO_SYNC,
                 active_sync_permission=RoomActiveSyncPermission.OWNER_AND_MANAGER,
+                stall_hysteresis=StallHysteresisPolicy(
+                    min_stall_ms=DEFAULT_STALL_MIN_DURATION_MS,
+                    min_ready_ms=DEFAULT_READY_MIN_DURATION_MS,
+                    flap_penalty_ms=DEFAULT_STALL_FLAP_PENALTY_MS,
+                ),
             )
 
         return RoomVideoRuntimePolicy(
             sync_policy=settings.sync_policy,
             active_sync_permission=settings.active_sync_permission,
+            stall_hysteresis=StallHysteresisPolicy(
+                min_stall_ms=settings.stall_min_duration_ms,
+                min_ready_ms=settings.ready_min_duration_ms,
+                flap_penalty_ms=settings.stall_flap_penalty_ms,
+            ),
         )
 
     @staticmethod
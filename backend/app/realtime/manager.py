@@ -1,14 +1,24 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+import time
 from dataclasses import dataclass, field
 from uuid import uuid4
 
 from fastapi import WebSocket
 
+from app.core.logging import log_extra
+from app.core.metrics import ws_publish_fanout_size, ws_send_duration_seconds
 from app.realtime.channels import ChannelKey, user_channel
+from app.realtime.codec import EncodedWsMessage, send_frame
+from app.realtime.constants import ChannelKind, WsEncoding
 from app.realtime.protocol import WsMessage
 
+logger = logging.getLogger("app.realtime")
+
+IDLE_CLOSE_CODE = 1001
+
 
 @dataclass
 class WsConnection:
@@ -17,6 +27,10 @@ class WsConnection:
     websocket: WebSocket
     subscriptions: set[ChannelKey] = field(default_factory=set)
     active_room_id: int | None = None
+    # auth 时协商的下行编码：json 走文本帧，msgpack 走二进制帧
+    encoding: WsEncoding = WsEncoding.JSON
+    # 最近一次收到客户端任意帧的 monotonic 时间，空闲回收依据它判断半开连接
+    last_seen_at: float = field(default_factory=time.monotonic)
 
 
 class RealtimeManager:
@@ -25,17 +39,20 @@ class RealtimeManager:
         self.user_connections: dict[int, set[str]] = {}
         self.channel_connections: dict[ChannelKey, set[str]] = {}
         self._lock = asyncio.Lock()
+        self._idle_reaper_task: asyncio.Task[None] | None = None
 
     async def register_connection(
         self,
         *,
         user_id: int,
         websocket: WebSocket,
+        encoding: WsEncoding = WsEncoding.JSON,
     ) -> WsConnection:
         connection = WsConnection(
             connection_id=uuid4().hex,
             user_id=user_id,
             websocket=websocket,
+            encoding=encoding,
         )
 
         async with self._lock:
@@ -102,18 +119,117 @@ class RealtimeManager:
                 if not connection_ids:
                     self.channel_connections.pop(channel, None)
 
+    async def close_idle_connections(self, *, idle_timeout_seconds: float) -> int:
+        idle_before = time.monotonic() - idle_timeout_seconds
+        idle_connections = [
+            connection
+            for connection in self.connections.values()
+            if connection.last_seen_at < idle_before
+        ]
+        if not idle_connections:
+            return 0
+
+        # 先移出管理器，立即停止 fan-out；房间在线状态由 ws 端点在收到断开后清理
+        for connection in idle_connections:
+            await self.disconnect(connection.connection_id)
+
+        await asyncio.gather(
+            *(
+                connection.websocket.close(code=IDLE_CLOSE_CODE, reason="Idle timeout")
+                for connection in idle_connections
+            ),
+            return_exceptions=True,
+        )
+
+        logger.info(
+            "ws idle connections closed count=%s idle_timeout_seconds=%s",
+            len(idle_connections),
+            idle_timeout_seconds,
+            **log_extra(
+                "ws.idle_closed",
+                count=len(idle_connections),
+                idle_timeout_seconds=idle_timeout_seconds,
+            ),
+        )
+        return len(idle_connections)
+
+    async def _run_idle_reaper(
+        self,
+        *,
+        idle_timeout_seconds: float,
+        interval_seconds: float,
+    ) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.close_idle_connections(idle_timeout_seconds=idle_timeout_seconds)
+            except Exception:  # noqa: BLE001
+                logger.exception(
+                    "ws idle reaper failed",
+                    **log_extra("ws.idle_reaper_failed"),
+                )
+
+    def start_idle_reaper(
+        self,
+        *,
+        idle_timeout_seconds: float,
+        interval_seconds: float,
+    ) -> None:
+        if self._idle_reaper_task is not None and not self._idle_reaper_task.done():
+            return
+        self._idle_reaper_task = asyncio.create_task(
+            self._run_idle_reaper(
+                idle_timeout_seconds=idle_timeout_seconds,
+                interval_seconds=interval_seconds,
+            )
+        )
+
+    async def stop_idle_reaper(self) -> None:
+        task = self._idle_reaper_task
+        self._idle_reaper_task = None
+        if task is None or task.done():
+            return
+
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def count_connections(self) -> int:
+        return len(self.connections)
+
+    def count_subscriptions_by_channel_kind(self) -> dict[ChannelKind, int]:
+        counts = {kind: 0 for kind in ChannelKind}
+        for channel, connection_ids in self.channel_connections.items():
+            counts[channel.kind] += len(connection_ids)
+        return counts
+
     async def send_to_connection(
         self,
         *,
         connection_id: str,
         message: WsMessage,
+    ) -> None:
+        await self._send_encoded(
+            connection_id=connection_id,
+            encoded=EncodedWsMessage(message),
+        )
+
+    async def _send_encoded(
+        self,
+        *,
+        connection_id: str,
+        encoded: EncodedWsMessage,
     ) -> None:
         connection = self.connections.get(connection_id)
         if connection is None:
             return
 
+        started_at = time.perf_counter()
         try:
-            await connection.websocket.send_json(message.model_dump(mode="json"))
+            await send_frame(connection.websocket, encoded.frame(connection.encoding))
+            ws_send_duration_seconds.observe(time.perf_counter() - started_at)
         except Exception:  # noqa: BLE001
             try:
                 await connection.websocket.close()
@@ -130,9 +246,15 @@ class RealtimeManager:
         exclude_connection_ids: set[str] | None = None,
     ) -> None:
         excluded = exclude_connection_ids or set()
-        connection_ids = list(self.channel_connections.get(channel, set()))
+        connection_ids = [
+            connection_id
+            for connection_id in self.channel_connections.get(channel, set())
+            if connection_id not in excluded
+        ]
+        ws_publish_fanout_size.observe(len(connection_ids), channel_kind=channel.kind)
+        if not connection_ids:
+            return
 
+        encoded = EncodedWsMessage(message)
         for connection_id in connection_ids:
-            if connection_id in excluded:
-                continue
-            await self.send_to_connection(connection_id=connection_id, message=message)
\ No newline at end of file
+            await self._send_encoded(connection_id=connection_id, encoded=encoded)
\ No newline at end of file
@@ -6,6 +6,7 @@ from pydantic import BaseModel, ConfigDict
 
 from app.realtime.constants import (
     WsCommandAction,
+    WsEncoding,
     WsErrorCode,
     WsEventType,
     WsHeartbeatAction,
@@ -41,6 +42,7 @@ class WsAuthPayload(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     token: str
+    encoding: WsEncoding = WsEncoding.JSON
 
 
 class WsCommandPayload(BaseModel):
@@ -1,21 +1,68 @@
+import asyncio
+import contextvars
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass
 from typing import Any
 
+from app.core.config import get_settings
+from app.core.logging import log_extra
 from app.modules.messages.schemas import MessageResponse
+from app.modules.rooms.membership.schemas import RoomMemberResponse
+from app.modules.rooms.room.schemas import RoomResponse
+from app.modules.rooms.settings.schemas import RoomSettingsResponse
 from app.realtime.channels import ChannelKey, room_channel, user_channel
-from app.realtime.constants import SessionCloseReason, WsEventType
+from app.realtime.constants import (
+    AutoPlaybackAction,
+    RoomMembersChangeType,
+    SessionCloseReason,
+    WsEventType,
+)
 from app.realtime.manager import RealtimeManager
 from app.realtime.protocol import build_event_message
+from app.realtime.room_video_runtime import UserResourceStatesUpdateResult
 from app.realtime.state import (
     PlaybackState,
     PresenceState,
     RoomVideoSourceState,
+    UserResourceStatesDeltaState,
     UserResourceStatesState,
 )
 
+settings = get_settings()
+logger = logging.getLogger("app.realtime")
+
+
+@dataclass
+class PendingPlaybackEvent:
+    event: WsEventType
+    playback: PlaybackState
+
 
 class RealtimePublisher:
     def __init__(self, manager: RealtimeManager) -> None:
         self.manager = manager
+        self._room_versions: dict[int, int] = {}
+        self.playback_coalesce_window_seconds = (
+            settings.realtime_playback_coalesce_window_ms / 1000
+        )
+        self._pending_playback_events: dict[int, PendingPlaybackEvent] = {}
+        self._playback_window_tasks: dict[int, asyncio.Task[None]] = {}
+
+    # =========================
+    # room version
+    # =========================
+
+    def get_room_version(self, room_id: int) -> int:
+        return self._room_versions.get(room_id, 0)
+
+    def clear_room_version(self, room_id: int) -> None:
+        self._room_versions.pop(room_id, None)
+
+    def _next_room_version(self, room_id: int) -> int:
+        version = self._room_versions.get(room_id, 0) + 1
+        self._room_versions[room_id] = version
+        return version
 
     # =========================
     # internal helper
@@ -53,43 +100,69 @@ class RealtimePublisher:
             data=None,
         )
 
+    async def publish_notifications(
+        self,
+        *,
+        user_ids: Iterable[int],
+    ) -> None:
+        await asyncio.gather(
+            *(self.publish_notification(user_id=user_id) for user_id in user_ids)
+        )
+
+    # =========================
+    # data events
+    # =========================
+
     async def publish_room_info(
         self,
         *,
-        room_id: int,
+        room: RoomResponse,
     ) -> None:
         await self._publish_event(
-            channel=room_channel(room_id),
+            channel=room_channel(room.id),
             event=WsEventType.ROOM_INFO,
-            data=None,
+            data={
+                "room_id": room.id,
+                "version": self._next_room_version(room.id),
+                "room": room.model_dump(mode="json"),
+            },
         )
 
     async def publish_room_settings(
         self,
         *,
-        room_id: int,
+        room_settings: RoomSettingsResponse,
     ) -> None:
         await self._publish_event(
-            channel=room_channel(room_id),
+            channel=room_channel(room_settings.room_id),
             event=WsEventType.ROOM_SETTINGS,
-            data=None,
+            data={
+                "room_id": room_settings.room_id,
+                "version": self._next_room_version(room_settings.room_id),
+                "settings": room_settings.model_dump(mode="json"),
+            },
         )
 
     async def publish_room_members(
         self,
         *,
         room_id: int,
+        change_type: RoomMembersChangeType,
+        user_id: int,
+        member: RoomMemberResponse | None = None,
     ) -> None:
         await self._publish_event(
             channel=room_channel(room_id),
             event=WsEventType.ROOM_MEMBERS,
-            data=None,
+            data={
+                "room_id": room_id,
+                "version": self._next_room_version(room_id),
+                "change_type": change_type,
+                "user_id": user_id,
+                "member": member.model_dump(mode="json") if member is not None else None,
+            },
         )
 
-    # =========================
-    # data events
-    # =========================
-
     async def publish_message(
         self,
         *,
@@ -144,38 +217,92 @@ class RealtimePublisher:
             data=room_video_source.model_dump(mode="json"),
         )
 
-    async def publish_playback_play(
+    async def _publish_playback_event(
         self,
         *,
+        event: WsEventType,
         playback: PlaybackState,
     ) -> None:
         await self._publish_event(
             channel=room_channel(playback.room_id),
-            event=WsEventType.PLAYBACK_PLAY,
+            event=event,
             data=playback.model_dump(mode="json"),
         )
 
+    async def publish_playback_play(
+        self,
+        *,
+        playback: PlaybackState,
+    ) -> None:
+        # 直接广播的播放状态更新更晚，窗口内尚未发出的合并事件作废
+        self._pending_playback_events.pop(playback.room_id, None)
+        await self._publish_playback_event(event=WsEventType.PLAYBACK_PLAY, playback=playback)
+
     async def publish_playback_pause(
         self,
         *,
         playback: PlaybackState,
     ) -> None:
-        await self._publish_event(
-            channel=room_channel(playback.room_id),
-            event=WsEventType.PLAYBACK_PAUSE,
-            data=playback.model_dump(mode="json"),
-        )
+        self._pending_playback_events.pop(playback.room_id, None)
+        await self._publish_playback_event(event=WsEventType.PLAYBACK_PAUSE, playback=playback)
 
     async def publish_playback_seek(
         self,
         *,
         playback: PlaybackState,
     ) -> None:
-        await self._publish_event(
-            channel=room_channel(playback.room_id),
-            event=WsEventType.PLAYBACK_SEEK,
-            data=playback.model_dump(mode="json"),
+        self._pending_playback_events.pop(playback.room_id, None)
+        await self._publish_playback_event(event=WsEventType.PLAYBACK_SEEK, playback=playback)
+
+    async def publish_playback_coalesced(
+        self,
+        *,
+        event: WsEventType,
+        playback: PlaybackState,
+    ) -> None:
+        room_id = playback.room_id
+        if self.playback_coalesce_window_seconds <= 0:
+            await self._publish_playback_event(event=event, playback=playback)
+            return
+
+        if room_id in self._playback_window_tasks:
+            # 窗口内只保留最新状态；窗口内出现过 seek 时仍按 seek 广播，客户端才会强制对齐进度
+            pending = self._pending_playback_events.get(room_id)
+            if pending is not None and pending.event == WsEventType.PLAYBACK_SEEK:
+                event = WsEventType.PLAYBACK_SEEK
+            self._pending_playback_events[room_id] = PendingPlaybackEvent(
+                event=event,
+                playback=playback,
+            )
+            return
+
+        # 空闲房间的首个命令立即广播，随后开启合并窗口；窗口内会发出后续命令的状态，
+        # 不能继承首个命令的 contextvars（日志 request_id）
+        self._playback_window_tasks[room_id] = asyncio.create_task(
+            self._run_playback_window(room_id),
+            context=contextvars.Context(),
         )
+        await self._publish_playback_event(event=event, playback=playback)
+
+    async def _run_playback_window(self, room_id: int) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self.playback_coalesce_window_seconds)
+                pending = self._pending_playback_events.pop(room_id, None)
+                if pending is None:
+                    return
+                await self._publish_playback_event(
+                    event=pending.event,
+                    playback=pending.playback,
+                )
+        except Exception:  # noqa: BLE001
+            logger.exception(
+                "playback coalesced publish failed room_id=%s",
+                room_id,
+                **log_extra("ws.playback_coalesce_failed", room_id=room_id),
+            )
+        finally:
+            self._playback_window_tasks.pop(room_id, None)
 
     async def publish_user_resource_states(
         self,
@@ -187,3 +314,29 @@ class RealtimePublisher:
             event=WsEventType.USER_RESOURCE_STATES,
             data=user_resource_states.model_dump(mode="json"),
         )
+
+    async def publish_user_resource_states_delta(
+        self,
+        *,
+        user_resource_states_delta: UserResourceStatesDeltaState,
+    ) -> None:
+        await self._publish_event(
+            channel=room_channel(user_resource_states_delta.room_id),
+            event=WsEventType.USER_RESOURCE_STATES_DELTA,
+            data=user_resource_states_delta.model_dump(mode="json"),
+        )
+
+    async def publish_user_resource_states_update(
+        self,
+        *,
+        result: UserResourceStatesUpdateResult,
+    ) -> None:
+        if result.user_resource_states_delta is not None:
+            await self.publish_user_resource_states_delta(
+                user_resource_states_delta=result.user_resource_states_delta,
+            )
+
+        if result.auto_action == AutoPlaybackAction.PAUSE and result.auto_playback is not None:
+            await self.publish_playback_pause(playback=result.auto_playback)
+        elif result.auto_action == AutoPlaybackAction.PLAY and result.auto_playback is not None:
+            await self.publish_playback_play(playback=result.auto_playback)
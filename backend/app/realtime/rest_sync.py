@@ -57,9 +57,12 @@ async def close_room_user_session(
         room_empty=not presence.present_user_ids,
     )
 
-    if not session_exit_result.room_cleared and session_exit_result.user_resource_states is not None:
-        await publisher.publish_user_resource_states(
-            user_resource_states=session_exit_result.user_resource_states,
+    if (
+        not session_exit_result.room_cleared
+        and session_exit_result.user_resource_states_delta is not None
+    ):
+        await publisher.publish_user_resource_states_delta(
+            user_resource_states_delta=session_exit_result.user_resource_states_delta,
         )
         if (
             session_exit_result.auto_action == AutoPlaybackAction.PLAY
@@ -22,6 +22,10 @@ class RoomPresenceService:
             room_connections = self.room_user_connections.get(room_id, {})
             return room_connections.get(user_id)
 
+    async def get_active_room_ids(self) -> set[int]:
+        async with self._lock:
+            return set(self.room_user_connections)
+
     async def enter_room(
         self,
         *,
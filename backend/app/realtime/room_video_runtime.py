@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
+import logging
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
 from time import time
 
+from app.core.config import get_settings
 from app.core.error_reasons import ErrorReason
 from app.core.exceptions import BadRequestError
+from app.core.logging import log_extra
 from app.modules.rooms.constants import RoomSyncPolicy, RoomVideoSourceType
 from app.realtime.constants import (
     AutoPlaybackAction,
@@ -17,9 +22,14 @@ from app.realtime.state import (
     PlaybackState,
     RoomUserResourceState,
     RoomVideoSourceState,
+    RoomVideoRuntimeSnapshot,
+    UserResourceStatesDeltaState,
     UserResourceStatesState,
 )
 
+settings = get_settings()
+logger = logging.getLogger("app.realtime.video")
+
 
 def now_ms() -> int:
     return int(time() * 1000)
@@ -27,15 +37,47 @@ def now_ms() -> int:
 
 @dataclass
 class UserResourceStatesUpdateResult:
-    user_resource_states: UserResourceStatesState
+    # 迟滞计时器到点触发的自动暂停/恢复没有资源状态变化，此时为 None
+    user_resource_states_delta: UserResourceStatesDeltaState | None = None
     auto_playback: PlaybackState | None = None
     auto_action: AutoPlaybackAction | None = None
 
 
+UserResourceStatesUpdateListener = Callable[..., Awaitable[None]]
+
+
+@dataclass
+class UserResourceStatusReport:
+    user_id: int
+    status: ResourceHealthStatusType
+    reported_at_ms: int
+    position_seconds: float | None = None
+    error_code: str | None = None
+    error_message: str | None = None
+
+
+@dataclass(frozen=True)
+class StallHysteresisPolicy:
+    # 卡顿持续超过该时长才自动暂停
+    min_stall_ms: int = 0
+    # 卡顿用户恢复后需稳定该时长才自动续播
+    min_ready_ms: int = 0
+    # 恢复期内再次卡顿的用户，每抖动一次恢复等待再追加该时长
+    flap_penalty_ms: int = 0
+
+
+@dataclass
+class PendingUserResourceStatuses:
+    sync_policy: RoomSyncPolicy
+    on_update: UserResourceStatesUpdateListener
+    stall_hysteresis: StallHysteresisPolicy = StallHysteresisPolicy()
+    reports: dict[int, UserResourceStatusReport] = field(default_factory=dict)
+
+
 @dataclass
 class RoomSessionExitResult:
     room_cleared: bool
-    user_resource_states: UserResourceStatesState | None = None
+    user_resource_states_delta: UserResourceStatesDeltaState | None = None
     auto_playback: PlaybackState | None = None
     auto_action: AutoPlaybackAction | None = None
 
@@ -46,14 +88,42 @@ class RoomVideoRuntimeState:
     room_video_source: RoomVideoSourceState | None = None
     playback: PlaybackState | None = None
     user_resource_states: dict[int, RoomUserResourceState] = field(default_factory=dict)
+    # 每次 user_resource_states 变化递增，客户端据此发现增量丢失
+    user_resource_seq: int = 0
     stalling_user_ids: set[int] = field(default_factory=set)
+    # 卡顿迟滞按绝对时间记录：卡顿到该时刻仍未恢复才计入自动暂停
+    stall_confirm_at_ms: dict[int, int] = field(default_factory=dict)
+    # 卡顿用户恢复后需稳定到该时刻，之前仍阻塞自动续播
+    ready_confirm_at_ms: dict[int, int] = field(default_factory=dict)
+    stall_flap_counts: dict[int, int] = field(default_factory=dict)
     playback_hold_reason: PlaybackHoldReason = PlaybackHoldReason.NONE
+    # 视频源、播放状态或资源状态每次变化递增；快照按版本缓存序列化结果
+    runtime_version: int = 0
+    snapshot_data: dict[str, object] | None = None
+    # 从快照恢复或房间变空后尚无人进入的房间记录起始时刻，超过宽限期未认领会被清理
+    unclaimed_since_ms: int | None = None
+
+    def mark_changed(self) -> None:
+        self.runtime_version += 1
+        self.snapshot_data = None
 
 
 class RoomVideoRuntimeService:
     def __init__(self) -> None:
         self._room_states: dict[int, RoomVideoRuntimeState] = {}
         self._lock = asyncio.Lock()
+        self.resource_status_window_seconds = (
+            settings.realtime_resource_status_window_ms / 1000
+        )
+        self._pending_resource_statuses: dict[int, PendingUserResourceStatuses] = {}
+        self._resource_status_window_tasks: dict[int, asyncio.Task[None]] = {}
+        self._stall_evaluation_tasks: dict[int, asyncio.Task[None]] = {}
+        # 开启快照时房间变空不立即丢弃：停机时 uvicorn 会先断开所有连接，
+        # 立即丢弃会让停机前的最后一次快照写成空列表；由快照循环在宽限期后清理
+        self.retain_empty_rooms = settings.realtime_runtime_snapshot_enabled
+
+    def count_rooms(self) -> int:
+        return len(self._room_states)
 
     def _get_or_create_room_state_locked(self, room_id: int) -> RoomVideoRuntimeState:
         state = self._room_states.get(room_id)
@@ -78,12 +148,6 @@ class RoomVideoRuntimeService:
             return None
         return playback.model_copy(deep=True)
 
-    @staticmethod
-    def _copy_user_resource_states(
-        payload: UserResourceStatesState,
-    ) -> UserResourceStatesState:
-        return payload.model_copy(deep=True)
-
     @staticmethod
     def _require_room_video_source_set_locked(
         state: RoomVideoRuntimeState,
@@ -113,22 +177,271 @@ class RoomVideoRuntimeService:
     ) -> UserResourceStatesState:
         return UserResourceStatesState(
             room_id=state.room_id,
+            seq=state.user_resource_seq,
             user_resource_states=[
                 user_resource_state.model_copy(deep=True)
                 for _, user_resource_state in sorted(state.user_resource_states.items())
             ],
         )
 
-    async def get_room_video_source(
+    @staticmethod
+    def _build_user_resource_states_delta_locked(
+        state: RoomVideoRuntimeState,
+        *,
+        upserted: list[RoomUserResourceState] | None = None,
+        removed_user_id: int | None = None,
+    ) -> UserResourceStatesDeltaState:
+        state.user_resource_seq += 1
+        state.mark_changed()
+        return UserResourceStatesDeltaState(
+            room_id=state.room_id,
+            seq=state.user_resource_seq,
+            upserted=[item.model_copy() for item in upserted or []],
+            removed_user_ids=[removed_user_id] if removed_user_id is not None else [],
+        )
+
+    def _discard_pending_resource_status(self, *, room_id: int, user_id: int) -> None:
+        pending = self._pending_resource_statuses.get(room_id)
+        if pending is not None:
+            pending.reports.pop(user_id, None)
+
+    @staticmethod
+    def _record_user_stall_transition_locked(
+        state: RoomVideoRuntimeState,
+        *,
+        user_id: int,
+        previous_status: ResourceHealthStatusType | None,
+        status: ResourceHealthStatusType,
+        stall_hysteresis: StallHysteresisPolicy,
+        at_ms: int,
+    ) -> None:
+        if status == ResourceHealthStatusType.STALLING:
+            state.stalling_user_ids.add(user_id)
+            if previous_status == ResourceHealthStatusType.STALLING:
+                return
+
+            ready_confirm_at_ms = state.ready_confirm_at_ms.pop(user_id, None)
+            if ready_confirm_at_ms is not None and ready_confirm_at_ms > at_ms:
+                # 恢复期内再次卡顿记为一次抖动
+                state.stall_flap_counts[user_id] = state.stall_flap_counts.get(user_id, 0) + 1
+            else:
+                state.stall_flap_counts.pop(user_id, None)
+            state.stall_confirm_at_ms[user_id] = at_ms + stall_hysteresis.min_stall_ms
+            return
+
+        state.stalling_user_ids.discard(user_id)
+        if previous_status != ResourceHealthStatusType.STALLING:
+            return
+
+        state.stall_confirm_at_ms.pop(user_id, None)
+        state.ready_confirm_at_ms[user_id] = (
+            at_ms
+            + stall_hysteresis.min_ready_ms
+            + state.stall_flap_counts.get(user_id, 0) * stall_hysteresis.flap_penalty_ms
+        )
+
+    @staticmethod
+    def _reset_user_resource_states_locked(state: RoomVideoRuntimeState) -> None:
+        state.user_resource_states.clear()
+        state.stalling_user_ids.clear()
+        state.stall_confirm_at_ms.clear()
+        state.ready_confirm_at_ms.clear()
+        state.stall_flap_counts.clear()
+        # 资源状态整体清空，客户端需按完整快照处理而不是增量
+        state.user_resource_seq += 1
+        state.mark_changed()
+
+    @staticmethod
+    def _forget_user_stall_locked(state: RoomVideoRuntimeState, *, user_id: int) -> None:
+        state.stalling_user_ids.discard(user_id)
+        state.stall_confirm_at_ms.pop(user_id, None)
+        state.ready_confirm_at_ms.pop(user_id, None)
+        state.stall_flap_counts.pop(user_id, None)
+
+    @staticmethod
+    def _expire_ready_confirmations_locked(state: RoomVideoRuntimeState, *, at_ms: int) -> None:
+        for user_id, ready_confirm_at_ms in list(state.ready_confirm_at_ms.items()):
+            if ready_confirm_at_ms <= at_ms:
+                del state.ready_confirm_at_ms[user_id]
+                state.stall_flap_counts.pop(user_id, None)
+
+    def _try_auto_pause_locked(
         self,
+        state: RoomVideoRuntimeState,
         *,
+        at_ms: int,
+    ) -> PlaybackState | None:
+        if (
+            state.playback is None
+            or state.playback.status != PlaybackStatusType.PLAYING
+            or state.playback_hold_reason == PlaybackHoldReason.STALL
+            or not any(
+                confirm_at_ms <= at_ms for confirm_at_ms in state.stall_confirm_at_ms.values()
+            )
+        ):
+            return None
+
+        playback = PlaybackState(
+            room_id=state.room_id,
+            status=PlaybackStatusType.PAUSED,
+            position_seconds=self._resolve_position_seconds_locked(
+                state.playback,
+                at_ts_ms=at_ms,
+            ),
+            anchor_ts_ms=at_ms,
+            playback_rate=state.playback.playback_rate,
+        )
+        state.playback = playback
+        state.mark_changed()
+        state.playback_hold_reason = PlaybackHoldReason.STALL
+        return playback
+
+    def _try_auto_resume_locked(
+        self,
+        state: RoomVideoRuntimeState,
+        *,
+        at_ms: int,
+    ) -> PlaybackState | None:
+        self._expire_ready_confirmations_locked(state, at_ms=at_ms)
+        if (
+            state.playback_hold_reason != PlaybackHoldReason.STALL
+            or state.stalling_user_ids
+            or state.ready_confirm_at_ms
+        ):
+            return None
+
+        state.playback_hold_reason = PlaybackHoldReason.NONE
+        if state.playback is None:
+            return None
+
+        playback = PlaybackState(
+            room_id=state.room_id,
+            status=PlaybackStatusType.PLAYING,
+            position_seconds=state.playback.position_seconds,
+            anchor_ts_ms=at_ms,
+            playback_rate=state.playback.playback_rate,
+        )
+        state.playback = playback
+        state.mark_changed()
+        return playback
+
+    def _evaluate_auto_playback_locked(
+        self,
+        state: RoomVideoRuntimeState,
+        *,
+        sync_policy: RoomSyncPolicy,
+        at_ms: int,
+    ) -> tuple[PlaybackState | None, AutoPlaybackAction | None]:
+        if sync_policy != RoomSyncPolicy.AUTO_SYNC:
+            self._expire_ready_confirmations_locked(state, at_ms=at_ms)
+            return None, None
+
+        auto_playback = self._try_auto_pause_locked(state, at_ms=at_ms)
+        if auto_playback is not None:
+            return auto_playback, AutoPlaybackAction.PAUSE
+
+        auto_playback = self._try_auto_resume_locked(state, at_ms=at_ms)
+        if auto_playback is not None:
+            return auto_playback, AutoPlaybackAction.PLAY
+        return None, None
+
+    @staticmethod
+    def _next_stall_evaluation_at_locked(state: RoomVideoRuntimeState) -> int | None:
+        if state.playback_hold_reason == PlaybackHoldReason.STALL:
+            if state.stalling_user_ids or not state.ready_confirm_at_ms:
+                return None
+            # 所有用户都过了恢复期才续播
+            return max(state.ready_confirm_at_ms.values())
+
+        if (
+            state.playback is not None
+            and state.playback.status == PlaybackStatusType.PLAYING
+            and state.stall_confirm_at_ms
+        ):
+            return min(state.stall_confirm_at_ms.values())
+        return None
+
+    def _cancel_stall_evaluation_locked(self, room_id: int) -> None:
+        task = self._stall_evaluation_tasks.pop(room_id, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    def _schedule_stall_evaluation_locked(
+        self,
+        state: RoomVideoRuntimeState,
+        *,
+        sync_policy: RoomSyncPolicy,
+        on_update: UserResourceStatesUpdateListener | None,
+        at_ms: int,
+    ) -> None:
+        self._cancel_stall_evaluation_locked(state.room_id)
+        if on_update is None or sync_policy != RoomSyncPolicy.AUTO_SYNC:
+            return
+
+        evaluate_at_ms = self._next_stall_evaluation_at_locked(state)
+        if evaluate_at_ms is None:
+            return
+
+        # 计时器到点时可能已跨越多次上报，不能继承安排它的请求的 contextvars（SQL 统计、日志 request_id）
+        self._stall_evaluation_tasks[state.room_id] = asyncio.create_task(
+            self._run_stall_evaluation(
+                state.room_id,
+                delay_seconds=max(0, evaluate_at_ms - at_ms) / 1000,
+                sync_policy=sync_policy,
+                on_update=on_update,
+            ),
+            context=contextvars.Context(),
+        )
+
+    async def _run_stall_evaluation(
+        self,
         room_id: int,
-    ) -> RoomVideoSourceState | None:
+        *,
+        delay_seconds: float,
+        sync_policy: RoomSyncPolicy,
+        on_update: UserResourceStatesUpdateListener,
+    ) -> None:
+        await asyncio.sleep(delay_seconds)
+
         async with self._lock:
+            if self._stall_evaluation_tasks.get(room_id) is not asyncio.current_task():
+                return
+            del self._stall_evaluation_tasks[room_id]
+
             state = self._room_states.get(room_id)
             if state is None:
-                return None
-            return self._copy_room_video_source(state.room_video_source)
+                return
+
+            at_ms = now_ms()
+            auto_playback, auto_action = self._evaluate_auto_playback_locked(
+                state,
+                sync_policy=sync_policy,
+                at_ms=at_ms,
+            )
+            self._schedule_stall_evaluation_locked(
+                state,
+                sync_policy=sync_policy,
+                on_update=on_update,
+                at_ms=at_ms,
+            )
+            auto_playback = self._copy_playback(auto_playback)
+
+        if auto_action is None:
+            return
+
+        try:
+            await on_update(
+                result=UserResourceStatesUpdateResult(
+                    auto_playback=auto_playback,
+                    auto_action=auto_action,
+                )
+            )
+        except Exception:  # noqa: BLE001
+            logger.exception(
+                "stall hysteresis evaluation publish failed room_id=%s",
+                room_id,
+                **log_extra("ws.stall_evaluation_failed", room_id=room_id),
+            )
 
     async def get_playback(
         self,
@@ -150,7 +463,44 @@ class RoomVideoRuntimeService:
             state = self._room_states.get(room_id)
             if state is None:
                 return UserResourceStatesState(room_id=room_id, user_resource_states=[])
-            return self._copy_user_resource_states(self._build_user_resource_states_locked(state))
+            # 构建时已逐项复制，不再整体深拷贝一次
+            return self._build_user_resource_states_locked(state)
+
+    async def get_room_snapshot(
+        self,
+        *,
+        room_id: int,
+    ) -> dict[str, object]:
+        async with self._lock:
+            state = self._room_states.get(room_id)
+            if state is None:
+                return RoomVideoRuntimeSnapshot(
+                    room_id=room_id,
+                    user_resource_states=UserResourceStatesState(
+                        room_id=room_id,
+                        user_resource_states=[],
+                    ),
+                ).model_dump(mode="json")
+
+            if state.snapshot_data is None:
+                # 同一把锁内直接序列化现场状态，版本不变时开播瞬间的大量入房共用这一份结果
+                state.snapshot_data = RoomVideoRuntimeSnapshot(
+                    room_id=room_id,
+                    runtime_version=state.runtime_version,
+                    room_video_source=state.room_video_source,
+                    playback=state.playback,
+                    user_resource_states=UserResourceStatesState(
+                        room_id=room_id,
+                        seq=state.user_resource_seq,
+                        user_resource_states=[
+                            user_resource_state
+                            for _, user_resource_state in sorted(state.user_resource_states.items())
+                        ],
+                    ),
+                ).model_dump(mode="json")
+
+            # 只复制顶层，调用方会在外层合并字段；嵌套结构只读共享
+            return dict(state.snapshot_data)
 
     async def set_room_video_source(
         self,
@@ -180,14 +530,17 @@ class RoomVideoRuntimeService:
 
             state.room_video_source = room_video_source
             state.playback = playback
-            state.user_resource_states.clear()
-            state.stalling_user_ids.clear()
+            # 旧视频源下尚未应用的上报一并作废
+            self._pending_resource_statuses.pop(room_id, None)
+            self._cancel_stall_evaluation_locked(room_id)
+            # 视频源切换会清空全部状态，广播完整快照而不是增量
+            self._reset_user_resource_states_locked(state)
             state.playback_hold_reason = PlaybackHoldReason.NONE
 
             return (
                 self._copy_room_video_source(room_video_source),
                 self._copy_playback(playback),
-                self._copy_user_resource_states(self._build_user_resource_states_locked(state)),
+                self._build_user_resource_states_locked(state),
             )
 
     async def play(
@@ -221,6 +574,7 @@ class RoomVideoRuntimeService:
                 playback_rate=playback_rate,
             )
             state.playback = playback
+            state.mark_changed()
             state.playback_hold_reason = PlaybackHoldReason.NONE
             return self._copy_playback(playback)
 
@@ -245,6 +599,7 @@ class RoomVideoRuntimeService:
                 playback_rate=playback_rate,
             )
             state.playback = playback
+            state.mark_changed()
             state.playback_hold_reason = (
                 PlaybackHoldReason.MANUAL
                 if sync_policy == RoomSyncPolicy.AUTO_SYNC
@@ -286,6 +641,7 @@ class RoomVideoRuntimeService:
                 playback_rate=playback_rate,
             )
             state.playback = playback
+            state.mark_changed()
             if should_hold_for_stalling:
                 state.playback_hold_reason = PlaybackHoldReason.STALL
             elif should_resume_now:
@@ -310,85 +666,149 @@ class RoomVideoRuntimeService:
         error_code: str | None = None,
         error_message: str | None = None,
     ) -> UserResourceStatesUpdateResult:
-        async with self._lock:
-            state = self._get_or_create_room_state_locked(room_id)
-            previous_state = state.user_resource_states.get(user_id)
-            previous_status = previous_state.status if previous_state is not None else None
-
-            user_resource_state = RoomUserResourceState(
-                room_id=room_id,
-                user_id=user_id,
-                status=status,
-                reported_at_ms=reported_at_ms,
-                position_seconds=position_seconds,
-                error_code=error_code,
-                error_message=error_message,
-            )
-            state.user_resource_states[user_id] = user_resource_state
-
-            if status == ResourceHealthStatusType.STALLING:
-                state.stalling_user_ids.add(user_id)
-            else:
-                state.stalling_user_ids.discard(user_id)
+        return await self.report_user_resource_statuses(
+            room_id=room_id,
+            reports=[
+                UserResourceStatusReport(
+                    user_id=user_id,
+                    status=status,
+                    reported_at_ms=reported_at_ms,
+                    position_seconds=position_seconds,
+                    error_code=error_code,
+                    error_message=error_message,
+                )
+            ],
+            sync_policy=sync_policy,
+        )
 
-            auto_playback: PlaybackState | None = None
-            auto_action: AutoPlaybackAction | None = None
+    async def report_user_resource_statuses(
+        self,
+        *,
+        room_id: int,
+        reports: list[UserResourceStatusReport],
+        sync_policy: RoomSyncPolicy,
+        stall_hysteresis: StallHysteresisPolicy | None = None,
+        on_update: UserResourceStatesUpdateListener | None = None,
+    ) -> UserResourceStatesUpdateResult:
+        stall_hysteresis = stall_hysteresis or StallHysteresisPolicy()
 
-            if sync_policy == RoomSyncPolicy.AUTO_SYNC:
-                entered_stalling = (
-                    status == ResourceHealthStatusType.STALLING
-                    and previous_status != ResourceHealthStatusType.STALLING
+        async with self._lock:
+            state = self._get_or_create_room_state_locked(room_id)
+            at_ms = now_ms()
+            upserted: list[RoomUserResourceState] = []
+
+            for report in reports:
+                previous_state = state.user_resource_states.get(report.user_id)
+                previous_status = previous_state.status if previous_state is not None else None
+
+                user_resource_state = RoomUserResourceState(
+                    room_id=room_id,
+                    user_id=report.user_id,
+                    status=report.status,
+                    reported_at_ms=report.reported_at_ms,
+                    position_seconds=report.position_seconds,
+                    error_code=report.error_code,
+                    error_message=report.error_message,
                 )
-                left_stalling = (
-                    previous_status == ResourceHealthStatusType.STALLING
-                    and status != ResourceHealthStatusType.STALLING
+                state.user_resource_states[report.user_id] = user_resource_state
+                upserted.append(user_resource_state)
+                self._record_user_stall_transition_locked(
+                    state,
+                    user_id=report.user_id,
+                    previous_status=previous_status,
+                    status=report.status,
+                    stall_hysteresis=stall_hysteresis,
+                    at_ms=at_ms,
                 )
 
-                if (
-                    entered_stalling
-                    and state.playback is not None
-                    and state.playback.status == PlaybackStatusType.PLAYING
-                    and state.playback_hold_reason != PlaybackHoldReason.STALL
-                ):
-                    anchor_ts_ms = now_ms()
-                    auto_playback = PlaybackState(
-                        room_id=room_id,
-                        status=PlaybackStatusType.PAUSED,
-                        position_seconds=self._resolve_position_seconds_locked(
-                            state.playback,
-                            at_ts_ms=anchor_ts_ms,
-                        ),
-                        anchor_ts_ms=anchor_ts_ms,
-                        playback_rate=state.playback.playback_rate,
-                    )
-                    state.playback = auto_playback
-                    state.playback_hold_reason = PlaybackHoldReason.STALL
-                    auto_action = AutoPlaybackAction.PAUSE
-                elif (
-                    left_stalling
-                    and not state.stalling_user_ids
-                    and state.playback_hold_reason == PlaybackHoldReason.STALL
-                ):
-                    if state.playback is not None:
-                        anchor_ts_ms = now_ms()
-                        auto_playback = PlaybackState(
-                            room_id=room_id,
-                            status=PlaybackStatusType.PLAYING,
-                            position_seconds=state.playback.position_seconds,
-                            anchor_ts_ms=anchor_ts_ms,
-                            playback_rate=state.playback.playback_rate,
-                        )
-                        state.playback = auto_playback
-                        auto_action = AutoPlaybackAction.PLAY
-                    state.playback_hold_reason = PlaybackHoldReason.NONE
-
-            payload = self._build_user_resource_states_locked(state)
+            # 一批上报只按房间最终状态判断一次：窗口内卡顿又恢复的用户不会触发暂停/恢复；
+            # 未满迟滞时长的卡顿/恢复交给计时器到点再判断
+            auto_playback, auto_action = self._evaluate_auto_playback_locked(
+                state,
+                sync_policy=sync_policy,
+                at_ms=at_ms,
+            )
+            self._schedule_stall_evaluation_locked(
+                state,
+                sync_policy=sync_policy,
+                on_update=on_update,
+                at_ms=at_ms,
+            )
+
             return UserResourceStatesUpdateResult(
-                user_resource_states=self._copy_user_resource_states(payload),
+                user_resource_states_delta=self._build_user_resource_states_delta_locked(
+                    state,
+                    upserted=upserted,
+                ),
                 auto_playback=self._copy_playback(auto_playback),
                 auto_action=auto_action,
             )
 
+    async def submit_user_resource_status(
+        self,
+        *,
+        room_id: int,
+        report: UserResourceStatusReport,
+        sync_policy: RoomSyncPolicy,
+        on_update: UserResourceStatesUpdateListener,
+        stall_hysteresis: StallHysteresisPolicy | None = None,
+    ) -> None:
+        stall_hysteresis = stall_hysteresis or StallHysteresisPolicy()
+        if self.resource_status_window_seconds <= 0:
+            result = await self.report_user_resource_statuses(
+                room_id=room_id,
+                reports=[report],
+                sync_policy=sync_policy,
+                stall_hysteresis=stall_hysteresis,
+                on_update=on_update,
+            )
+            await on_update(result=result)
+            return
+
+        # 窗口内同一用户只保留最后一次上报，窗口结束时统一应用并只发一次聚合更新
+        pending = self._pending_resource_statuses.get(room_id)
+        if pending is None:
+            pending = PendingUserResourceStatuses(sync_policy=sync_policy, on_update=on_update)
+            self._pending_resource_statuses[room_id] = pending
+        pending.reports[report.user_id] = report
+        pending.sync_policy = sync_policy
+        pending.on_update = on_update
+        pending.stall_hysteresis = stall_hysteresis
+
+        if room_id not in self._resource_status_window_tasks:
+            # 窗口汇总多个用户的上报，不能继承首个上报的 contextvars（SQL 统计、日志 request_id）
+            self._resource_status_window_tasks[room_id] = asyncio.create_task(
+                self._run_resource_status_window(room_id),
+                context=contextvars.Context(),
+            )
+
+    async def _run_resource_status_window(self, room_id: int) -> None:
+        try:
+            await asyncio.sleep(self.resource_status_window_seconds)
+        finally:
+            # 先摘掉窗口和待处理上报，之后到达的上报会开启新窗口
+            self._resource_status_window_tasks.pop(room_id, None)
+            pending = self._pending_resource_statuses.pop(room_id, None)
+
+        if pending is None or not pending.reports:
+            return
+
+        try:
+            result = await self.report_user_resource_statuses(
+                room_id=room_id,
+                reports=list(pending.reports.values()),
+                sync_policy=pending.sync_policy,
+                stall_hysteresis=pending.stall_hysteresis,
+                on_update=pending.on_update,
+            )
+            await pending.on_update(result=result)
+        except Exception:  # noqa: BLE001
+            logger.exception(
+                "user resource status window flush failed room_id=%s",
+                room_id,
+                **log_extra("ws.user_resource_status_flush_failed", room_id=room_id),
+            )
+
     async def handle_room_session_exit(
         self,
         *,
@@ -399,57 +819,48 @@ class RoomVideoRuntimeService:
     ) -> RoomSessionExitResult:
         async with self._lock:
             if room_empty:
-                self._room_states.pop(room_id, None)
+                self._pending_resource_statuses.pop(room_id, None)
+                self._cancel_stall_evaluation_locked(room_id)
+                state = self._room_states.get(room_id)
+                if (
+                    self.retain_empty_rooms
+                    and state is not None
+                    and state.room_video_source is not None
+                ):
+                    # 视频源和播放进度保留到宽限期结束，资源状态依赖在线连接，直接清空
+                    self._reset_user_resource_states_locked(state)
+                    state.unclaimed_since_ms = now_ms()
+                else:
+                    self._room_states.pop(room_id, None)
                 return RoomSessionExitResult(room_cleared=True)
 
+            self._discard_pending_resource_status(room_id=room_id, user_id=user_id)
             state = self._room_states.get(room_id)
             if state is None:
-                return RoomSessionExitResult(
-                    room_cleared=False,
-                    user_resource_states=UserResourceStatesState(
-                        room_id=room_id,
-                        user_resource_states=[],
-                    ),
-                )
+                return RoomSessionExitResult(room_cleared=False)
 
             previous_state = state.user_resource_states.pop(user_id, None)
             if previous_state is None:
-                return RoomSessionExitResult(
-                    room_cleared=False,
-                    user_resource_states=self._copy_user_resource_states(
-                        self._build_user_resource_states_locked(state)
-                    ),
-                )
+                # 该用户没有上报过状态，列表未变化，无需广播
+                return RoomSessionExitResult(room_cleared=False)
 
-            if previous_state.status == ResourceHealthStatusType.STALLING:
-                state.stalling_user_ids.discard(user_id)
+            self._forget_user_stall_locked(state, user_id=user_id)
 
             auto_playback: PlaybackState | None = None
             auto_action: AutoPlaybackAction | None = None
 
-            if (
-                sync_policy == RoomSyncPolicy.AUTO_SYNC
-                and previous_state.status == ResourceHealthStatusType.STALLING
-                and not state.stalling_user_ids
-                and state.playback_hold_reason == PlaybackHoldReason.STALL
-            ):
-                if state.playback is not None:
-                    anchor_ts_ms = now_ms()
-                    auto_playback = PlaybackState(
-                        room_id=room_id,
-                        status=PlaybackStatusType.PLAYING,
-                        position_seconds=state.playback.position_seconds,
-                        anchor_ts_ms=anchor_ts_ms,
-                        playback_rate=state.playback.playback_rate,
-                    )
-                    state.playback = auto_playback
+            # 离开只可能解除阻塞；其他用户仍在恢复期时交给已有的计时器续播
+            if sync_policy == RoomSyncPolicy.AUTO_SYNC:
+                auto_playback = self._try_auto_resume_locked(state, at_ms=now_ms())
+                if auto_playback is not None:
                     auto_action = AutoPlaybackAction.PLAY
-                state.playback_hold_reason = PlaybackHoldReason.NONE
 
-            payload = self._build_user_resource_states_locked(state)
             return RoomSessionExitResult(
                 room_cleared=False,
-                user_resource_states=self._copy_user_resource_states(payload),
+                user_resource_states_delta=self._build_user_resource_states_delta_locked(
+                    state,
+                    removed_user_id=user_id,
+                ),
                 auto_playback=self._copy_playback(auto_playback),
                 auto_action=auto_action,
             )
@@ -467,14 +878,100 @@ class RoomVideoRuntimeService:
             sync_policy=sync_policy,
             room_empty=False,
         )
-        if result.user_resource_states is None:
+        if result.user_resource_states_delta is None:
             return None
         return UserResourceStatesUpdateResult(
-            user_resource_states=result.user_resource_states,
+            user_resource_states_delta=result.user_resource_states_delta,
             auto_playback=result.auto_playback,
             auto_action=result.auto_action,
         )
 
+    async def export_room_states(self) -> list[dict[str, object]]:
+        async with self._lock:
+            # 资源状态和卡顿计时依赖在线连接，重启后由客户端重新上报，不持久化
+            return [
+                {
+                    "room_id": state.room_id,
+                    "room_video_source": state.room_video_source.model_dump(mode="json"),
+                    "playback": (
+                        state.playback.model_dump(mode="json")
+                        if state.playback is not None
+                        else None
+                    ),
+                    "playback_hold_reason": state.playback_hold_reason.value,
+                }
+                for state in self._room_states.values()
+                if state.room_video_source is not None
+            ]
+
+    async def restore_room_states(
+        self,
+        items: list[dict[str, object]],
+        *,
+        at_ms: int,
+    ) -> int:
+        restored_states: list[RoomVideoRuntimeState] = []
+        for item in items:
+            room_id = int(item["room_id"])
+            playback = (
+                PlaybackState.model_validate(item["playback"])
+                if item.get("playback") is not None
+                else None
+            )
+            if playback is not None and playback.status == PlaybackStatusType.PLAYING:
+                # 停机期间客户端仍按原锚点继续播放，恢复时把位置外推到当前时刻再重新锚定
+                playback = playback.model_copy(
+                    update={
+                        "position_seconds": self._resolve_position_seconds_locked(
+                            playback,
+                            at_ts_ms=at_ms,
+                        ),
+                        "anchor_ts_ms": at_ms,
+                    }
+                )
+            restored_states.append(
+                RoomVideoRuntimeState(
+                    room_id=room_id,
+                    room_video_source=RoomVideoSourceState.model_validate(
+                        item["room_video_source"]
+                    ),
+                    playback=playback,
+                    playback_hold_reason=PlaybackHoldReason(item["playback_hold_reason"]),
+                    unclaimed_since_ms=at_ms,
+                )
+            )
+
+        async with self._lock:
+            restored_count = 0
+            for state in restored_states:
+                # 已经有人重新设置过的房间以内存状态为准
+                if state.room_id in self._room_states:
+                    continue
+                self._room_states[state.room_id] = state
+                restored_count += 1
+            return restored_count
+
+    async def prune_unclaimed_rooms(
+        self,
+        *,
+        active_room_ids: set[int],
+        unclaimed_before_ms: int,
+    ) -> list[int]:
+        async with self._lock:
+            pruned_room_ids: list[int] = []
+            for room_id, state in list(self._room_states.items()):
+                if state.unclaimed_since_ms is None:
+                    continue
+                if room_id in active_room_ids:
+                    state.unclaimed_since_ms = None
+                    continue
+                if state.unclaimed_since_ms <= unclaimed_before_ms:
+                    del self._room_states[room_id]
+                    self._pending_resource_statuses.pop(room_id, None)
+                    self._cancel_stall_evaluation_locked(room_id)
+                    pruned_room_ids.append(room_id)
+            return pruned_room_ids
+
     async def clear_room_runtime(
         self,
         *,
@@ -482,3 +979,5 @@ class RoomVideoRuntimeService:
     ) -> None:
         async with self._lock:
             self._room_states.pop(room_id, None)
+            self._pending_resource_statuses.pop(room_id, None)
+            self._cancel_stall_evaluation_locked(room_id)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path
+
+from app.core.config import get_settings
+from app.core.logging import log_extra
+from app.core.snapshots import read_json_snapshot, write_json_snapshot
+from app.realtime.room_presence import RoomPresenceService
+from app.realtime.room_video_runtime import RoomVideoRuntimeService, now_ms
+
+settings = get_settings()
+logger = logging.getLogger("app.realtime.runtime_snapshot")
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+class RoomRuntimeSnapshotStore:
+    def __init__(
+        self,
+        *,
+        video_runtime_service: RoomVideoRuntimeService,
+        presence_service: RoomPresenceService,
+        snapshot_path: Path | None = None,
+    ) -> None:
+        self.video_runtime_service = video_runtime_service
+        self.presence_service = presence_service
+        self.snapshot_path = snapshot_path or settings.realtime_runtime_snapshot_path
+        self._task: asyncio.Task[None] | None = None
+
+    async def restore(self) -> int:
+        try:
+            snapshot = await asyncio.to_thread(read_json_snapshot, self.snapshot_path)
+            if snapshot is None:
+                return 0
+            if not isinstance(snapshot, dict):
+                raise ValueError("Runtime snapshot root must be an object")
+            if snapshot.get("version") != SNAPSHOT_FORMAT_VERSION:
+                return 0
+            saved_at_ms = int(snapshot["saved_at_ms"])
+            rooms = snapshot["rooms"]
+            if not isinstance(rooms, list):
+                raise ValueError("Runtime snapshot rooms must be a list")
+        except Exception:  # noqa: BLE001
+            # 快照只是加速恢复，内容不可用时按冷启动处理，不能阻塞应用启动
+            logger.warning(
+                "realtime runtime snapshot invalid path=%s",
+                self.snapshot_path,
+                exc_info=True,
+                **log_extra("realtime_runtime.snapshot_invalid", path=str(self.snapshot_path)),
+            )
+            return 0
+
+        at_ms = now_ms()
+        age_ms = at_ms - saved_at_ms
+        if age_ms > settings.realtime_runtime_snapshot_max_age_seconds * 1000:
+            logger.info(
+                "realtime runtime snapshot expired age_ms=%s",
+                age_ms,
+                **log_extra("realtime_runtime.snapshot_expired", age_ms=age_ms),
+            )
+            return 0
+
+        try:
+            restored_count = await self.video_runtime_service.restore_room_states(
+                rooms,
+                at_ms=at_ms,
+            )
+        except Exception:  # noqa: BLE001
+            logger.warning(
+                "realtime runtime snapshot restore failed path=%s",
+                self.snapshot_path,
+                exc_info=True,
+                **log_extra("realtime_runtime.restore_failed", path=str(self.snapshot_path)),
+            )
+            return 0
+
+        logger.info(
+            "realtime runtime snapshot restored rooms=%s age_ms=%s",
+            restored_count,
+            age_ms,
+            **log_extra(
+                "realtime_runtime.snapshot_restored",
+                rooms=restored_count,
+                age_ms=age_ms,
+            ),
+        )
+        return restored_count
+
+    async def save(self) -> None:
+        rooms = await self.video_runtime_service.export_room_states()
+        await asyncio.to_thread(
+            write_json_snapshot,
+            self.snapshot_path,
+            {
+                "version": SNAPSHOT_FORMAT_VERSION,
+                "saved_at_ms": now_ms(),
+                "rooms": rooms,
+            },
+        )
+
+    async def _prune_and_save(self) -> None:
+        await self.video_runtime_service.prune_unclaimed_rooms(
+            active_room_ids=await self.presence_service.get_active_room_ids(),
+            unclaimed_before_ms=now_ms() - settings.realtime_runtime_restore_grace_seconds * 1000,
+        )
+        await self.save()
+
+    async def _run(self, *, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self._prune_and_save()
+            except Exception:  # noqa: BLE001
+                logger.exception(
+                    "realtime runtime snapshot save failed path=%s",
+                    self.snapshot_path,
+                    **log_extra("realtime_runtime.save_failed", path=str(self.snapshot_path)),
+                )
+
+    def start(self, *, interval_seconds: float) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run(interval_seconds=interval_seconds))
+
+    async def stop(self) -> None:
+        task = self._task
+        self._task = None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        # 停机时再写一次，保证重启能拿到最新的播放位置
+        try:
+            await self.save()
+        except Exception:  # noqa: BLE001
+            logger.exception(
+                "realtime runtime snapshot save failed path=%s",
+                self.snapshot_path,
+                **log_extra("realtime_runtime.save_failed", path=str(self.snapshot_path)),
+            )
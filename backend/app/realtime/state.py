@@ -48,14 +48,24 @@ class UserResourceStatesState(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     room_id: int
+    seq: int = 0
     user_resource_states: list[RoomUserResourceState]
 
 
-class RoomSnapshot(BaseModel):
+class UserResourceStatesDeltaState(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     room_id: int
-    present_user_ids: list[int]
+    seq: int
+    upserted: list[RoomUserResourceState] = []
+    removed_user_ids: list[int] = []
+
+
+class RoomVideoRuntimeSnapshot(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    room_id: int
+    runtime_version: int = 0
     room_video_source: RoomVideoSourceState | None = None
     playback: PlaybackState | None = None
-    user_resource_states: UserResourceStatesState | None = None
+    user_resource_states: UserResourceStatesState
@@ -9,8 +9,9 @@ from app.core.database import AsyncSessionLocal
 from app.core.logging import log_extra
 from app.modules.rooms.constants import RoomSyncPolicy
 from app.modules.rooms.settings.service import RoomSettingsService
-from app.realtime.constants import AutoPlaybackAction
+from app.realtime.constants import AutoPlaybackAction, WsEncoding
 from app.realtime.handlers.dispatcher import RealtimeMessageHandler
+from app.realtime.handlers.heartbeat import is_ping_message, send_pong
 from app.realtime.manager import RealtimeManager, WsConnection
 from app.realtime.publisher import RealtimePublisher
 from app.realtime.room_presence import RoomPresenceService
@@ -76,6 +77,15 @@ async def websocket_endpoint(ws: WebSocket) -> None:
                     break
             else:
                 raw_message = await ws.receive_json()
+                connection.last_seen_at = time.monotonic()
+
+            # 标准 ping 不开数据库会话、不走 pydantic 校验
+            if is_ping_message(raw_message):
+                await send_pong(
+                    ws,
+                    encoding=connection.encoding if connection is not None else WsEncoding.JSON,
+                )
+                continue
 
             async with AsyncSessionLocal() as db:
                 connection = await handler.handle(
@@ -137,9 +147,12 @@ async def websocket_endpoint(ws: WebSocket) -> None:
                     sync_policy=sync_policy,
                     room_empty=not presence.present_user_ids,
                 )
-                if not session_exit_result.room_cleared and session_exit_result.user_resource_states is not None:
-                    await publisher.publish_user_resource_states(
-                        user_resource_states=session_exit_result.user_resource_states,
+                if (
+                    not session_exit_result.room_cleared
+                    and session_exit_result.user_resource_states_delta is not None
+                ):
+                    await publisher.publish_user_resource_states_delta(
+                        user_resource_states_delta=session_exit_result.user_resource_states_delta,
                     )
                     if (
                         session_exit_result.auto_action == AutoPlaybackAction.PLAY
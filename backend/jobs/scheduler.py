@@ -1,9 +1,23 @@
 import asyncio
 import logging
+import os
+import time
+from pathlib import Path
 
+from app.core.config import get_settings
+from app.core.metrics import job_duration_seconds
+
+settings = get_settings()
 logger = logging.getLogger(__name__)
 
 
+def write_job_metrics_textfile(path: Path) -> None:
+    # 先写临时文件再替换，采集方不会读到写了一半的文件
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text("\n".join(job_duration_seconds.render()) + "\n", encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
 async def run_interval_job(
     *,
     name: str,
@@ -11,9 +25,26 @@ async def run_interval_job(
     job_func,
 ) -> None:
     while True:
+        started_at = time.perf_counter()
+        status = "success"
         try:
             await job_func()
         except Exception:
+            status = "failed"
             logger.exception("job failed: %s", name)
 
-        await asyncio.sleep(interval_seconds)
\ No newline at end of file
+        duration_seconds = time.perf_counter() - started_at
+        job_duration_seconds.observe(duration_seconds, job=name, status=status)
+        logger.info(
+            "job finished: %s status=%s duration_ms=%s",
+            name,
+            status,
+            round(duration_seconds * 1000, 2),
+        )
+        if settings.jobs_metrics_textfile:
+            try:
+                write_job_metrics_textfile(Path(settings.jobs_metrics_textfile))
+            except OSError:
+                logger.warning("job metrics textfile write failed: %s", name, exc_info=True)
+
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,130 @@
+"""Compare two benchmark JSON baselines.
+
+Both files use the {"meta": {...}, <section>: {name: {...}}} layout written by
+tests/bench, where <section> is "endpoints" (HTTP) or "operations" (realtime
+microbenchmarks). Exits with status 1 when any entry regresses beyond the given
+thresholds, so it can gate a branch against a stored baseline:
+
+    python scripts/bench/compare_baseline.py base.json current.json --latency-threshold 0.2
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+RESULT_SECTIONS = ("endpoints", "operations")
+# 越大越差的计时指标
+LATENCY_METRICS = ("p50_ms", "p99_ms", "p50_us", "p99_us")
+# 越小越差的吞吐指标
+THROUGHPUT_METRICS = ("throughput_rps", "ops_per_sec")
+# 与计时无关、同样输入下应当稳定的计数指标，任何增加都视为回退
+COUNT_METRICS = ("sql_statements_per_request", "lock_acquisitions_per_op")
+# 内存分配在同一操作序列下基本稳定，但 tracemalloc 统计会有少量抖动
+ALLOCATION_METRICS = ("retained_blocks_per_op",)
+
+
+def load_results(path: Path) -> tuple[dict, dict]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    for section in RESULT_SECTIONS:
+        if section in data:
+            return data.get("meta", {}), data[section]
+    raise ValueError(f"{path} has none of {RESULT_SECTIONS}")
+
+
+def relative_change(base: float, current: float) -> float:
+    if base == 0:
+        return 0.0 if current == 0 else float("inf")
+    return (current - base) / base
+
+
+def compare(
+    base: dict,
+    current: dict,
+    *,
+    latency_threshold: float,
+    throughput_threshold: float,
+    allocation_threshold: float,
+) -> tuple[list[str], list[str]]:
+    lines: list[str] = []
+    regressions: list[str] = []
+
+    for name in sorted(base.keys() | current.keys()):
+        if name not in current:
+            lines.append(f"{name}: missing in current run")
+            continue
+        if name not in base:
+            lines.append(f"{name}: new entry")
+            continue
+
+        before = base[name]
+        after = current[name]
+        parts: list[str] = []
+
+        def shared(metrics: tuple[str, ...]) -> list[str]:
+            return [metric for metric in metrics if metric in before and metric in after]
+
+        for metric in shared(LATENCY_METRICS):
+            change = relative_change(before[metric], after[metric])
+            parts.append(f"{metric} {before[metric]:.2f}->{after[metric]:.2f} ({change:+.0%})")
+            if change > latency_threshold:
+                regressions.append(f"{name} {metric} {change:+.0%}")
+
+        for metric in shared(THROUGHPUT_METRICS):
+            change = relative_change(before[metric], after[metric])
+            parts.append(f"{metric} {before[metric]:.1f}->{after[metric]:.1f} ({change:+.0%})")
+            if change < -throughput_threshold:
+                regressions.append(f"{name} {metric} {change:+.0%}")
+
+        for metric in shared(COUNT_METRICS):
+            parts.append(f"{metric} {before[metric]}->{after[metric]}")
+            if after[metric] > before[metric]:
+                regressions.append(f"{name} {metric} {before[metric]}->{after[metric]}")
+
+        for metric in shared(ALLOCATION_METRICS):
+            change = relative_change(before[metric], after[metric])
+            parts.append(f"{metric} {before[metric]}->{after[metric]}")
+            if after[metric] > before[metric] and change > allocation_threshold:
+                regressions.append(f"{name} {metric} {before[metric]}->{after[metric]}")
+
+        lines.append(f"{name}: " + ", ".join(parts))
+
+    return lines, regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("base", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--latency-threshold", type=float, default=0.2)
+    parser.add_argument("--throughput-threshold", type=float, default=0.2)
+    parser.add_argument("--allocation-threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    base_meta, base = load_results(args.base)
+    current_meta, current = load_results(args.current)
+    print(f"base={base_meta.get('revision')} current={current_meta.get('revision')}")
+
+    lines, regressions = compare(
+        base,
+        current,
+        latency_threshold=args.latency_threshold,
+        throughput_threshold=args.throughput_threshold,
+        allocation_threshold=args.allocation_threshold,
+    )
+    for line in lines:
+        print(line)
+
+    if regressions:
+        print("\nregressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
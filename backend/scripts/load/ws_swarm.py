@@ -0,0 +1,553 @@
+"""WebSocket swarm load test for /ws.
+
+Seeds N synthetic users and M rooms into the database given by --database-url
+(which must be the one the server under test uses), connects every user to the
+running server, enters its room and then drives scripted play/pause/seek,
+user_resource_status and heartbeat traffic.
+
+Seeding writes to that database, so it only runs with an explicit --database-url
+and --allow-seed. Swarm users get a random password nobody knows; clients
+authenticate with access tokens signed by JWT_SECRET_KEY. --cleanup deletes all
+swarm users and rooms (including leftovers from earlier runs) afterwards.
+
+Usage (server started separately without --reload, so --server-pid is the
+process that actually serves /ws):
+
+    DB_FILENAME=loadtest.db python -m uvicorn app.main:app --port 8000 --ws websockets &
+    python scripts/load/ws_swarm.py --database-url sqlite+aiosqlite:///../data/loadtest.db \
+        --allow-seed --cleanup --users 2000 --rooms 100 --duration 60 \
+        --server-pid $! --output ../data/ws_swarm.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import secrets
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import websockets
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.core.security import create_access_token, hash_password
+from app.modules.rooms.constants import (
+    RoomActiveSyncPermission,
+    RoomJoinAuditMode,
+    RoomRole,
+    RoomSyncPolicy,
+    RoomVisibility,
+)
+from app.modules.rooms.models import Room, RoomJoinRequest, RoomMember, RoomSettings
+from app.modules.users.models import User
+
+SWARM_EMAIL_DOMAIN = "swarm.loadtest.local"
+SWARM_ROOM_PREFIX = "swarm-room-"
+PLAYBACK_EVENTS = {"playback_play", "playback_pause", "playback_seek"}
+
+
+@dataclass
+class SwarmStats:
+    connected: int = 0
+    connect_failures: int = 0
+    dropped: int = 0
+    commands_sent: int = 0
+    command_errors: dict[str, int] = field(default_factory=dict)
+    # (room_id, anchor_ts_ms) -> 命令发出时刻；事件按同一个键对齐
+    command_sent_at: dict[tuple[int, int], float] = field(default_factory=dict)
+    event_received_at: dict[tuple[int, int], list[float]] = field(default_factory=dict)
+    room_sizes: dict[int, int] = field(default_factory=dict)
+
+
+@dataclass
+class ProcessSample:
+    cpu_seconds: float
+    rss_bytes: int
+
+
+def read_process_sample(pid: int) -> ProcessSample | None:
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+        status = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return None
+
+    # utime/stime 在 ")" 之后的第 12、13 个字段
+    cpu_ticks = int(stat[11]) + int(stat[12])
+    rss_kb = 0
+    for line in status.splitlines():
+        if line.startswith("VmRSS:"):
+            rss_kb = int(line.split()[1])
+            break
+    return ProcessSample(
+        cpu_seconds=cpu_ticks / os.sysconf("SC_CLK_TCK"),
+        rss_bytes=rss_kb * 1024,
+    )
+
+
+async def seed_swarm(
+    session_factory: async_sessionmaker[AsyncSession],
+    *,
+    users: int,
+    rooms: int,
+) -> list[tuple[int, int]]:
+    # 返回 (user_id, room_id) 列表；重复运行时复用已存在的压测用户和房间
+    async with session_factory() as db:
+        existing_users = {
+            user.email: user
+            for user in (
+                await db.execute(
+                    select(User).where(User.email.like(f"%@{SWARM_EMAIL_DOMAIN}"))
+                )
+            ).scalars()
+        }
+        # 压测只用 access token 登录；密码随机且不输出，共用一个哈希避免为每个用户跑一次 bcrypt
+        hashed_password = hash_password(secrets.token_urlsafe(32))
+        swarm_users: list[User] = []
+        for index in range(users):
+            email = f"swarm-{index}@{SWARM_EMAIL_DOMAIN}"
+            user = existing_users.get(email)
+            if user is None:
+                user = User(
+                    email=email,
+                    username=f"swarm-{index}",
+                    hashed_password=hashed_password,
+                )
+                db.add(user)
+            swarm_users.append(user)
+        await db.flush()
+
+        existing_rooms = {
+            room.name: room
+            for room in (
+                await db.execute(select(Room).where(Room.name.like(f"{SWARM_ROOM_PREFIX}%")))
+            ).scalars()
+        }
+        swarm_rooms: list[Room] = []
+        for index in range(rooms):
+            name = f"{SWARM_ROOM_PREFIX}{index}"
+            room = existing_rooms.get(name)
+            if room is None:
+                room = Room(
+                    name=name,
+                    owner_id=swarm_users[index % users].id,
+                    visibility=RoomVisibility.PRIVATE,
+                    join_audit_mode=RoomJoinAuditMode.AUTO_REJECT,
+                )
+                db.add(room)
+                await db.flush()
+                db.add(
+                    RoomSettings(
+                        room_id=room.id,
+                        sync_policy=RoomSyncPolicy.AUTO_SYNC,
+                        active_sync_permission=RoomActiveSyncPermission.ALL_MEMBERS,
+                    )
+                )
+            swarm_rooms.append(room)
+        await db.flush()
+
+        room_ids = [room.id for room in swarm_rooms]
+        existing_members = set(
+            (
+                await db.execute(
+                    select(RoomMember.room_id, RoomMember.user_id).where(
+                        RoomMember.room_id.in_(room_ids)
+                    )
+                )
+            ).all()
+        )
+        assignments: list[tuple[int, int]] = []
+        for index, user in enumerate(swarm_users):
+            room = swarm_rooms[index % rooms]
+            assignments.append((user.id, room.id))
+            if (room.id, user.id) not in existing_members:
+                db.add(
+                    RoomMember(
+                        room_id=room.id,
+                        user_id=user.id,
+                        role=(
+                            RoomRole.OWNER.value
+                            if room.owner_id == user.id
+                            else RoomRole.MEMBER.value
+                        ),
+                    )
+                )
+        await db.commit()
+        return assignments
+
+
+async def cleanup_swarm(session_factory: async_sessionmaker[AsyncSession]) -> dict:
+    # 按邮箱域名和房间名前缀匹配，同时清掉以往运行遗留的压测数据
+    async with session_factory() as db:
+        user_ids = select(User.id).where(User.email.like(f"%@{SWARM_EMAIL_DOMAIN}"))
+        room_ids = select(Room.id).where(Room.name.like(f"{SWARM_ROOM_PREFIX}%"))
+        # SQLite 未开启外键约束，依赖行需要显式删除
+        await db.execute(
+            delete(RoomJoinRequest).where(
+                RoomJoinRequest.room_id.in_(room_ids)
+                | RoomJoinRequest.initiator_user_id.in_(user_ids)
+                | RoomJoinRequest.target_user_id.in_(user_ids)
+            )
+        )
+        await db.execute(
+            delete(RoomMember).where(
+                RoomMember.room_id.in_(room_ids) | RoomMember.user_id.in_(user_ids)
+            )
+        )
+        await db.execute(delete(RoomSettings).where(RoomSettings.room_id.in_(room_ids)))
+        deleted_rooms = (await db.execute(delete(Room).where(Room.id.in_(room_ids)))).rowcount
+        deleted_users = (await db.execute(delete(User).where(User.id.in_(user_ids)))).rowcount
+        await db.commit()
+    return {"users": deleted_users, "rooms": deleted_rooms}
+
+
+async def send_command(ws, *, action: str, data: dict | None, request_ids) -> None:  # noqa: ANN001
+    await ws.send(
+        json.dumps(
+            {
+                "v": 1,
+                "type": "command",
+                "payload": {
+                    "request_id": f"req-{next(request_ids)}",
+                    "action": action,
+                    "data": data,
+                },
+            }
+        )
+    )
+
+
+async def wait_for_ack(ws) -> dict:  # noqa: ANN001
+    while True:
+        message = json.loads(await ws.recv())
+        if message["type"] == "ack":
+            return message["payload"] or {}
+        if message["type"] == "error":
+            raise RuntimeError(message["payload"]["reason"])
+
+
+async def run_client(
+    *,
+    url: str,
+    user_id: int,
+    room_id: int,
+    is_driver: bool,
+    args: argparse.Namespace,
+    stats: SwarmStats,
+    connect_gate: asyncio.Semaphore,
+    started: asyncio.Event,
+    stop_at: list[float],
+) -> None:
+    request_ids = itertools.count()
+    try:
+        async with connect_gate:
+            ws = await websockets.connect(url, max_size=None)
+            await ws.send(
+                json.dumps(
+                    {
+                        "v": 1,
+                        "type": "auth",
+                        "payload": {"token": create_access_token(str(user_id))},
+                    }
+                )
+            )
+            await wait_for_ack(ws)
+            await send_command(
+                ws,
+                action="room_enter",
+                data={"room_id": room_id},
+                request_ids=request_ids,
+            )
+            await wait_for_ack(ws)
+    except Exception:  # noqa: BLE001
+        stats.connect_failures += 1
+        return
+
+    stats.connected += 1
+    stats.room_sizes[room_id] = stats.room_sizes.get(room_id, 0) + 1
+    rng = random.Random(user_id)
+
+    async def receive_loop() -> None:
+        async for raw in ws:
+            received_at = time.perf_counter()
+            message = json.loads(raw)
+            payload = message.get("payload") or {}
+            if message["type"] == "error":
+                reason = payload.get("reason") or "unknown"
+                stats.command_errors[reason] = stats.command_errors.get(reason, 0) + 1
+                continue
+            if message["type"] == "event" and payload.get("event") in PLAYBACK_EVENTS:
+                data = payload["data"]
+                key = (data["room_id"], data["anchor_ts_ms"])
+                stats.event_received_at.setdefault(key, []).append(received_at)
+
+    async def heartbeat_loop() -> None:
+        while True:
+            await asyncio.sleep(args.heartbeat_interval * rng.uniform(0.8, 1.2))
+            await ws.send('{"v":1,"type":"heartbeat","payload":{"action":"ping"}}')
+
+    async def resource_status_loop() -> None:
+        while True:
+            await asyncio.sleep(args.status_interval * rng.uniform(0.5, 1.5))
+            status = "stalling" if rng.random() < args.stall_ratio else "ready"
+            await send_command(
+                ws,
+                action="user_resource_status",
+                data={"status": status, "reported_at_ms": int(time.time() * 1000)},
+                request_ids=request_ids,
+            )
+            stats.commands_sent += 1
+
+    async def playback_loop() -> None:
+        actions = itertools.cycle(["playback_play", "playback_seek", "playback_pause"])
+        # 播放命令要求房间已有视频源
+        last_anchor_ts_ms = int(time.time() * 1000)
+        await send_command(
+            ws,
+            action="room_video_source_set",
+            data={
+                "source_type": "external_url",
+                "external_url": args.video_url,
+                "anchor_ts_ms": last_anchor_ts_ms,
+            },
+            request_ids=request_ids,
+        )
+        position_seconds = 0.0
+        while True:
+            await asyncio.sleep(args.command_interval)
+            action = next(actions)
+            # anchor_ts_ms 在房间内单调递增，作为命令与广播事件的关联键
+            anchor_ts_ms = max(int(time.time() * 1000), last_anchor_ts_ms + 1)
+            last_anchor_ts_ms = anchor_ts_ms
+            position_seconds += args.command_interval
+            data: dict = {"position_seconds": position_seconds, "anchor_ts_ms": anchor_ts_ms}
+            if action != "playback_seek":
+                data["playback_rate"] = 1.0
+            stats.command_sent_at[(room_id, anchor_ts_ms)] = time.perf_counter()
+            await send_command(ws, action=action, data=data, request_ids=request_ids)
+            stats.commands_sent += 1
+
+    await started.wait()
+    tasks = [
+        asyncio.create_task(receive_loop()),
+        asyncio.create_task(heartbeat_loop()),
+        asyncio.create_task(resource_status_loop()),
+    ]
+    if is_driver:
+        tasks.append(asyncio.create_task(playback_loop()))
+
+    try:
+        done, _ = await asyncio.wait(
+            tasks,
+            timeout=max(0.0, stop_at[0] - time.perf_counter()),
+            return_when=asyncio.FIRST_EXCEPTION,
+        )
+        if done:
+            # 压测结束前任何循环退出都意味着服务端断开了连接
+            stats.dropped += 1
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await ws.close()
+
+
+def percentile(values: list[float], ratio: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(ratio * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize_fanout(stats: SwarmStats) -> dict:
+    latencies_ms: list[float] = []
+    partial = 0
+    missing = 0
+    for key, sent_at in stats.command_sent_at.items():
+        received = stats.event_received_at.get(key)
+        if not received:
+            # 合并窗口内被更新的命令取代，不会单独广播
+            missing += 1
+            continue
+        if len(received) < stats.room_sizes.get(key[0], 0):
+            partial += 1
+        latencies_ms.append((max(received) - sent_at) * 1000)
+
+    return {
+        "commands": len(stats.command_sent_at),
+        "broadcasts_observed": len(latencies_ms),
+        "coalesced_or_missing": missing,
+        "partial_deliveries": partial,
+        "p50_ms": percentile(latencies_ms, 0.50),
+        "p90_ms": percentile(latencies_ms, 0.90),
+        "p99_ms": percentile(latencies_ms, 0.99),
+        "max_ms": max(latencies_ms) if latencies_ms else None,
+    }
+
+
+async def run_swarm(args: argparse.Namespace) -> dict:
+    engine = create_async_engine(args.database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        report = await drive_swarm(args, session_factory)
+        if args.cleanup:
+            report["cleanup"] = await cleanup_swarm(session_factory)
+    finally:
+        await engine.dispose()
+    return report
+
+
+async def drive_swarm(
+    args: argparse.Namespace,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> dict:
+    assignments = await seed_swarm(session_factory, users=args.users, rooms=args.rooms)
+    stats = SwarmStats()
+    connect_gate = asyncio.Semaphore(args.connect_concurrency)
+    started = asyncio.Event()
+    stop_at = [float("inf")]
+
+    # 每个房间的第一个用户负责发播放命令，其余用户只观察广播
+    driver_user_ids: set[int] = set()
+    driver_rooms: set[int] = set()
+    for user_id, room_id in assignments:
+        if room_id not in driver_rooms:
+            driver_rooms.add(room_id)
+            driver_user_ids.add(user_id)
+
+    clients = [
+        asyncio.create_task(
+            run_client(
+                url=args.url,
+                user_id=user_id,
+                room_id=room_id,
+                is_driver=user_id in driver_user_ids,
+                args=args,
+                stats=stats,
+                connect_gate=connect_gate,
+                started=started,
+                stop_at=stop_at,
+            )
+        )
+        for user_id, room_id in assignments
+    ]
+
+    ramp_started_at = time.perf_counter()
+    while stats.connected + stats.connect_failures < len(clients):
+        await asyncio.sleep(0.2)
+    ramp_seconds = time.perf_counter() - ramp_started_at
+
+    before = read_process_sample(args.server_pid) if args.server_pid else None
+    peak_rss = before.rss_bytes if before else 0
+    run_started_at = time.perf_counter()
+    stop_at[0] = run_started_at + args.duration
+    started.set()
+
+    while time.perf_counter() < stop_at[0]:
+        await asyncio.sleep(1)
+        if args.server_pid:
+            sample = read_process_sample(args.server_pid)
+            if sample is not None:
+                peak_rss = max(peak_rss, sample.rss_bytes)
+    after = read_process_sample(args.server_pid) if args.server_pid else None
+    wall_seconds = time.perf_counter() - run_started_at
+
+    await asyncio.gather(*clients, return_exceptions=True)
+
+    server: dict | None = None
+    if before is not None and after is not None:
+        server = {
+            "cpu_percent": round((after.cpu_seconds - before.cpu_seconds) / wall_seconds * 100, 1),
+            "rss_start_mb": round(before.rss_bytes / 2**20, 1),
+            "rss_end_mb": round(after.rss_bytes / 2**20, 1),
+            "rss_peak_mb": round(peak_rss / 2**20, 1),
+        }
+
+    return {
+        "users": args.users,
+        "rooms": args.rooms,
+        "duration_seconds": args.duration,
+        "ramp_seconds": round(ramp_seconds, 2),
+        "connected": stats.connected,
+        "connect_failures": stats.connect_failures,
+        "dropped_connections": stats.dropped,
+        "commands_sent": stats.commands_sent,
+        "command_errors": stats.command_errors,
+        "fanout_latency": summarize_fanout(stats),
+        "server": server,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--url", default="ws://127.0.0.1:8000/ws")
+    parser.add_argument(
+        "--database-url",
+        required=True,
+        help="async SQLAlchemy URL of the database the server under test uses",
+    )
+    parser.add_argument(
+        "--allow-seed",
+        action="store_true",
+        help="confirm that swarm users and rooms may be written to --database-url",
+    )
+    parser.add_argument(
+        "--cleanup",
+        action="store_true",
+        help="delete all swarm users and rooms from --database-url after the run",
+    )
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--rooms", type=int, default=25)
+    parser.add_argument(
+        "--duration", type=float, default=30.0, help="steady-state seconds after ramp-up"
+    )
+    parser.add_argument(
+        "--command-interval",
+        type=float,
+        default=1.0,
+        help="seconds between playback commands per room",
+    )
+    parser.add_argument("--status-interval", type=float, default=5.0)
+    parser.add_argument("--stall-ratio", type=float, default=0.0)
+    parser.add_argument("--video-url", default="https://example.com/swarm.mp4")
+    parser.add_argument("--heartbeat-interval", type=float, default=25.0)
+    parser.add_argument("--connect-concurrency", type=int, default=200)
+    parser.add_argument(
+        "--server-pid", type=int, default=None, help="sample CPU and RSS from /proc/<pid>"
+    )
+    parser.add_argument(
+        "--output", type=Path, default=None, help="write the JSON report to this path"
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.rooms < 1 or args.users < args.rooms:
+        print("--users must be >= --rooms >= 1")
+        return 1
+    if not args.allow_seed:
+        print(f"refusing to seed swarm users into {args.database_url} without --allow-seed")
+        return 1
+
+    report = asyncio.run(run_swarm(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output is not None:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
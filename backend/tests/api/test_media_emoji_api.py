@@ -36,3 +36,33 @@ async def test_get_recent_emojis_returns_service_payload(
 
     assert response.status_code == 200
     assert response.json()["items"][0]["id"] == "smile"
+
+
+# 验证表情列表接口返回预编码字节和 ETag，携带匹配的 If-None-Match 时返回 304。
+async def test_get_emojis_returns_etag_and_not_modified(api_client, monkeypatch) -> None:
+    from app.api.v1 import media as media_api
+
+    body = b'{"items":[]}'
+
+    async def fake_get_encoded_visible_emojis():
+        return body, '"abc"'
+
+    monkeypatch.setattr(
+        media_api.media_service,
+        "get_encoded_visible_emojis",
+        fake_get_encoded_visible_emojis,
+    )
+
+    response = await api_client.get("/api/v1/media/emojis")
+
+    assert response.status_code == 200
+    assert response.content == body
+    assert response.headers["etag"] == '"abc"'
+
+    not_modified = await api_client.get(
+        "/api/v1/media/emojis",
+        headers={"If-None-Match": 'W/"other", "abc"'},
+    )
+
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
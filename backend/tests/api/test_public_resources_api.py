@@ -1,6 +1,10 @@
 from datetime import datetime, timedelta, timezone
+from io import BytesIO
+
+import pytest
 
 from app.modules.media.constants import MediaAssetStatus, MediaAssetType
+from app.modules.media.derivatives import media_derivative_pipeline
 from app.modules.media.service import MediaService
 
 
@@ -65,3 +69,45 @@ async def test_get_avatar_file_rejects_missing_disk_file(api_client, factories)
 
     assert response.status_code == 404
     assert response.json()["error"]["code"] == "not_found"
+
+
+# 验证上传图片会记录尺寸，?w= 按档位返回缓存在磁盘上的 WebP 缩略图，档位不小于原图宽度时返回原图。
+async def test_image_width_param_serves_cached_webp_variant(
+    api_client,
+    factories,
+    auth_headers,
+) -> None:
+    image_module = pytest.importorskip("PIL.Image")
+    user = await factories.create_user()
+    await factories.commit()
+
+    buffer = BytesIO()
+    image_module.new("RGB", (400, 200), (200, 30, 30)).save(buffer, "PNG")
+    original = buffer.getvalue()
+    upload = await api_client.post(
+        "/api/v1/media/images",
+        files={"file": ("poster.png", original, "image/png")},
+        headers=auth_headers(user),
+    )
+    assert upload.status_code == 200
+    body = upload.json()
+    assert (body["width"], body["height"]) == (400, 200)
+
+    response = await api_client.get(f"{body['url']}?w=100")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    with image_module.open(BytesIO(response.content)) as variant:
+        assert variant.size == (192, 96)
+    storage_key = body["url"].rsplit("/", 1)[-1]
+    assert media_derivative_pipeline.get_variant_path(
+        asset_type=MediaAssetType.IMAGE,
+        storage_key=storage_key,
+        width=192,
+    ).exists()
+
+    # 450 落在 480 档，档位不小于原图宽度 400，直接返回原图
+    response = await api_client.get(f"{body['url']}?w=450")
+
+    assert response.status_code == 200
+    assert response.content == original
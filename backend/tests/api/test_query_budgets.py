@@ -0,0 +1,113 @@
+from app.core.config import get_settings
+from app.core.database import collect_query_stats
+from app.modules.media.constants import MediaAssetType
+from app.modules.rooms.constants import RoomRole, RoomVisibility
+
+settings = get_settings()
+
+# 每个列表至少造出这么多行，逐行查询的 N+1 会在同一语句形状上重复到阈值
+FANOUT_ROWS = settings.db_n_plus_one_threshold + 1
+
+# 接口 -> 单次请求允许的 SQL 条数上限（含鉴权查询用户）
+QUERY_BUDGETS = {
+    "GET /rooms/{room_id}/messages": 5,
+    "POST /rooms/{room_id}/messages": 5,
+    "GET /rooms": 5,
+    "GET /rooms/{room_id}": 3,
+    "GET /rooms/{room_id}/members": 7,
+    "GET /rooms/{owned_room_id}/join-requests": 10,
+    "GET /join-requests?scope=handled_by_me": 7,
+    "GET /join-requests?scope=all_related_to_me": 7,
+    "GET /users/me": 3,
+    "GET /users/me/rooms": 5,
+    "GET /users/me/owned-rooms": 5,
+    "GET /users": 4,
+    "GET /notifications": 4,
+    "GET /notifications/unread-count": 2,
+}
+
+# 已知会走扫描或临时排序的语句片段 -> 原因；新增条目需要说明为何无法靠索引消除
+ACCEPTED_QUERY_PLANS = {
+    "WHERE rooms.owner_id = ? OR room_members_1.user_id = ?": (
+        "我的房间列表按 owner 或成员身份 OR 过滤，条件跨外连接两侧，单个索引无法覆盖"
+    ),
+    "OR room_join_requests.room_id IN (?...)": (
+        "与我相关的申请按多列 OR 过滤，走 MULTI-INDEX OR 后只能临时排序"
+    ),
+    "FROM users ORDER BY users.id DESC": "用户列表按主键倒序翻页，没有过滤条件",
+    "SELECT count(*) AS count_1 FROM users": "用户列表总数",
+}
+
+
+async def _seed_room_graph(factories) -> dict:  # noqa: ANN001
+    me = await factories.create_user()
+    others = [await factories.create_user() for _ in range(FANOUT_ROWS)]
+    for user in [me, *others]:
+        avatar = await factories.create_media_asset(
+            asset_type=MediaAssetType.AVATAR,
+            uploaded_by=user,
+        )
+        await factories.attach_avatar(user=user, asset=avatar)
+
+    rooms = []
+    for index, owner in enumerate(others):
+        room = await factories.create_room(owner=owner, visibility=RoomVisibility.PUBLIC)
+        await factories.add_member(
+            room=room,
+            user=me,
+            role=RoomRole.MANAGER if index % 2 else RoomRole.MEMBER,
+        )
+        rooms.append(room)
+
+    room = rooms[0]
+    owned_room = await factories.create_room(owner=me, visibility=RoomVisibility.PUBLIC)
+    for other in others:
+        if other.id != room.owner_id:
+            await factories.add_member(room=room, user=other)
+        await factories.create_join_request(room=owned_room, initiator=other, target=other)
+        await factories.create_notification(recipient=me, actor=other)
+        await factories.create_message(
+            room=room,
+            sender=other,
+            content='{"segments":[{"type":"text","text":"hello"}]}',
+        )
+    await factories.commit()
+    return {"me": me, "room_id": room.id, "owned_room_id": owned_room.id}
+
+
+# 验证热点接口的 SQL 条数不超过预算，不会对列表逐行发起同形状查询（N+1），且查询计划不退化为全表扫描或临时排序。
+async def test_hot_endpoints_stay_within_query_budgets(
+    api_client,
+    factories,
+    auth_headers,
+    query_plans,
+) -> None:
+    graph = await _seed_room_graph(factories)
+    headers = auth_headers(graph["me"])
+    over_budget: dict[str, int] = {}
+    n_plus_one: dict[str, dict[str, int]] = {}
+
+    # POST 会新增消息，放到最后不影响其他接口的数据
+    for endpoint in sorted(QUERY_BUDGETS, key=lambda name: name.startswith("POST")):
+        method, path = endpoint.split(" ", 1)
+        url = "/api/v1" + path.format(
+            room_id=graph["room_id"],
+            owned_room_id=graph["owned_room_id"],
+        )
+        kwargs = {}
+        if method == "POST":
+            kwargs["json"] = {"content": {"segments": [{"type": "text", "text": "budget"}]}}
+
+        with collect_query_stats() as stats, query_plans.capture():
+            response = await api_client.request(method, url, headers=headers, **kwargs)
+
+        assert response.status_code in {200, 201}, (endpoint, response.text)
+        if stats.statements > QUERY_BUDGETS[endpoint]:
+            over_budget[endpoint] = stats.statements
+        repeated = stats.repeated_shapes(settings.db_n_plus_one_threshold)
+        if repeated:
+            n_plus_one[endpoint] = repeated
+
+    assert over_budget == {}
+    assert n_plus_one == {}
+    assert await query_plans.violations(accepted=ACCEPTED_QUERY_PLANS) == {}
@@ -2,6 +2,7 @@ from unittest.mock import AsyncMock
 
 from app.modules.rooms.constants import RoomRole
 from app.modules.rooms.models import RoomMember
+from app.realtime.constants import RoomMembersChangeType
 
 
 # 验证普通成员可以主动退出房间，并触发会话清理和成员列表广播。
@@ -33,7 +34,9 @@ async def test_leave_room_removes_current_member_and_publishes_members(
     assert all(item.user_id != member.id for item in members)
     assert any(item.user_id == owner.id for item in members)
     app.state.realtime_publisher.publish_room_members.assert_awaited_once_with(
-        room_id=room.id
+        room_id=room.id,
+        change_type=RoomMembersChangeType.REMOVED,
+        user_id=member.id,
     )
 
 
@@ -82,9 +85,10 @@ async def test_set_room_member_manager_promotes_member(
     members = await factories.list_all(RoomMember)
     updated = next(item for item in members if item.user_id == member.id)
     assert updated.role == RoomRole.MANAGER
-    app.state.realtime_publisher.publish_room_members.assert_awaited_once_with(
-        room_id=room.id
-    )
+    publish_kwargs = app.state.realtime_publisher.publish_room_members.await_args.kwargs
+    assert publish_kwargs["change_type"] == RoomMembersChangeType.ROLE_CHANGED
+    assert publish_kwargs["user_id"] == member.id
+    assert publish_kwargs["member"].role == RoomRole.MANAGER
 
 
 # 验证具备 MANAGE_MANAGERS 权限的房主可以解除管理员。
@@ -113,9 +117,10 @@ async def test_unset_room_member_manager_demotes_manager(
     members = await factories.list_all(RoomMember)
     updated = next(item for item in members if item.user_id == manager.id)
     assert updated.role == RoomRole.MEMBER
-    app.state.realtime_publisher.publish_room_members.assert_awaited_once_with(
-        room_id=room.id
-    )
+    publish_kwargs = app.state.realtime_publisher.publish_room_members.await_args.kwargs
+    assert publish_kwargs["change_type"] == RoomMembersChangeType.ROLE_CHANGED
+    assert publish_kwargs["user_id"] == manager.id
+    assert publish_kwargs["member"].role == RoomRole.MEMBER
 
 
 # 验证普通管理员没有 MANAGE_MANAGERS 权限，不能设置其他管理员。
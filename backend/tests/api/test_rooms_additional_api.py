@@ -8,6 +8,7 @@ from app.modules.rooms.constants import (
     RoomRole,
     RoomVisibility,
 )
+from app.realtime.constants import RoomMembersChangeType
 
 
 # 验证房间列表接口只返回公开房间，并支持名称筛选。
@@ -86,10 +87,43 @@ async def test_patch_room_settings_publishes_realtime_event(
 
     assert response.status_code == 200
     assert response.json()["seek_auto_pause"] is False
-    app.state.realtime_publisher.publish_room_settings.assert_awaited_once_with(
-        room_id=room.id
+    room_settings = app.state.realtime_publisher.publish_room_settings.await_args.kwargs[
+        "room_settings"
+    ]
+    assert room_settings.room_id == room.id
+    assert room_settings.seek_auto_pause is False
+
+
+# 验证房间设置可以调整卡顿迟滞参数，超出上限的取值会被拒绝。
+async def test_patch_room_settings_updates_stall_hysteresis(
+    api_client,
+    factories,
+    auth_headers,
+) -> None:
+    owner = await factories.create_user()
+    room = await factories.create_room(owner=owner)
+    await factories.commit()
+
+    response = await api_client.patch(
+        f"/api/v1/rooms/{room.id}/settings",
+        json={"stall_min_duration_ms": 0, "stall_flap_penalty_ms": 2500},
+        headers=auth_headers(owner),
     )
 
+    assert response.status_code == 200
+    body = response.json()
+    assert body["stall_min_duration_ms"] == 0
+    assert body["ready_min_duration_ms"] == 1000
+    assert body["stall_flap_penalty_ms"] == 2500
+
+    response = await api_client.patch(
+        f"/api/v1/rooms/{room.id}/settings",
+        json={"ready_min_duration_ms": 60000},
+        headers=auth_headers(owner),
+    )
+
+    assert response.status_code == 422
+
 
 # 验证自动通过的入房申请接口会直接广播房间成员列表。
 async def test_apply_join_request_auto_approve_publishes_room_members(
@@ -114,9 +148,12 @@ async def test_apply_join_request_auto_approve_publishes_room_members(
     )
 
     assert response.status_code == 200
-    app.state.realtime_publisher.publish_room_members.assert_awaited_once_with(
-        room_id=room.id
-    )
+    app.state.realtime_publisher.publish_room_members.assert_awaited_once()
+    publish_kwargs = app.state.realtime_publisher.publish_room_members.await_args.kwargs
+    assert publish_kwargs["room_id"] == room.id
+    assert publish_kwargs["change_type"] == RoomMembersChangeType.ADDED
+    assert publish_kwargs["user_id"] == applicant.id
+    assert publish_kwargs["member"].user_id == applicant.id
 
 
 # 验证普通成员发起邀请时，会通知目标用户以及房间审核人。
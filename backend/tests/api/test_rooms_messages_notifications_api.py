@@ -1,6 +1,7 @@
 from unittest.mock import AsyncMock
 
 from app.modules.rooms.constants import RoomRole
+from app.realtime.constants import RoomMembersChangeType
 
 
 # 验证通过 API 创建房间消息时会触发 realtime 广播。
@@ -75,5 +76,7 @@ async def test_remove_room_member_closes_session_and_publishes_members(
 
     assert response.status_code == 204
     app.state.realtime_publisher.publish_room_members.assert_awaited_once_with(
-        room_id=room.id
+        room_id=room.id,
+        change_type=RoomMembersChangeType.REMOVED,
+        user_id=member.id,
     )
@@ -0,0 +1,48 @@
+import json
+import platform
+import sqlite3
+import subprocess
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@pytest.fixture
+def write_bench_baseline() -> Callable[..., None]:
+    # 所有基线文件统一为 {"meta": ..., <section>: {name: metrics}}，供 compare_baseline.py 对比
+    def _write(path: Path, *, section: str, results: dict, meta: dict) -> None:
+        baseline = {
+            "meta": {
+                "revision": _git_revision(),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                **meta,
+            },
+            section: results,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(baseline, indent=2, ensure_ascii=False) + "\n",
+            encoding="utf-8",
+        )
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+
+    return _write
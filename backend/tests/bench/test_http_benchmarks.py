@@ -0,0 +1,352 @@
+import json
+import os
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+import pytest
+from sqlalchemy import event, insert, select
+
+from app.core.database import engine
+from app.core.security import hash_password
+from app.modules.media.constants import MediaAssetStatus, MediaAssetType
+from app.modules.media.models import MediaAsset
+from app.modules.media.service import MediaService
+from app.modules.notifications.constants import NotificationType
+from app.modules.notifications.models import Notification
+from app.modules.messages.models import Message
+from app.modules.rooms.constants import (
+    RoomActiveSyncPermission,
+    RoomJoinAuditMode,
+    RoomRole,
+    RoomSyncPolicy,
+    RoomVisibility,
+)
+from app.modules.rooms.models import Room, RoomMember, RoomSettings
+from app.modules.users.models import User
+
+# 基准测试默认跳过，设置 ICINEMA_BENCH=1 后运行：
+#   ICINEMA_BENCH=1 python -m pytest tests/bench -q -s
+pytestmark = pytest.mark.skipif(
+    os.environ.get("ICINEMA_BENCH") != "1",
+    reason="set ICINEMA_BENCH=1 to run HTTP benchmarks",
+)
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+BENCH_USERS = int(os.environ.get("ICINEMA_BENCH_USERS", "100000"))
+BENCH_ROOMS = int(os.environ.get("ICINEMA_BENCH_ROOMS", "10000"))
+BENCH_MESSAGES = int(os.environ.get("ICINEMA_BENCH_MESSAGES", "1000000"))
+BENCH_ITERATIONS = int(os.environ.get("ICINEMA_BENCH_ITERATIONS", "200"))
+BENCH_WARMUP = int(os.environ.get("ICINEMA_BENCH_WARMUP", "20"))
+BENCH_OUTPUT = Path(
+    os.environ.get(
+        "ICINEMA_BENCH_OUTPUT",
+        str(BACKEND_ROOT.parent / "data" / "bench" / "http_baseline.json"),
+    )
+)
+
+# 压测用户加入的房间数与收到的通知数，覆盖分页接口的常见规模
+BENCH_USER_ROOM_COUNT = 50
+BENCH_USER_NOTIFICATION_COUNT = 500
+# 热点房间分到的消息比例，用于测深翻页的历史消息查询
+HOT_ROOM_MESSAGE_RATIO = 0.05
+INSERT_CHUNK_SIZE = 20000
+SEED_BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _chunks(rows, size: int = INSERT_CHUNK_SIZE):  # noqa: ANN001, ANN202
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def _bulk_insert(db_session, model, rows) -> None:  # noqa: ANN001
+    for chunk in _chunks(rows):
+        await db_session.execute(insert(model), chunk)
+
+
+def _text_content(text: str) -> str:
+    return json.dumps({"segments": [{"type": "text", "text": text}]}, ensure_ascii=False)
+
+
+async def _seed_dataset(db_session) -> dict:  # noqa: ANN001
+    hashed_password = hash_password("Password123")
+    await _bulk_insert(
+        db_session,
+        User,
+        (
+            {
+                "email": f"bench{index}@example.com",
+                "username": f"bench-{index}",
+                "hashed_password": hashed_password,
+            }
+            for index in range(BENCH_USERS)
+        ),
+    )
+    user_ids = list((await db_session.execute(select(User.id).order_by(User.id))).scalars())
+
+    # 房间交替公开/私有，owner 依次取自用户表
+    await _bulk_insert(
+        db_session,
+        Room,
+        (
+            {
+                "name": f"Bench Room {index}",
+                "owner_id": user_ids[index % len(user_ids)],
+                "visibility": RoomVisibility.PUBLIC if index % 2 == 0 else RoomVisibility.PRIVATE,
+                "join_audit_mode": RoomJoinAuditMode.MANUAL_REVIEW,
+            }
+            for index in range(BENCH_ROOMS)
+        ),
+    )
+    rooms = (await db_session.execute(select(Room.id, Room.owner_id).order_by(Room.id))).all()
+    room_ids = [room_id for room_id, _ in rooms]
+    await _bulk_insert(
+        db_session,
+        RoomSettings,
+        (
+            {
+                "room_id": room_id,
+                "sync_policy": RoomSyncPolicy.AUTO_SYNC,
+                "active_sync_permission": RoomActiveSyncPermission.OWNER_AND_MANAGER,
+            }
+            for room_id in room_ids
+        ),
+    )
+
+    # 每个用户再以成员身份加入一个房间；压测用户额外加入一批房间
+    bench_user_id = user_ids[0]
+    bench_room_ids = set(room_ids[:BENCH_USER_ROOM_COUNT])
+    memberships = {(room_id, owner_id): RoomRole.OWNER.value for room_id, owner_id in rooms}
+    for index, user_id in enumerate(user_ids):
+        room_id = room_ids[(index * 7 + 3) % len(room_ids)]
+        memberships.setdefault((room_id, user_id), RoomRole.MEMBER.value)
+    for room_id in bench_room_ids:
+        memberships.setdefault((room_id, bench_user_id), RoomRole.MEMBER.value)
+    await _bulk_insert(
+        db_session,
+        RoomMember,
+        (
+            {"room_id": room_id, "user_id": user_id, "role": role, "joined_at": SEED_BASE_TIME}
+            for (room_id, user_id), role in memberships.items()
+        ),
+    )
+
+    members_by_room: dict[int, list[int]] = {}
+    for room_id, user_id in memberships:
+        members_by_room.setdefault(room_id, []).append(user_id)
+
+    hot_room_id = room_ids[0]
+    hot_room_messages = int(BENCH_MESSAGES * HOT_ROOM_MESSAGE_RATIO)
+
+    def message_rows():  # noqa: ANN202
+        for index in range(BENCH_MESSAGES):
+            if index < hot_room_messages:
+                room_id = hot_room_id
+            else:
+                room_id = room_ids[index % len(room_ids)]
+            senders = members_by_room[room_id]
+            yield {
+                "room_id": room_id,
+                "sender_user_id": senders[index % len(senders)],
+                "content": _text_content(f"bench message {index}"),
+                "created_at": SEED_BASE_TIME + timedelta(seconds=index),
+                "updated_at": SEED_BASE_TIME + timedelta(seconds=index),
+            }
+
+    await _bulk_insert(db_session, Message, message_rows())
+
+    # 通知：压测用户一批未读/已读混合，其余用户各一条
+    def notification_rows():  # noqa: ANN202
+        for index in range(BENCH_USER_NOTIFICATION_COUNT):
+            yield {
+                "recipient_user_id": bench_user_id,
+                "actor_user_id": user_ids[(index + 1) % len(user_ids)],
+                "notification_type": NotificationType.WORKFLOW,
+                "is_read": index % 3 == 0,
+                "created_at": SEED_BASE_TIME + timedelta(seconds=index),
+            }
+        for index, user_id in enumerate(user_ids[1:], start=1):
+            yield {
+                "recipient_user_id": user_id,
+                "actor_user_id": bench_user_id,
+                "notification_type": NotificationType.WORKFLOW,
+                "is_read": False,
+                "created_at": SEED_BASE_TIME + timedelta(seconds=index),
+            }
+
+    await _bulk_insert(db_session, Notification, notification_rows())
+
+    image_asset = MediaAsset(
+        asset_type=MediaAssetType.IMAGE,
+        storage_key="bench-image.png",
+        mime_type="image/png",
+        file_size=64 * 1024,
+        sha256="bench-image",
+        uploaded_by_user_id=bench_user_id,
+        status=MediaAssetStatus.ACTIVE,
+    )
+    db_session.add(image_asset)
+    await db_session.commit()
+
+    image_path = MediaService().storage.get_file_path(
+        asset_type=MediaAssetType.IMAGE,
+        storage_key=image_asset.storage_key,
+    )
+    image_path.parent.mkdir(parents=True, exist_ok=True)
+    image_path.write_bytes(os.urandom(image_asset.file_size))
+
+    oldest_hot_message_id = (
+        await db_session.execute(
+            select(Message.id).where(Message.room_id == hot_room_id).order_by(Message.id).limit(1)
+        )
+    ).scalar_one()
+
+    return {
+        "bench_user": await db_session.get(User, bench_user_id),
+        "hot_room_id": hot_room_id,
+        # 翻到热点房间中段的位置，避免只测最新一页
+        "history_before_id": oldest_hot_message_id + hot_room_messages // 2,
+        "image_storage_key": image_asset.storage_key,
+    }
+
+
+class SqlStatementCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *args, **kwargs) -> None:  # noqa: ANN002, ANN003
+        self.count += 1
+
+    def __enter__(self) -> "SqlStatementCounter":
+        event.listen(engine.sync_engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc) -> None:  # noqa: ANN002
+        event.remove(engine.sync_engine, "before_cursor_execute", self)
+
+
+def _percentile(values: list[float], ratio: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(ratio * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _measure(
+    request: Callable[[int], Awaitable[httpx.Response]],
+    *,
+    expected_status: int,
+) -> dict:
+    for index in range(BENCH_WARMUP):
+        response = await request(index)
+        assert response.status_code == expected_status, response.text
+
+    durations: list[float] = []
+    with SqlStatementCounter() as counter:
+        started_at = time.perf_counter()
+        for index in range(BENCH_ITERATIONS):
+            request_started_at = time.perf_counter()
+            response = await request(BENCH_WARMUP + index)
+            durations.append(time.perf_counter() - request_started_at)
+            assert response.status_code == expected_status, response.text
+        elapsed = time.perf_counter() - started_at
+
+    return {
+        "requests": BENCH_ITERATIONS,
+        "throughput_rps": round(BENCH_ITERATIONS / elapsed, 1),
+        "p50_ms": round(_percentile(durations, 0.50) * 1000, 3),
+        "p99_ms": round(_percentile(durations, 0.99) * 1000, 3),
+        "mean_ms": round(sum(durations) / len(durations) * 1000, 3),
+        "sql_statements_per_request": round(counter.count / BENCH_ITERATIONS, 2),
+    }
+
+
+# 在大规模种子数据上依次压测聊天与房间热点接口，并把吞吐、延迟分位和 SQL 条数写入 JSON 基线。
+async def test_http_hot_path_benchmarks(
+    api_client,
+    db_session,
+    auth_headers,
+    write_bench_baseline,
+) -> None:
+    seed_started_at = time.perf_counter()
+    dataset = await _seed_dataset(db_session)
+    seed_seconds = time.perf_counter() - seed_started_at
+
+    headers = auth_headers(dataset["bench_user"])
+    hot_room_id = dataset["hot_room_id"]
+    messages_path = f"/api/v1/rooms/{hot_room_id}/messages"
+    history_before_id = dataset["history_before_id"]
+    image_path = f"/image/{dataset['image_storage_key']}"
+
+    scenarios: dict[str, tuple[Callable[[int], Awaitable[httpx.Response]], int]] = {
+        "POST /rooms/{id}/messages": (
+            lambda index: api_client.post(
+                messages_path,
+                headers=headers,
+                json={"content": {"segments": [{"type": "text", "text": f"bench post {index}"}]}},
+            ),
+            201,
+        ),
+        "GET /rooms/{id}/messages": (
+            lambda index: api_client.get(messages_path, headers=headers),
+            200,
+        ),
+        "GET /rooms/{id}/messages?before_id": (
+            lambda index: api_client.get(
+                messages_path,
+                headers=headers,
+                params={"before_id": history_before_id - index},
+            ),
+            200,
+        ),
+        "GET /rooms": (
+            lambda index: api_client.get(
+                "/api/v1/rooms",
+                headers=headers,
+                params={"page": index % 50 + 1},
+            ),
+            200,
+        ),
+        "GET /users/me/rooms": (
+            lambda index: api_client.get("/api/v1/users/me/rooms", headers=headers),
+            200,
+        ),
+        "GET /notifications": (
+            lambda index: api_client.get("/api/v1/notifications", headers=headers),
+            200,
+        ),
+        "GET /notifications/unread-count": (
+            lambda index: api_client.get("/api/v1/notifications/unread-count", headers=headers),
+            200,
+        ),
+        "GET /image/{storage_key}": (
+            lambda index: api_client.get(image_path),
+            200,
+        ),
+    }
+
+    results = {
+        name: await _measure(request, expected_status=expected_status)
+        for name, (request, expected_status) in scenarios.items()
+    }
+
+    write_bench_baseline(
+        BENCH_OUTPUT,
+        section="endpoints",
+        results=results,
+        meta={
+            "users": BENCH_USERS,
+            "rooms": BENCH_ROOMS,
+            "messages": BENCH_MESSAGES,
+            "iterations": BENCH_ITERATIONS,
+            "warmup": BENCH_WARMUP,
+            "seed_seconds": round(seed_seconds, 1),
+        },
+    )
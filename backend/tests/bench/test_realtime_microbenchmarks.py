@@ -0,0 +1,320 @@
+import asyncio
+import os
+import random
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import pytest
+
+from app.modules.rooms.constants import RoomSyncPolicy, RoomVideoSourceType
+from app.realtime import room_video_runtime
+from app.realtime.constants import ResourceHealthStatusType
+from app.realtime.manager import RealtimeManager, WsConnection
+from app.realtime.room_presence import RoomPresenceService
+from app.realtime.room_video_runtime import (
+    RoomVideoRuntimeService,
+    StallHysteresisPolicy,
+    UserResourceStatusReport,
+)
+
+# 与 HTTP 基准测试共用开关：ICINEMA_BENCH=1 python -m pytest tests/bench -q -s
+pytestmark = pytest.mark.skipif(
+    os.environ.get("ICINEMA_BENCH") != "1",
+    reason="set ICINEMA_BENCH=1 to run realtime microbenchmarks",
+)
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+MICRO_ROOMS = int(os.environ.get("ICINEMA_BENCH_MICRO_ROOMS", "2000"))
+MICRO_USERS_PER_ROOM = int(os.environ.get("ICINEMA_BENCH_MICRO_USERS_PER_ROOM", "20"))
+MICRO_OPERATIONS = int(os.environ.get("ICINEMA_BENCH_MICRO_OPERATIONS", "50000"))
+# 每批并发提交的操作数，让锁竞争接近线上多个连接同时处理命令的情形
+MICRO_CONCURRENCY = int(os.environ.get("ICINEMA_BENCH_MICRO_CONCURRENCY", "64"))
+MICRO_SEED = int(os.environ.get("ICINEMA_BENCH_MICRO_SEED", "20260101"))
+MICRO_OUTPUT = Path(
+    os.environ.get(
+        "ICINEMA_BENCH_REALTIME_OUTPUT",
+        str(BACKEND_ROOT.parent / "data" / "bench" / "realtime_baseline.json"),
+    )
+)
+
+# 每个操作前推进的虚拟时间，让卡顿迟滞在压测过程中真实地确认和解除
+VIRTUAL_TICK_MS = 5
+STALL_HYSTERESIS = StallHysteresisPolicy(
+    min_stall_ms=500,
+    min_ready_ms=1000,
+    flap_penalty_ms=1000,
+)
+
+Operation = Callable[[int], Awaitable[object]]
+
+
+class VirtualClock:
+    def __init__(self, start_ms: int = 1_767_225_600_000) -> None:
+        self.current_ms = start_ms
+
+    def now_ms(self) -> int:
+        return self.current_ms
+
+    def advance(self, delta_ms: int) -> None:
+        self.current_ms += delta_ms
+
+
+class InstrumentedLock(asyncio.Lock):
+    def __init__(self) -> None:
+        super().__init__()
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_ns = 0
+
+    async def acquire(self) -> bool:
+        started_at = time.perf_counter_ns()
+        if self.locked():
+            self.contended += 1
+        result = await super().acquire()
+        self.wait_ns += time.perf_counter_ns() - started_at
+        self.acquisitions += 1
+        return result
+
+    def reset(self) -> None:
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_ns = 0
+
+
+class BenchWebSocket:
+    # presence 只登记连接，不向 websocket 发送数据
+    pass
+
+
+def _percentile(values: list[int], ratio: float) -> int:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(ratio * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _run_operations(
+    operation: Operation,
+    *,
+    clock: VirtualClock,
+    count: int,
+) -> list[int]:
+    durations_ns: list[int] = [0] * count
+
+    async def timed(index: int) -> None:
+        started_at = time.perf_counter_ns()
+        await operation(index)
+        durations_ns[index] = time.perf_counter_ns() - started_at
+
+    for batch_start in range(0, count, MICRO_CONCURRENCY):
+        batch = range(batch_start, min(count, batch_start + MICRO_CONCURRENCY))
+        clock.advance(VIRTUAL_TICK_MS)
+        await asyncio.gather(*(timed(index) for index in batch))
+    return durations_ns
+
+
+async def _benchmark(
+    operation: Operation,
+    *,
+    clock: VirtualClock,
+    locks: list[InstrumentedLock],
+    count: int = MICRO_OPERATIONS,
+) -> dict:
+    for lock in locks:
+        lock.reset()
+
+    started_at = time.perf_counter()
+    durations_ns = await _run_operations(operation, clock=clock, count=count)
+    elapsed = time.perf_counter() - started_at
+    acquisitions = sum(lock.acquisitions for lock in locks)
+    contended = sum(lock.contended for lock in locks)
+    wait_ns = sum(lock.wait_ns for lock in locks)
+
+    # 分配统计单独跑一轮：tracemalloc 会显著拖慢计时
+    # retained 为操作结束后仍存活的净增内存块，peak 为操作过程中的峰值增量
+    allocation_count = max(1, count // 10)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    traced_before, _ = tracemalloc.get_traced_memory()
+    await _run_operations(operation, clock=clock, count=allocation_count)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    diff = after.compare_to(before, "filename")
+
+    return {
+        "operations": count,
+        "ops_per_sec": round(count / elapsed, 1),
+        "p50_us": round(_percentile(durations_ns, 0.50) / 1000, 2),
+        "p99_us": round(_percentile(durations_ns, 0.99) / 1000, 2),
+        "lock_acquisitions_per_op": round(acquisitions / count, 2),
+        "lock_contended_ratio": round(contended / acquisitions, 4) if acquisitions else 0.0,
+        "lock_wait_us_per_op": round(wait_ns / count / 1000, 3),
+        "retained_blocks_per_op": round(sum(stat.count_diff for stat in diff) / allocation_count, 2),
+        "retained_bytes_per_op": round(sum(stat.size_diff for stat in diff) / allocation_count, 1),
+        "peak_bytes_per_op": round((traced_peak - traced_before) / allocation_count, 1),
+    }
+
+
+# 用虚拟时钟驱动上千个房间的播放、资源上报、快照与进出房间，输出每类操作的吞吐、锁等待和内存分配基线。
+async def test_realtime_service_microbenchmarks(
+    monkeypatch,
+    write_bench_baseline,
+) -> None:
+    clock = VirtualClock()
+    monkeypatch.setattr(room_video_runtime, "now_ms", clock.now_ms)
+    rng = random.Random(MICRO_SEED)
+
+    runtime = RoomVideoRuntimeService()
+    runtime_lock = InstrumentedLock()
+    runtime._lock = runtime_lock
+    presence = RoomPresenceService()
+    presence_lock = InstrumentedLock()
+    presence._lock = presence_lock
+    manager = RealtimeManager()
+    manager_lock = InstrumentedLock()
+    manager._lock = manager_lock
+
+    room_ids = list(range(1, MICRO_ROOMS + 1))
+    connections: dict[tuple[int, int], WsConnection] = {}
+    for room_id in room_ids:
+        await runtime.set_room_video_source(
+            room_id=room_id,
+            source_type=RoomVideoSourceType.EXTERNAL_URL,
+            external_url=f"https://example.com/{room_id}.mp4",
+        )
+        for offset in range(MICRO_USERS_PER_ROOM):
+            user_id = room_id * 1000 + offset
+            connection = await manager.register_connection(
+                user_id=user_id,
+                websocket=BenchWebSocket(),
+            )
+            await presence.enter_room(manager=manager, connection=connection, room_id=room_id)
+            connections[(room_id, user_id)] = connection
+
+    # 预生成操作参数，保证每次运行的操作序列完全一致且不把随机数开销计入
+    room_sequence = [rng.choice(room_ids) for _ in range(MICRO_OPERATIONS)]
+    user_sequence = [rng.randrange(MICRO_USERS_PER_ROOM) for _ in range(MICRO_OPERATIONS)]
+    stalling_sequence = [rng.random() < 0.2 for _ in range(MICRO_OPERATIONS)]
+
+    def pick(index: int) -> tuple[int, int]:
+        room_id = room_sequence[index % MICRO_OPERATIONS]
+        return room_id, room_id * 1000 + user_sequence[index % MICRO_OPERATIONS]
+
+    async def playback_command(index: int) -> None:
+        room_id, _ = pick(index)
+        position_seconds = index * 0.5
+        action = index % 3
+        if action == 0:
+            await runtime.pause(
+                room_id=room_id,
+                position_seconds=position_seconds,
+                anchor_ts_ms=clock.now_ms(),
+                sync_policy=RoomSyncPolicy.DISABLED,
+            )
+        elif action == 1:
+            await runtime.seek(
+                room_id=room_id,
+                position_seconds=position_seconds,
+                anchor_ts_ms=clock.now_ms(),
+                sync_policy=RoomSyncPolicy.DISABLED,
+            )
+        else:
+            await runtime.play(
+                room_id=room_id,
+                position_seconds=position_seconds,
+                anchor_ts_ms=clock.now_ms(),
+                sync_policy=RoomSyncPolicy.DISABLED,
+            )
+
+    async def resource_status_report(index: int) -> None:
+        room_id, user_id = pick(index)
+        await runtime.report_user_resource_statuses(
+            room_id=room_id,
+            reports=[
+                UserResourceStatusReport(
+                    user_id=user_id,
+                    status=(
+                        ResourceHealthStatusType.STALLING
+                        if stalling_sequence[index % MICRO_OPERATIONS]
+                        else ResourceHealthStatusType.READY
+                    ),
+                    reported_at_ms=clock.now_ms(),
+                )
+            ],
+            sync_policy=RoomSyncPolicy.AUTO_SYNC,
+            stall_hysteresis=STALL_HYSTERESIS,
+        )
+
+    async def room_snapshot(index: int) -> None:
+        room_id, _ = pick(index)
+        await runtime.get_room_snapshot(room_id=room_id)
+
+    async def presence_reenter(index: int) -> None:
+        room_id, user_id = pick(index)
+        connection = connections[(room_id, user_id)]
+        await presence.leave_room(manager=manager, connection=connection, room_id=room_id)
+        await runtime.handle_room_session_exit(
+            room_id=room_id,
+            user_id=user_id,
+            sync_policy=RoomSyncPolicy.AUTO_SYNC,
+            room_empty=False,
+        )
+        await presence.enter_room(manager=manager, connection=connection, room_id=room_id)
+
+    async def presence_state(index: int) -> None:
+        room_id, _ = pick(index)
+        await presence.get_presence_state(room_id=room_id)
+
+    async def evict_and_rejoin_room(index: int) -> None:
+        room_id = room_ids[index % len(room_ids)]
+        await presence.evict_room_users(manager=manager, room_id=room_id)
+        for offset in range(MICRO_USERS_PER_ROOM):
+            user_id = room_id * 1000 + offset
+            await presence.enter_room(
+                manager=manager,
+                connection=connections[(room_id, user_id)],
+                room_id=room_id,
+            )
+
+    runtime_locks = [runtime_lock]
+    presence_locks = [presence_lock, manager_lock]
+    results = {
+        "runtime.play_pause_seek": await _benchmark(
+            playback_command, clock=clock, locks=runtime_locks
+        ),
+        "runtime.report_user_resource_status": await _benchmark(
+            resource_status_report, clock=clock, locks=runtime_locks
+        ),
+        "runtime.get_room_snapshot": await _benchmark(
+            room_snapshot, clock=clock, locks=runtime_locks
+        ),
+        "presence.leave_and_enter_room": await _benchmark(
+            presence_reenter, clock=clock, locks=[*presence_locks, runtime_lock]
+        ),
+        "presence.get_presence_state": await _benchmark(
+            presence_state, clock=clock, locks=presence_locks
+        ),
+        # 每次操作清空并重新填满一个房间，操作数按房间数取
+        "presence.evict_room_users": await _benchmark(
+            evict_and_rejoin_room, clock=clock, locks=presence_locks, count=MICRO_ROOMS
+        ),
+    }
+
+    assert runtime.count_rooms() == MICRO_ROOMS
+    assert len(presence.room_user_connections) == MICRO_ROOMS
+
+    write_bench_baseline(
+        MICRO_OUTPUT,
+        section="operations",
+        results=results,
+        meta={
+            "rooms": MICRO_ROOMS,
+            "users_per_room": MICRO_USERS_PER_ROOM,
+            "operations": MICRO_OPERATIONS,
+            "concurrency": MICRO_CONCURRENCY,
+            "seed": MICRO_SEED,
+        },
+    )
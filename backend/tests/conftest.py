@@ -2,14 +2,15 @@ import os
 import shutil
 import sys
 import tempfile
-from collections.abc import AsyncIterator, Callable
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from types import SimpleNamespace
 
 import httpx
 import pytest
 import pytest_asyncio
-from sqlalchemy import delete, select
+from sqlalchemy import delete, event, select
 
 
 BACKEND_ROOT = Path(__file__).resolve().parents[1]
@@ -22,11 +23,13 @@ TEST_DATA_DIR = Path(tempfile.gettempdir()) / "icinema_backend_new_tests"
 os.environ.setdefault("DATA_DIR", str(TEST_DATA_DIR))
 os.environ["DEBUG"] = "false"
 
-from app.core.database import AsyncSessionLocal, engine
+from app.core.database import AsyncSessionLocal, engine, statement_shape
 from app.core.security import create_access_token, create_refresh_token, hash_password
 from app.core.startup import ensure_runtime_paths
 from app.db.base import Base
 from app.main import create_app
+from app.modules.media.avatar_key_cache import avatar_key_cache
+from app.modules.media.emoji_usage_recorder import emoji_usage_recorder
 from app.modules.media.constants import (
     EmojiProvider,
     MediaAssetStatus,
@@ -74,6 +77,9 @@ async def prepare_test_database() -> AsyncIterator[None]:
 @pytest_asyncio.fixture(autouse=True)
 async def reset_database() -> AsyncIterator[None]:
     yield
+    # 聚合缓冲是进程级单例，先把本用例留下的使用记录写完再清表
+    await emoji_usage_recorder.stop()
+    avatar_key_cache.clear()
     async with AsyncSessionLocal() as session:
         for table in reversed(Base.metadata.sorted_tables):
             await session.execute(delete(table))
@@ -279,6 +285,7 @@ async def factories(db_session):
         )
         db_session.add(avatar_asset)
         await db_session.flush()
+        avatar_key_cache.invalidate(user.id)
         return avatar_asset
 
     async def add_sticker_to_library(
@@ -408,6 +415,43 @@ async def factories(db_session):
     yield factory_namespace
 
 
+@pytest_asyncio.fixture
+async def query_plans():
+    captured: dict[str, tuple[str, object]] = {}
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.setdefault(statement_shape(statement), (statement, parameters))
+
+    @contextmanager
+    def capture() -> Iterator[None]:
+        event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+        try:
+            yield
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+    # 对捕获到的每种 SELECT 执行 EXPLAIN QUERY PLAN，返回走全表扫描或临时 B 树排序的语句
+    async def violations(*, accepted: dict[str, str] | None = None) -> dict[str, list[str]]:
+        found: dict[str, list[str]] = {}
+        async with engine.connect() as conn:
+            for shape, (statement, parameters) in captured.items():
+                if any(pattern in shape for pattern in accepted or {}):
+                    continue
+                result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                bad_steps = [
+                    row.detail
+                    for row in result
+                    if (row.detail.startswith("SCAN ") and row.detail != "SCAN CONSTANT ROW")
+                    or "USE TEMP B-TREE" in row.detail
+                ]
+                if bad_steps:
+                    found[shape] = bad_steps
+        return found
+
+    yield SimpleNamespace(capture=capture, violations=violations, captured=captured)
+
+
 @pytest.fixture
 def sample_upload_bytes() -> bytes:
     return b"not-a-real-png-but-good-enough-for-tests"
@@ -1,10 +1,24 @@
+import json
 import logging
+import queue
 from types import SimpleNamespace
 
 import httpx
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
 
-from app.core.logging import configure_logging, log_extra
+from app.core.database import AsyncSessionLocal
+
+from app.core.logging import (
+    ContextQueueHandler,
+    EventSamplingFilter,
+    JsonFormatter,
+    clear_log_context,
+    configure_logging,
+    log_extra,
+    set_log_context,
+)
 from app.core.middleware import RequestLoggingMiddleware
 
 
@@ -28,6 +42,31 @@ async def test_request_logging_middleware_returns_request_id_header() -> None:
     assert response.headers["X-Request-ID"] == "req-test"
 
 
+# 验证纯 ASGI 中间件不会缓冲流式响应，并会给流式响应补上请求 ID。
+async def test_request_logging_middleware_passes_streaming_response_through() -> None:
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware)
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def chunks():
+            yield b"first-"
+            yield b"second"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport,
+        base_url="http://testserver",
+    ) as client:
+        response = await client.get("/stream")
+
+    assert response.status_code == 200
+    assert response.text == "first-second"
+    assert response.headers["X-Request-ID"]
+
+
 # 验证默认排除的健康检查路径不会产生 access log 噪音。
 async def test_request_logging_middleware_skips_health_access_log(caplog) -> None:
     app = FastAPI()
@@ -80,6 +119,46 @@ async def test_authenticated_request_access_log_has_user_id(
     assert getattr(access_records[-1], "user_id") == user.id
 
 
+# 验证 access log 带上本次请求的 SQL 条数与耗时，同一语句形状重复达到阈值时记 N+1 告警。
+async def test_access_log_records_sql_statements_and_flags_repeated_shapes(caplog) -> None:
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware)
+
+    @app.get("/loop")
+    async def loop() -> dict[str, int]:
+        async with AsyncSessionLocal() as db:
+            for user_id in range(6):
+                await db.execute(text("SELECT :user_id"), {"user_id": user_id})
+            await db.execute(text("SELECT 1 WHERE 1 IN (1, 2, 3)"))
+        return {"ok": 1}
+
+    caplog.set_level(logging.INFO, logger="app.http.access")
+    caplog.set_level(logging.INFO, logger="app.db")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport,
+        base_url="http://testserver",
+    ) as client:
+        response = await client.get("/loop")
+
+    assert response.status_code == 200
+    access_record = next(
+        record
+        for record in caplog.records
+        if getattr(record, "event", None) == "http.request"
+    )
+    assert access_record.fields["db_statements"] == 7
+    assert access_record.fields["db_ms"] >= 0
+
+    n_plus_one_records = [
+        record for record in caplog.records if getattr(record, "event", None) == "db.n_plus_one"
+    ]
+    assert len(n_plus_one_records) == 1
+    assert n_plus_one_records[0].fields["count"] == 6
+    assert n_plus_one_records[0].fields["target"] == "GET /loop"
+
+
 # 验证业务字段即使与 LogRecord 保留字段同名，也只会进入 fields。
 def test_log_extra_keeps_reserved_keys_inside_fields() -> None:
     extra = log_extra("test.event", name="bad-name", msg="bad-msg", user_id=123)["extra"]
@@ -97,13 +176,91 @@ def test_configure_logging_suppresses_uvicorn_info_by_default() -> None:
     configure_logging(
         SimpleNamespace(
             log_level="INFO",
+            log_format="text",
             log_sql=False,
             log_access_exclude_paths=["/health"],
             log_uvicorn_access=False,
             log_uvicorn_level="WARNING",
+            log_sample_rates={},
+            log_rate_limits={},
         ),
         force=True,
     )
 
     assert logging.getLogger("uvicorn.access").disabled is True
     assert logging.getLogger("uvicorn.error").level == logging.WARNING
+
+
+# 验证异步日志队列会在调用方上下文中写入 request_id / user_id，并提前合并消息参数。
+def test_context_queue_handler_stamps_log_context() -> None:
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    handler = ContextQueueHandler(log_queue)
+    record = logging.LogRecord(
+        name="app.test",
+        level=logging.INFO,
+        pathname=__file__,
+        lineno=1,
+        msg="room_id=%s",
+        args=(7,),
+        exc_info=None,
+    )
+
+    set_log_context(request_id="req-queue", user_id=42)
+    try:
+        handler.handle(record)
+    finally:
+        clear_log_context()
+
+    queued = log_queue.get_nowait()
+    assert queued.request_id == "req-queue"
+    assert queued.user_id == 42
+    assert queued.getMessage() == "room_id=7"
+
+
+# 验证 JSON 格式化器沿用 log_extra 的 event / fields 约定输出结构化日志。
+def test_json_formatter_outputs_event_and_fields() -> None:
+    record = logging.makeLogRecord(
+        {
+            "name": "app.realtime",
+            "levelno": logging.INFO,
+            "levelname": "INFO",
+            "msg": "ws room enter room_id=%s",
+            "args": (3,),
+            **log_extra("ws.room_enter", user_id=5, room_id=3)["extra"],
+        }
+    )
+
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["event"] == "ws.room_enter"
+    assert payload["user_id"] == 5
+    assert payload["fields"] == {"room_id": 3}
+    assert payload["message"] == "ws room enter room_id=3"
+
+
+# 验证事件采样和每秒限流只丢弃匹配规则的 INFO 日志，WARNING 及以上始终保留。
+def test_event_sampling_filter_samples_and_rate_limits_events(monkeypatch) -> None:
+    log_filter = EventSamplingFilter(
+        sample_rates={"ws.user_resource_status": 0.0},
+        rate_limits={"ws.*": 2},
+    )
+    monkeypatch.setattr("app.core.logging.time.monotonic", lambda: 100.0)
+
+    def make_record(event: str, level: int = logging.INFO) -> logging.LogRecord:
+        return logging.makeLogRecord(
+            {"levelno": level, **log_extra(event, room_id=1)["extra"]}
+        )
+
+    assert log_filter.filter(make_record("ws.user_resource_status")) is False
+    assert log_filter.filter(make_record("ws.user_resource_status", logging.WARNING)) is True
+    assert [log_filter.filter(make_record("ws.playback_seek")) for _ in range(3)] == [
+        True,
+        True,
+        False,
+    ]
+    assert log_filter.filter(make_record("http.request")) is True
+
+    monkeypatch.setattr("app.core.logging.time.monotonic", lambda: 101.5)
+    record = make_record("ws.playback_seek")
+    assert log_filter.filter(record) is True
+    assert record.fields["rate_limited"] == 1
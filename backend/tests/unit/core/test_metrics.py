@@ -0,0 +1,135 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.config import get_settings
+from app.core.metrics import MetricsRegistry
+from app.main import create_app
+from jobs.scheduler import run_interval_job
+
+settings = get_settings()
+
+
+@pytest.fixture
+async def metrics_client(monkeypatch):
+    # /metrics 默认不注册，这里显式开启后再创建应用
+    monkeypatch.setattr(settings, "metrics_enabled", True)
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        yield client
+
+
+# 验证直方图按 Prometheus 文本格式输出累计 bucket、sum 和 count。
+def test_histogram_renders_cumulative_buckets() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.histogram(
+        "test_latency_seconds",
+        "Test latency.",
+        labelnames=("route",),
+        buckets=(0.1, 1.0),
+    )
+
+    histogram.observe(0.05, route="/rooms/{room_id}")
+    histogram.observe(0.5, route="/rooms/{room_id}")
+    histogram.observe(3.0, route="/rooms/{room_id}")
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE test_latency_seconds histogram" in lines
+    assert 'test_latency_seconds_bucket{route="/rooms/{room_id}",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{route="/rooms/{room_id}",le="1"} 2' in lines
+    assert 'test_latency_seconds_bucket{route="/rooms/{room_id}",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_sum{route="/rooms/{room_id}"} 3.55' in lines
+    assert 'test_latency_seconds_count{route="/rooms/{room_id}"} 3' in lines
+
+
+# 验证 gauge 会转义 label 值，并拒绝缺失的 label。
+def test_gauge_escapes_label_values_and_requires_labels() -> None:
+    registry = MetricsRegistry()
+    gauge = registry.gauge("test_items", "Test items.", labelnames=("kind",))
+
+    gauge.set(2, kind='a"b')
+
+    assert 'test_items{kind="a\\"b"} 2' in registry.render().splitlines()
+    with pytest.raises(ValueError):
+        gauge.set(1)
+
+
+# 验证同名指标不能重复注册。
+def test_registry_rejects_duplicate_metric_names() -> None:
+    registry = MetricsRegistry()
+    registry.counter("test_events", "Test events.")
+
+    with pytest.raises(ValueError):
+        registry.counter("test_events", "Test events.")
+
+
+# 验证 /metrics 会输出按路由模板聚合的 HTTP 延迟和 realtime 运行时指标。
+async def test_metrics_endpoint_exposes_http_and_realtime_series(
+    metrics_client,
+    factories,
+    auth_headers,
+) -> None:
+    owner = await factories.create_user()
+    room = await factories.create_room(owner=owner)
+    await factories.commit()
+
+    await metrics_client.get(f"/api/v1/rooms/{room.id}", headers=auth_headers(owner))
+    response = await metrics_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'route="/api/v1/rooms/{room_id}"' in body
+    assert "icinema_ws_connections 0" in body
+    assert 'icinema_ws_subscriptions{channel_kind="room"} 0' in body
+    assert "icinema_realtime_rooms_with_runtime 0" in body
+    assert "icinema_db_session_acquire_seconds_count" in body
+
+
+# 验证 /metrics 默认不注册，开启后配置了 token 时必须携带正确的 Bearer token。
+async def test_metrics_endpoint_is_off_by_default_and_token_protected(
+    api_client,
+    metrics_client,
+    monkeypatch,
+) -> None:
+    assert (await api_client.get("/metrics")).status_code == 404
+
+    monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+    assert (await metrics_client.get("/metrics")).status_code == 401
+    wrong = await metrics_client.get("/metrics", headers={"Authorization": "Bearer nope"})
+    assert wrong.status_code == 401
+    response = await metrics_client.get(
+        "/metrics",
+        headers={"Authorization": "Bearer scrape-secret"},
+    )
+    assert response.status_code == 200
+
+
+# 验证后台任务进程每次运行后把任务耗时写入 textfile，供 node_exporter 采集。
+async def test_interval_job_writes_metrics_textfile(tmp_path, monkeypatch) -> None:
+    textfile = tmp_path / "icinema_jobs.prom"
+    monkeypatch.setattr(settings, "jobs_metrics_textfile", str(textfile))
+
+    async def job() -> None:
+        return None
+
+    task = asyncio.create_task(
+        run_interval_job(name="metrics_textfile_test", interval_seconds=60, job_func=job)
+    )
+    try:
+        for _ in range(50):
+            if textfile.exists():
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+
+    body = textfile.read_text(encoding="utf-8")
+    assert "# TYPE icinema_job_duration_seconds histogram" in body
+    assert (
+        'icinema_job_duration_seconds_count{job="metrics_textfile_test",status="success"} 1'
+        in body.splitlines()
+    )
+    assert "icinema_ws_connections" not in body
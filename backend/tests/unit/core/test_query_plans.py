@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+from app.modules.media.constants import EmojiProvider
+from app.modules.media.repository import MediaRepository
+from app.modules.messages.models import Message
+from app.modules.messages.repository import MessageRepository
+from app.modules.notifications.repository import NotificationRepository
+from app.modules.rooms.membership.repository import RoomMembershipRepository
+
+
+# 验证查询计划检查能识别无索引过滤导致的全表扫描和无索引排序导致的临时 B 树。
+async def test_query_plan_checker_flags_full_scan_and_temp_sort(db_session, query_plans) -> None:
+    with query_plans.capture():
+        await db_session.execute(select(Message).where(Message.content == "hello"))
+        await db_session.execute(
+            select(Message).where(Message.room_id == 1).order_by(Message.content)
+        )
+
+    violations = await query_plans.violations()
+
+    assert len(violations) == 2
+    steps = [step for bad_steps in violations.values() for step in bad_steps]
+    assert any(step.startswith("SCAN messages") for step in steps)
+    assert any("USE TEMP B-TREE FOR ORDER BY" in step for step in steps)
+
+
+# 验证仓储中的热点查询（消息翻页、未读数、最近表情、批量头像、过期图片、用户所在房间）都能命中组合索引。
+async def test_hot_repository_queries_use_indexes(db_session, factories, query_plans) -> None:
+    user = await factories.create_user()
+    room = await factories.create_room(owner=user)
+    message = await factories.create_message(room=room, sender=user, content="hello")
+    await factories.commit()
+
+    with query_plans.capture():
+        await MessageRepository().get_messages_by_room_id(
+            db_session,
+            room_id=room.id,
+            before_id=message.id,
+        )
+        await NotificationRepository().count_unread_notifications(
+            db_session,
+            recipient_user_id=user.id,
+        )
+        await MediaRepository().get_recent_user_emoji_usages(
+            db_session,
+            user_id=user.id,
+            provider=EmojiProvider.QFACE,
+        )
+        await MediaRepository().find_active_avatar_storage_keys_by_user_ids(
+            db_session,
+            [user.id, user.id + 1],
+        )
+        await MediaRepository().get_expired_active_image_assets(
+            db_session,
+            now=datetime.now(timezone.utc),
+        )
+        await RoomMembershipRepository().get_members_by_user_id(db_session, user_id=user.id)
+
+    assert len(query_plans.captured) >= 6
+    assert await query_plans.violations() == {}
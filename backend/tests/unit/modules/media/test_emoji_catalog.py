@@ -0,0 +1,157 @@
+import asyncio
+import contextvars
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.modules.media import emoji_catalog
+from app.modules.media.emoji_catalog import EmojiCatalogService
+
+CATALOG_ROWS = [
+    {
+        "emojiId": "1",
+        "describe": "/smile",
+        "assets": [{"type": 0, "name": "smile", "path": "qq_emoji/1/png/1.png"}],
+    },
+    {
+        "emojiId": "2",
+        "isHide": True,
+        "assets": [{"type": 0, "name": "hidden", "path": "qq_emoji/2/png/2.png"}],
+    },
+]
+
+
+def _use_file_catalog(monkeypatch, tmp_path) -> None:
+    catalog_path = tmp_path / "_index.json"
+    catalog_path.write_text(json.dumps(CATALOG_ROWS), encoding="utf-8")
+    monkeypatch.setattr(
+        emoji_catalog.settings,
+        "emoji_catalog_url",
+        catalog_path.resolve().as_uri(),
+    )
+
+
+# 验证 file:// 源拉取成功后会写入本地快照，新实例启动时直接从快照加载而不再拉取。
+async def test_refresh_from_file_source_persists_snapshot(monkeypatch, tmp_path) -> None:
+    _use_file_catalog(monkeypatch, tmp_path)
+    snapshot_path = tmp_path / "emoji_catalog.json"
+
+    service = EmojiCatalogService(snapshot_path=snapshot_path)
+    emojis = await service.get_visible_emojis()
+
+    assert [item["id"] for item in emojis] == ["1"]
+    assert snapshot_path.exists()
+
+    restarted = EmojiCatalogService(snapshot_path=snapshot_path)
+
+    async def fail_fetch() -> list[dict]:
+        raise AssertionError("snapshot should be served without fetching")
+
+    monkeypatch.setattr(restarted, "_fetch_catalog", fail_fetch)
+    await restarted.start()
+
+    emoji = await restarted.get_emoji("1")
+    assert emoji is not None
+    assert emoji["describe"] == "/smile"
+    await restarted.stop()
+
+
+# 验证过期的 catalog 仍会立即返回内存数据，并在后台完成刷新。
+async def test_stale_catalog_is_served_while_refreshing_in_background(tmp_path) -> None:
+    service = EmojiCatalogService(snapshot_path=tmp_path / "emoji_catalog.json")
+    service._set_items(
+        [{"provider": "qface", "id": "old", "describe": None, "assets": []}],
+        expires_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+    )
+    release_fetch = asyncio.Event()
+
+    async def slow_fetch() -> list[dict]:
+        await release_fetch.wait()
+        return [{"provider": "qface", "id": "new", "describe": None, "assets": []}]
+
+    service._fetch_catalog = slow_fetch
+
+    emojis = await service.get_visible_emojis()
+    assert [item["id"] for item in emojis] == ["old"]
+
+    release_fetch.set()
+    await service._refresh_task
+
+    assert await service.get_emoji("new") is not None
+    assert await service.get_emoji("old") is None
+
+
+# 验证后台刷新任务不继承触发刷新的请求上下文。
+async def test_background_refresh_does_not_inherit_request_context(tmp_path) -> None:
+    request_marker: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+        "request_marker",
+        default=None,
+    )
+    service = EmojiCatalogService(snapshot_path=tmp_path / "emoji_catalog.json")
+    service._set_items(
+        [{"provider": "qface", "id": "old", "describe": None, "assets": []}],
+        expires_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+    )
+    seen: list[str | None] = []
+
+    async def fetch() -> list[dict]:
+        seen.append(request_marker.get())
+        return []
+
+    service._fetch_catalog = fetch
+
+    request_marker.set("request-1")
+    await service.get_visible_emojis()
+    await service._refresh_task
+
+    assert seen == [None]
+
+
+# 验证预编码列表与 EmojiListResponse 结构一致，ETag 随 catalog 内容变化，并按给定顺序批量解析表情。
+async def test_encoded_list_and_etag_follow_catalog_version(tmp_path) -> None:
+    service = EmojiCatalogService(snapshot_path=tmp_path / "emoji_catalog.json")
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+    items = [
+        {"provider": "qface", "id": "1", "describe": "/微笑", "assets": []},
+        {"provider": "qface", "id": "2", "describe": None, "assets": []},
+    ]
+    service._set_items(items, expires_at=expires_at)
+
+    body, etag = await service.get_encoded_emoji_list()
+    assert json.loads(body) == {"items": items}
+
+    service._set_items(items[:1], expires_at=expires_at)
+    _, next_etag = await service.get_encoded_emoji_list()
+    assert next_etag != etag
+
+    resolved = await service.get_emojis_by_ids(["2", "missing", "1"])
+    assert [item["id"] for item in resolved] == ["1"]
+
+
+# 验证结构不对的快照按没有快照处理、不影响启动；切换 catalog 来源后旧快照被忽略并从新来源拉取。
+async def test_malformed_or_foreign_snapshot_is_ignored(monkeypatch, tmp_path) -> None:
+    _use_file_catalog(monkeypatch, tmp_path)
+    snapshot_path = tmp_path / "emoji_catalog.json"
+    service = EmojiCatalogService(snapshot_path=snapshot_path)
+
+    for body in ["[]", json.dumps({"items": []}), json.dumps({"fetched_at": "x", "items": {}})]:
+        snapshot_path.write_text(body, encoding="utf-8")
+        assert await service.load_snapshot() is False
+
+    snapshot_path.write_text(
+        json.dumps(
+            {
+                "source_url": "https://old.example.com/_index.json",
+                "fetched_at": datetime.now(timezone.utc).isoformat(),
+                "items": [{"provider": "qface", "id": "old", "describe": None, "assets": []}],
+            }
+        ),
+        encoding="utf-8",
+    )
+    await service.start()
+    emojis = await service.get_visible_emojis()
+    await service.stop()
+
+    assert [item["id"] for item in emojis] == ["1"]
+    assert json.loads(snapshot_path.read_text(encoding="utf-8"))["source_url"] == (
+        emoji_catalog.settings.emoji_catalog_url
+    )
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal, collect_query_stats
+from app.modules.media.emoji_usage_recorder import EmojiUsageRecorder
+from app.modules.media.models import UserEmojiUsage
+from app.modules.media.service import MediaService
+
+
+@pytest.fixture
+async def recorder():
+    recorder = EmojiUsageRecorder()
+    yield recorder
+    await recorder.stop()
+
+
+@pytest.fixture
+def media_service(recorder, monkeypatch) -> MediaService:
+    service = MediaService()
+    service.emoji_usage_recorder = recorder
+
+    async def fake_get_emojis_by_ids(emoji_ids: list[str]) -> list[dict]:
+        return [{"id": emoji_id} for emoji_id in emoji_ids]
+
+    monkeypatch.setattr(service.emoji_catalog, "get_emojis_by_ids", fake_get_emojis_by_ids)
+    return service
+
+
+async def _stored_usages() -> dict[tuple[int, str], UserEmojiUsage]:
+    async with AsyncSessionLocal() as db:
+        usages = (await db.scalars(select(UserEmojiUsage))).all()
+    return {(usage.user_id, usage.emoji_id): usage for usage in usages}
+
+
+# 验证未落库的表情使用会排在最近表情最前面，批量写库只发一条 upsert，并刷新已有记录的使用时间。
+async def test_recent_emojis_merge_pending_usages_and_flush_upserts_once(
+    db_session,
+    factories,
+    recorder,
+    media_service,
+) -> None:
+    user = await factories.create_user()
+    await factories.create_emoji_usage(user=user, emoji_id="old")
+    await factories.create_emoji_usage(user=user, emoji_id="older")
+    await factories.commit()
+    stored_before = await _stored_usages()
+
+    recorder.record(user_id=user.id, emoji_ids=["old"])
+    recorder.record(user_id=user.id, emoji_ids=["smile"])
+
+    recent = await media_service.get_recent_emojis(db_session, user_id=user.id, limit=3)
+    assert [emoji["id"] for emoji in recent] == ["smile", "old", "older"]
+    assert (user.id, "smile") not in stored_before
+
+    with collect_query_stats() as stats:
+        assert await recorder.flush() == 2
+    assert stats.statements == 1
+
+    stored_after = await _stored_usages()
+    assert (user.id, "smile") in stored_after
+    assert stored_after[(user.id, "old")].last_used_at > stored_before[(user.id, "old")].last_used_at
+    assert recorder.get_pending_emoji_ids(user_id=user.id) == []
+
+
+# 验证写库失败时使用记录留在缓冲中，查询仍能看到，下次写入会补上。
+async def test_failed_flush_keeps_usages_for_next_flush(
+    db_session,
+    factories,
+    recorder,
+    media_service,
+    monkeypatch,
+) -> None:
+    user = await factories.create_user()
+    await factories.commit()
+    recorder.record(user_id=user.id, emoji_ids=["smile"])
+
+    async def failing_upsert(*args, **kwargs) -> None:
+        raise RuntimeError("database is locked")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(recorder.repo, "upsert_user_emoji_usages", failing_upsert)
+        assert await recorder.flush() == 0
+
+    recent = await media_service.get_recent_emojis(db_session, user_id=user.id)
+    assert [emoji["id"] for emoji in recent] == ["smile"]
+
+    assert await recorder.flush() == 1
+    assert (user.id, "smile") in await _stored_usages()
+
+
+# 验证后台写库任务不继承首次记录时所在请求的 SQL 统计上下文。
+async def test_flush_worker_does_not_inherit_request_context(factories, recorder) -> None:
+    user = await factories.create_user()
+    await factories.commit()
+    recorder.max_pending = 1
+
+    with collect_query_stats() as request_stats:
+        recorder.record(user_id=user.id, emoji_ids=["smile"])
+    for _ in range(50):
+        if (user.id, "smile") in await _stored_usages():
+            break
+        await asyncio.sleep(0.02)
+
+    assert (user.id, "smile") in await _stored_usages()
+    assert request_stats.statements == 0
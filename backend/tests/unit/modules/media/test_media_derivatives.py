@@ -0,0 +1,59 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.modules.media.derivatives import MediaDerivativePipeline
+
+Image = pytest.importorskip("PIL.Image")
+
+
+class BrokenExecutor:
+    def __init__(self) -> None:
+        self.shutdown_called = False
+
+    def submit(self, fn, *args):  # noqa: ANN001
+        future: Future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        self.shutdown_called = True
+
+
+# 验证进程池子进程异常退出后，本次回退原图、丢弃坏掉的进程池，下次请求重建进程池正常出图；上传尺寸解析不依赖进程池。
+async def test_broken_process_pool_is_rebuilt_and_probe_stays_available(tmp_path) -> None:
+    source = tmp_path / "poster.png"
+    Image.new("RGB", (400, 200)).save(source, "PNG")
+    pipeline = MediaDerivativePipeline()
+    pipeline.base_dir = tmp_path / "derivatives"
+    broken = BrokenExecutor()
+    pipeline._executor = broken
+
+    try:
+        variant = await pipeline.get_or_render_variant(
+            source=source,
+            asset_type="image",
+            storage_key="poster.png",
+            width=96,
+        )
+        assert variant is None
+        assert broken.shutdown_called
+        assert pipeline._executor is None
+
+        assert await pipeline.probe_size(
+            content=source.read_bytes(),
+            mime_type="image/png",
+        ) == (400, 200)
+
+        variant = await pipeline.get_or_render_variant(
+            source=source,
+            asset_type="image",
+            storage_key="poster.png",
+            width=96,
+        )
+        assert variant is not None
+        with Image.open(variant) as image:
+            assert image.size == (96, 48)
+    finally:
+        await pipeline.stop()
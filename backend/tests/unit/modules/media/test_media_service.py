@@ -3,7 +3,9 @@ from types import SimpleNamespace
 
 import pytest
 
+from app.core.database import collect_query_stats
 from app.core.exceptions import BadRequestError, NotFoundError
+from app.modules.media.avatar_key_cache import AvatarKeyCache
 from app.modules.media.constants import MediaAssetStatus, MediaAssetType
 from app.modules.media.models import UserStickerLibraryItem
 from app.modules.media.service import MediaService
@@ -139,3 +141,54 @@ async def test_get_serving_asset_rejects_expired_asset(db_session, factories) ->
 
     with pytest.raises(NotFoundError, match="Media asset not found"):
         await MediaService().get_serving_asset(db_session, asset.id)
+
+
+# 验证头像 key 命中缓存后不再查库，上传新头像并提交后缓存失效，下次读到新头像。
+async def test_avatar_key_cache_serves_repeat_lookups_and_refreshes_after_upload(
+    db_session,
+    factories,
+    monkeypatch,
+) -> None:
+    user = await factories.create_user()
+    other = await factories.create_user()
+    old_avatar = await factories.create_media_asset(
+        asset_type=MediaAssetType.AVATAR,
+        uploaded_by=user,
+    )
+    new_avatar = await factories.create_media_asset(
+        asset_type=MediaAssetType.AVATAR,
+        uploaded_by=user,
+        sha256="new-avatar-sha",
+    )
+    await factories.attach_avatar(user=user, asset=old_avatar)
+    await factories.commit()
+
+    service = MediaService()
+    user_ids = [user.id, other.id]
+    assert await service.get_user_avatar_storage_key_map(db_session, user_ids) == {
+        user.id: old_avatar.storage_key,
+        other.id: None,
+    }
+    with collect_query_stats() as stats:
+        await service.get_user_avatar_storage_key_map(db_session, user_ids)
+    assert stats.statements == 0
+
+    async def fake_prepare_upload(**kwargs):
+        return SimpleNamespace(sha256="new-avatar-sha")
+
+    monkeypatch.setattr(service.storage, "prepare_upload", fake_prepare_upload)
+    await service.create_avatar_asset_in_tx(db_session, file=SimpleNamespace(), user=user)
+    await db_session.commit()
+
+    assert await service.get_user_avatar_storage_key(db_session, user.id) == new_avatar.storage_key
+
+
+# 验证查询期间发生头像变更时，这次查到的旧结果不会写回缓存。
+async def test_avatar_key_cache_drops_results_loaded_before_invalidation() -> None:
+    cache = AvatarKeyCache()
+    generation = cache.generation
+
+    cache.invalidate(1)
+    cache.set_many({1: "old.png", 2: None}, generation=generation)
+
+    assert cache.get_many([1, 2]) == ({}, [1, 2])
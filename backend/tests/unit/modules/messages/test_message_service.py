@@ -32,13 +32,13 @@ async def test_create_message_persists_assets_and_emoji_usage(
     async def fake_get_emoji_or_raise(emoji_id: str) -> dict:
         return {"id": emoji_id}
 
-    touched_emoji_ids: list[str] = []
+    recorded_emoji_ids: list[str] = []
 
-    async def fake_touch(*args, user_id: int, emoji_id: str, **kwargs) -> None:
-        touched_emoji_ids.append(emoji_id)
+    def fake_record(*, user_id: int, emoji_ids: list[str], **kwargs) -> None:
+        recorded_emoji_ids.extend(emoji_ids)
 
     monkeypatch.setattr(service.media_service, "get_emoji_or_raise", fake_get_emoji_or_raise)
-    monkeypatch.setattr(service.media_service, "touch_user_emoji_usage_in_tx", fake_touch)
+    monkeypatch.setattr(service.media_service, "record_user_emoji_usages", fake_record)
 
     payload = MessageCreate(
         content=MessageContentIn.model_validate(
@@ -62,7 +62,7 @@ async def test_create_message_persists_assets_and_emoji_usage(
     )
 
     assert message.sender_user_id == owner.id
-    assert touched_emoji_ids == ["smile"]
+    assert recorded_emoji_ids == ["smile"]
     assert [segment.type for segment in message.content.segments] == [
         "text",
         "emoji",
@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import AsyncSessionLocal, collect_query_stats, engine
+from app.modules.media.constants import MediaAssetType
+from app.modules.media.emoji_usage_recorder import emoji_usage_recorder
+from app.modules.media.models import MessageResourceRef, UserEmojiUsage
+from app.modules.messages.models import Message
+from app.modules.messages.schemas import MessageCreate
+from app.modules.messages.service import MessageService
+from app.modules.messages.write_batcher import MessageWriteBatcher, PendingMessageWrite
+
+
+@pytest.fixture
+async def write_batcher():
+    batcher = MessageWriteBatcher()
+    # 窗口要覆盖并发请求各自完成权限和内容校验的时间
+    batcher.window_seconds = 0.3
+    yield batcher
+    await batcher.stop()
+
+
+@pytest.fixture
+def commit_counter():
+    commits: list[int] = []
+
+    def on_commit(conn) -> None:  # noqa: ANN001
+        commits.append(1)
+
+    event.listen(engine.sync_engine, "commit", on_commit)
+    yield commits
+    event.remove(engine.sync_engine, "commit", on_commit)
+
+
+# 验证开启合并写入后，并发发送的多条消息在同一事务中提交，且每个请求都拿到各自完整的消息。
+async def test_concurrent_messages_share_one_commit(
+    factories,
+    monkeypatch,
+    write_batcher,
+    commit_counter,
+) -> None:
+    owner = await factories.create_user()
+    room = await factories.create_room(owner=owner)
+    await factories.commit()
+
+    service = MessageService()
+    service.write_batcher = write_batcher
+
+    async def fake_get_emoji_or_raise(emoji_id: str) -> dict:
+        return {"id": emoji_id}
+
+    monkeypatch.setattr(service.media_service, "get_emoji_or_raise", fake_get_emoji_or_raise)
+
+    async def send(index: int):
+        async with AsyncSessionLocal() as db:
+            return await service.create_message(
+                db,
+                room_id=room.id,
+                user=owner,
+                payload=MessageCreate.model_validate(
+                    {
+                        "content": {
+                            "segments": [
+                                {"type": "text", "text": f"burst {index}"},
+                                {"type": "emoji", "id": "smile"},
+                            ]
+                        }
+                    }
+                ),
+            )
+
+    commit_counter.clear()
+    responses = await asyncio.gather(*(send(index) for index in range(5)))
+
+    assert len(commit_counter) == 1
+    assert len({response.id for response in responses}) == 5
+    assert [response.content.segments[0].text for response in responses] == [
+        f"burst {index}" for index in range(5)
+    ]
+    await emoji_usage_recorder.flush()
+    async with AsyncSessionLocal() as db:
+        usages = list((await db.scalars(select(UserEmojiUsage))).all())
+    assert [(usage.user_id, usage.emoji_id) for usage in usages] == [(owner.id, "smile")]
+
+
+# 验证批量提交失败时会逐条重试，只有出错的消息返回异常，同批次其他消息照常落盘。
+async def test_failed_batch_is_retried_one_by_one(factories, write_batcher) -> None:
+    owner = await factories.create_user()
+    room = await factories.create_room(owner=owner)
+    image = await factories.create_media_asset(asset_type=MediaAssetType.IMAGE, uploaded_by=owner)
+    await factories.commit()
+
+    def pending(media_asset_ids: list[int]) -> PendingMessageWrite:
+        return PendingMessageWrite(
+            room_id=room.id,
+            sender_user_id=owner.id,
+            content='{"segments":[{"type":"text","text":"hello"}]}',
+            media_asset_ids=media_asset_ids,
+        )
+
+    results = await asyncio.gather(
+        write_batcher.submit(pending([image.id])),
+        write_batcher.submit(pending([image.id, image.id])),
+        write_batcher.submit(pending([])),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[1], IntegrityError)
+    async with AsyncSessionLocal() as db:
+        message_ids = list((await db.scalars(select(Message.id).order_by(Message.id))).all())
+        ref_message_ids = list((await db.scalars(select(MessageResourceRef.message_id))).all())
+    assert message_ids == [results[0].id, results[2].id]
+    assert ref_message_ids == [results[0].id]
+
+
+# 验证停机时会先写完已排队的消息，等待中的调用方都能拿到已落盘的消息。
+async def test_stop_drains_queued_messages(factories) -> None:
+    owner = await factories.create_user()
+    room = await factories.create_room(owner=owner)
+    await factories.commit()
+
+    batcher = MessageWriteBatcher()
+    batcher.window_seconds = 60
+    pending = asyncio.create_task(
+        batcher.submit(
+            PendingMessageWrite(
+                room_id=room.id,
+                sender_user_id=owner.id,
+                content='{"segments":[{"type":"text","text":"bye"}]}',
+            )
+        )
+    )
+    await asyncio.sleep(0)
+
+    await asyncio.wait_for(batcher.stop(), timeout=1)
+
+    assert pending.done()
+    async with AsyncSessionLocal() as db:
+        assert await db.get(Message, pending.result().id) is not None
+
+
+# 验证合并写入的工作协程不继承首个调用方的 SQL 统计上下文，之后批次的语句不会记到已结束的请求上。
+async def test_worker_does_not_inherit_first_caller_context(factories, write_batcher) -> None:
+    owner = await factories.create_user()
+    room = await factories.create_room(owner=owner)
+    await factories.commit()
+    write = PendingMessageWrite(
+        room_id=room.id,
+        sender_user_id=owner.id,
+        content='{"segments":[{"type":"text","text":"hello"}]}',
+    )
+
+    with collect_query_stats() as first_request:
+        await write_batcher.submit(write)
+    await write_batcher.submit(write)
+
+    assert first_request.statements == 0
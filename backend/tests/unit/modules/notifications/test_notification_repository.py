@@ -1,4 +1,5 @@
-from app.modules.notifications.constants import NotificationType
+from app.modules.notifications.constants import NotificationRelatedType, NotificationType
+from app.modules.notifications.models import Notification
 from app.modules.notifications.repository import NotificationRepository
 
 
@@ -56,3 +57,30 @@ async def test_mark_all_as_read_updates_only_unread_notifications(db_session, fa
     assert own_unread.read_at is not None
     assert own_read.is_read is True
     assert other_unread.is_read is False
+
+
+# 验证批量创建通知会一次写入全部接收人的通知记录。
+async def test_create_notifications_inserts_rows_for_all_recipients(db_session, factories) -> None:
+    first = await factories.create_user()
+    second = await factories.create_user()
+    await factories.commit()
+
+    await NotificationRepository().create_notifications(
+        db_session,
+        values=[
+            {
+                "recipient_user_id": user.id,
+                "actor_user_id": None,
+                "notification_type": NotificationType.WORKFLOW.value,
+                "related_type": NotificationRelatedType.ROOM_JOIN_REQUEST.value,
+                "related_id": 7,
+            }
+            for user in (first, second)
+        ],
+    )
+    await factories.commit()
+
+    notifications = await factories.list_all(Notification)
+
+    assert {item.recipient_user_id for item in notifications} == {first.id, second.id}
+    assert all(item.related_id == 7 and item.is_read is False for item in notifications)
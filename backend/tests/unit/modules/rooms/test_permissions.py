@@ -2,7 +2,11 @@ import pytest
 
 from app.core.exceptions import ForbiddenError
 from app.modules.rooms.constants import RoomPermission, RoomRole
-from app.modules.rooms.permissions import has_room_permission, require_room_permission
+from app.modules.rooms.permissions import (
+    get_roles_by_permission,
+    has_room_permission,
+    require_room_permission,
+)
 
 
 # 已授权的角色和权限组合会返回 True
@@ -36,3 +40,12 @@ def test_require_room_permission_raises_for_forbidden_combinations(
 ) -> None:
     with pytest.raises(ForbiddenError):
         require_room_permission(role, permission)
+
+
+# 按权限反查角色时只返回拥有该权限的角色
+def test_get_roles_by_permission_returns_roles_with_permission() -> None:
+    assert get_roles_by_permission(RoomPermission.REVIEW_JOIN_REQUEST) == {
+        RoomRole.OWNER,
+        RoomRole.MANAGER,
+    }
+    assert get_roles_by_permission(RoomPermission.DELETE_ROOM) == {RoomRole.OWNER}
@@ -7,6 +7,7 @@ from app.modules.rooms.constants import (
     RoomJoinRequestAction,
     RoomJoinRequestSource,
     RoomJoinRequestStatus,
+    RoomPermission,
     RoomRole,
     RoomSyncPolicy,
     RoomVisibility,
@@ -269,6 +270,36 @@ async def test_create_apply_request_creates_pending_request_and_notifications(
     assert {item.recipient_user_id for item in notifications} == {owner.id, reviewer.id}
 
 
+# 验证按权限筛选成员时只在 SQL 中匹配具备权限的角色，并可排除指定用户。
+async def test_get_room_user_ids_by_permission_filters_roles_and_excludes_user(
+    db_session,
+    factories,
+) -> None:
+    owner = await factories.create_user()
+    manager = await factories.create_user()
+    member = await factories.create_user()
+    room = await factories.create_room(owner=owner)
+    await factories.add_member(room=room, user=manager, role=RoomRole.MANAGER)
+    await factories.add_member(room=room, user=member, role=RoomRole.MEMBER)
+    await factories.commit()
+
+    service = RoomMembershipService()
+    reviewer_user_ids = await service.get_room_user_ids_by_permission(
+        db_session,
+        room_id=room.id,
+        permission=RoomPermission.REVIEW_JOIN_REQUEST,
+    )
+    other_reviewer_user_ids = await service.get_room_user_ids_by_permission(
+        db_session,
+        room_id=room.id,
+        permission=RoomPermission.REVIEW_JOIN_REQUEST,
+        exclude_user_id=manager.id,
+    )
+
+    assert set(reviewer_user_ids) == {owner.id, manager.id}
+    assert other_reviewer_user_ids == [owner.id]
+
+
 # 验证重复的待处理入房申请会被拒绝。
 async def test_create_apply_request_rejects_existing_pending_request(
     db_session,
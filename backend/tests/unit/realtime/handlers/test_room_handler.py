@@ -13,7 +13,9 @@ from app.realtime.room_video_runtime import RoomSessionExitResult, RoomVideoRunt
 from app.realtime.state import (
     PlaybackState,
     PresenceState,
+    RoomVideoRuntimeSnapshot,
     RoomVideoSourceState,
+    UserResourceStatesDeltaState,
     UserResourceStatesState,
 )
 
@@ -22,6 +24,9 @@ class RecordingPublisher:
     def __init__(self) -> None:
         self.calls: list[tuple[str, dict]] = []
 
+    def get_room_version(self, room_id: int) -> int:
+        return 3
+
     async def publish_session_closed(self, **kwargs) -> None:
         self.calls.append(("publish_session_closed", kwargs))
 
@@ -31,6 +36,9 @@ class RecordingPublisher:
     async def publish_user_resource_states(self, **kwargs) -> None:
         self.calls.append(("publish_user_resource_states", kwargs))
 
+    async def publish_user_resource_states_delta(self, **kwargs) -> None:
+        self.calls.append(("publish_user_resource_states_delta", kwargs))
+
     async def publish_playback_play(self, **kwargs) -> None:
         self.calls.append(("publish_playback_play", kwargs))
 
@@ -141,22 +149,19 @@ async def test_handle_room_video_runtime_get_returns_video_runtime(monkeypatch)
         playback_rate=1.0,
     )
     resource_states = UserResourceStatesState(room_id=11, user_resource_states=[])
+    runtime_snapshot = RoomVideoRuntimeSnapshot(
+        room_id=11,
+        runtime_version=2,
+        room_video_source=room_video_source,
+        playback=playback,
+        user_resource_states=resource_states,
+    ).model_dump(mode="json")
 
-    async def fake_get_room_video_source(*, room_id):  # noqa: ANN001
-        assert room_id == 11
-        return room_video_source
-
-    async def fake_get_playback(*, room_id):  # noqa: ANN001
-        assert room_id == 11
-        return playback
-
-    async def fake_get_user_resource_states(*, room_id):  # noqa: ANN001
+    async def fake_get_room_snapshot(*, room_id):  # noqa: ANN001
         assert room_id == 11
-        return resource_states
+        return runtime_snapshot
 
-    monkeypatch.setattr(runtime_service, "get_room_video_source", fake_get_room_video_source)
-    monkeypatch.setattr(runtime_service, "get_playback", fake_get_playback)
-    monkeypatch.setattr(runtime_service, "get_user_resource_states", fake_get_user_resource_states)
+    monkeypatch.setattr(runtime_service, "get_room_snapshot", fake_get_room_snapshot)
 
     result = await handler.handle(
         db=object(),
@@ -166,11 +171,8 @@ async def test_handle_room_video_runtime_get_returns_video_runtime(monkeypatch)
         command=command,
     )
 
-    assert result == {
-        "room_video_source": room_video_source.model_dump(mode="json"),
-        "playback": playback.model_dump(mode="json"),
-        "user_resource_states": resource_states.model_dump(mode="json"),
-    }
+    assert result == runtime_snapshot
+    assert result["runtime_version"] == 2
     assert "presence" not in result
 
 
@@ -251,22 +253,20 @@ async def test_handle_room_enter_returns_snapshot_and_publishes_presence(monkeyp
         connection.active_room_id = room_id
         return PresenceState(room_id=room_id, present_user_ids=[2])
 
-    async def fake_get_room_video_source(*, room_id):  # noqa: ANN001
-        return room_video_source
-
-    async def fake_get_playback(*, room_id):  # noqa: ANN001
-        return playback
-
-    async def fake_get_user_resource_states(*, room_id):  # noqa: ANN001
-        return resource_states
+    async def fake_get_room_snapshot(*, room_id):  # noqa: ANN001
+        return RoomVideoRuntimeSnapshot(
+            room_id=room_id,
+            runtime_version=4,
+            room_video_source=room_video_source,
+            playback=playback,
+            user_resource_states=resource_states,
+        ).model_dump(mode="json")
 
     monkeypatch.setattr(handler.room_service, "get_room_by_id", fake_get_room_by_id)
     monkeypatch.setattr(handler.membership_service, "find_room_role", fake_find_room_role)
     monkeypatch.setattr(presence_service, "find_room_user_connection", fake_find_room_user_connection)
     monkeypatch.setattr(presence_service, "enter_room", fake_enter_room)
-    monkeypatch.setattr(runtime_service, "get_room_video_source", fake_get_room_video_source)
-    monkeypatch.setattr(runtime_service, "get_playback", fake_get_playback)
-    monkeypatch.setattr(runtime_service, "get_user_resource_states", fake_get_user_resource_states)
+    monkeypatch.setattr(runtime_service, "get_room_snapshot", fake_get_room_snapshot)
 
     result = await handler.handle(
         db=object(),
@@ -278,6 +278,8 @@ async def test_handle_room_enter_returns_snapshot_and_publishes_presence(monkeyp
 
     assert result == {
         "room_id": 20,
+        "runtime_version": 4,
+        "room_version": 3,
         "present_user_ids": [2],
         "room_video_source": room_video_source.model_dump(mode="json"),
         "playback": playback.model_dump(mode="json"),
@@ -350,7 +352,11 @@ async def test_handle_room_leave_publishes_session_exit_updates(monkeypatch) ->
     )
     session_exit_result = RoomSessionExitResult(
         room_cleared=False,
-        user_resource_states=UserResourceStatesState(room_id=40, user_resource_states=[]),
+        user_resource_states_delta=UserResourceStatesDeltaState(
+            room_id=40,
+            seq=2,
+            removed_user_ids=[4],
+        ),
         auto_playback=playback,
         auto_action=AutoPlaybackAction.PLAY,
     )
@@ -386,7 +392,7 @@ async def test_handle_room_leave_publishes_session_exit_updates(monkeypatch) ->
     )
 
     assert result is None
-    assert publisher.calls[0][0] == "publish_user_resource_states"
+    assert publisher.calls[0][0] == "publish_user_resource_states_delta"
     assert publisher.calls[1] == ("publish_playback_play", {"playback": playback})
     assert publisher.calls[2] == (
         "publish_room_user_presence",
@@ -8,7 +8,12 @@ from app.modules.rooms.constants import (
     RoomSyncPolicy,
     RoomVideoSourceType,
 )
-from app.realtime.constants import AutoPlaybackAction, PlaybackStatusType, WsCommandAction
+from app.realtime.constants import (
+    AutoPlaybackAction,
+    PlaybackStatusType,
+    WsCommandAction,
+    WsEventType,
+)
 from app.realtime.handlers.room_video import RoomVideoCommandHandler, RoomVideoRuntimePolicy
 from app.realtime.manager import WsConnection
 from app.realtime.protocol import WsCommandPayload
@@ -16,6 +21,7 @@ from app.realtime.room_video_runtime import RoomVideoRuntimeService, UserResourc
 from app.realtime.state import (
     PlaybackState,
     RoomVideoSourceState,
+    UserResourceStatesDeltaState,
     UserResourceStatesState,
 )
 
@@ -36,9 +42,18 @@ class RecordingPublisher:
     async def publish_playback_seek(self, **kwargs) -> None:
         self.calls.append(("publish_playback_seek", kwargs))
 
+    async def publish_playback_coalesced(self, **kwargs) -> None:
+        self.calls.append(("publish_playback_coalesced", kwargs))
+
     async def publish_user_resource_states(self, **kwargs) -> None:
         self.calls.append(("publish_user_resource_states", kwargs))
 
+    async def publish_user_resource_states_delta(self, **kwargs) -> None:
+        self.calls.append(("publish_user_resource_states_delta", kwargs))
+
+    async def publish_user_resource_states_update(self, **kwargs) -> None:
+        self.calls.append(("publish_user_resource_states_update", kwargs))
+
 
 def _build_connection(*, user_id: int, room_id: int | None) -> WsConnection:
     return WsConnection(
@@ -109,9 +124,10 @@ async def test_handle_rejects_user_without_room_role(monkeypatch) -> None:
     assert exc_info.value.message == "You are not allowed to control room video in this room"
 
 
-# USER_RESOURCE_STATUS 会上报资源健康聚合状态并在需要时广播自动暂停
-async def test_handle_user_resource_status_publishes_resource_states_and_auto_pause(monkeypatch) -> None:
+# USER_RESOURCE_STATUS 会提交给 runtime 聚合，并由发布器统一广播增量和自动暂停
+async def test_handle_user_resource_status_submits_report_for_aggregated_publish(monkeypatch) -> None:
     handler = RoomVideoCommandHandler(video_runtime_service=RoomVideoRuntimeService())
+    handler.video_runtime_service.resource_status_window_seconds = 0
     publisher = RecordingPublisher()
     connection = _build_connection(user_id=3, room_id=30)
     command = WsCommandPayload(
@@ -127,7 +143,7 @@ async def test_handle_user_resource_status_publishes_resource_states_and_auto_pa
         playback_rate=1.0,
     )
     update_result = UserResourceStatesUpdateResult(
-        user_resource_states=UserResourceStatesState(room_id=30, user_resource_states=[]),
+        user_resource_states_delta=UserResourceStatesDeltaState(room_id=30, seq=1),
         auto_playback=playback,
         auto_action=AutoPlaybackAction.PAUSE,
     )
@@ -144,7 +160,9 @@ async def test_handle_user_resource_status_publishes_resource_states_and_auto_pa
             active_sync_permission=RoomActiveSyncPermission.ALL_MEMBERS,
         )
 
-    async def fake_report_user_resource_status(**kwargs):  # noqa: ANN001
+    async def fake_report_user_resource_statuses(*, room_id, reports, sync_policy, **kwargs):  # noqa: ANN001
+        assert room_id == 30
+        assert [(report.user_id, report.status) for report in reports] == [(3, "stalling")]
         return update_result
 
     monkeypatch.setattr(handler.room_service, "get_room_by_id", fake_get_room_by_id)
@@ -152,8 +170,8 @@ async def test_handle_user_resource_status_publishes_resource_states_and_auto_pa
     monkeypatch.setattr(handler, "_get_runtime_policy", fake_get_runtime_policy)
     monkeypatch.setattr(
         handler.video_runtime_service,
-        "report_user_resource_status",
-        fake_report_user_resource_status,
+        "report_user_resource_statuses",
+        fake_report_user_resource_statuses,
     )
 
     result = await handler.handle(
@@ -164,13 +182,10 @@ async def test_handle_user_resource_status_publishes_resource_states_and_auto_pa
         command=command,
     )
 
-    assert result == {
-        "user_resource_states": {"room_id": 30, "user_resource_states": []},
-        "playback": playback.model_dump(mode="json"),
-        "auto_action": "pause",
-    }
-    assert publisher.calls[0][0] == "publish_user_resource_states"
-    assert publisher.calls[1] == ("publish_playback_pause", {"playback": playback})
+    assert result is None
+    assert publisher.calls == [
+        ("publish_user_resource_states_update", {"result": update_result})
+    ]
 
 
 # 设置外链视频源时会更新 runtime 并广播视频源和播放状态
@@ -262,7 +277,7 @@ async def test_handle_room_video_source_set_rejects_file_hash_for_external_url()
     assert exc_info.value.message == "file_hash is not allowed for external_url source"
 
 
-# 播放命令会调用 runtime.play 并广播播放事件
+# 播放命令会调用 runtime.play 并提交合并广播播放事件
 async def test_handle_play_calls_runtime_and_publishes_playback(monkeypatch) -> None:
     handler = RoomVideoCommandHandler(video_runtime_service=RoomVideoRuntimeService())
     publisher = RecordingPublisher()
@@ -293,10 +308,15 @@ async def test_handle_play_calls_runtime_and_publishes_playback(monkeypatch) ->
     )
 
     assert result == {"playback": playback.model_dump(mode="json")}
-    assert publisher.calls == [("publish_playback_play", {"playback": playback})]
+    assert publisher.calls == [
+        (
+            "publish_playback_coalesced",
+            {"event": WsEventType.PLAYBACK_PLAY, "playback": playback},
+        )
+    ]
 
 
-# seek 命令会调用 runtime.seek 并广播 seek 事件
+# seek 命令会调用 runtime.seek 并提交合并广播 seek 事件
 async def test_handle_seek_calls_runtime_and_publishes_seek(monkeypatch) -> None:
     handler = RoomVideoCommandHandler(video_runtime_service=RoomVideoRuntimeService())
     publisher = RecordingPublisher()
@@ -331,4 +351,9 @@ async def test_handle_seek_calls_runtime_and_publishes_seek(monkeypatch) -> None
     )
 
     assert result == {"playback": playback.model_dump(mode="json")}
-    assert publisher.calls == [("publish_playback_seek", {"playback": playback})]
+    assert publisher.calls == [
+        (
+            "publish_playback_coalesced",
+            {"event": WsEventType.PLAYBACK_SEEK, "playback": playback},
+        )
+    ]
@@ -1,3 +1,4 @@
+import json
 from types import SimpleNamespace
 
 import pytest
@@ -11,21 +12,26 @@ from app.realtime.manager import WsConnection
 class FakeWebSocket:
     def __init__(self) -> None:
         self.sent_json: list[dict] = []
+        self.sent_bytes: list[bytes] = []
 
-    async def send_json(self, payload: dict) -> None:
-        self.sent_json.append(payload)
+    async def send_text(self, data: str) -> None:
+        self.sent_json.append(json.loads(data))
+
+    async def send_bytes(self, data: bytes) -> None:
+        self.sent_bytes.append(data)
 
 
 class FakeManager:
     def __init__(self) -> None:
         self.register_calls: list[dict] = []
 
-    async def register_connection(self, *, user_id: int, websocket) -> WsConnection:
+    async def register_connection(self, *, user_id: int, websocket, encoding) -> WsConnection:
         self.register_calls.append({"user_id": user_id, "websocket": websocket})
         return WsConnection(
             connection_id="conn-auth",
             user_id=user_id,
             websocket=websocket,
+            encoding=encoding,
         )
 
 
@@ -109,3 +115,57 @@ async def test_auth_handler_registers_connection_after_successful_authentication
     assert result.user_id == 99
     assert manager.register_calls == [{"user_id": 99, "websocket": websocket}]
     assert len(websocket.sent_json) == 1
+    assert websocket.sent_json[0]["payload"]["data"] == {"encoding": "json"}
+
+
+# 客户端请求 msgpack 但服务端未安装时，连接回退为 json 并在 ack 中告知
+async def test_auth_handler_falls_back_to_json_when_msgpack_unavailable(monkeypatch) -> None:
+    websocket = FakeWebSocket()
+
+    async def fake_authenticate(db, *, token):  # noqa: ANN001
+        return SimpleNamespace(id=100)
+
+    monkeypatch.setattr(
+        "app.realtime.handlers.auth.authenticate_websocket_token",
+        fake_authenticate,
+    )
+    monkeypatch.setattr("app.realtime.codec.msgpack", None)
+
+    result = await AuthHandler().handle(
+        db=object(),
+        manager=FakeManager(),
+        websocket=websocket,
+        connection=None,
+        payload={"token": "access-token", "encoding": "msgpack"},
+    )
+
+    assert result.encoding == "json"
+    assert websocket.sent_json[0]["payload"]["data"] == {"encoding": "json"}
+
+
+# 协商到 msgpack 后，auth ack 已按 msgpack 以二进制帧发送
+async def test_auth_handler_sends_ack_in_negotiated_encoding(monkeypatch) -> None:
+    msgpack = pytest.importorskip("msgpack")
+    websocket = FakeWebSocket()
+
+    async def fake_authenticate(db, *, token):  # noqa: ANN001
+        return SimpleNamespace(id=101)
+
+    monkeypatch.setattr(
+        "app.realtime.handlers.auth.authenticate_websocket_token",
+        fake_authenticate,
+    )
+
+    result = await AuthHandler().handle(
+        db=object(),
+        manager=FakeManager(),
+        websocket=websocket,
+        connection=None,
+        payload={"token": "access-token", "encoding": "msgpack"},
+    )
+
+    assert result.encoding == "msgpack"
+    assert websocket.sent_json == []
+    assert [msgpack.unpackb(frame)["payload"]["data"] for frame in websocket.sent_bytes] == [
+        {"encoding": "msgpack"}
+    ]
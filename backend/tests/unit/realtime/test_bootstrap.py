@@ -7,6 +7,7 @@ from app.realtime.manager import RealtimeManager
 from app.realtime.publisher import RealtimePublisher
 from app.realtime.room_presence import RoomPresenceService
 from app.realtime.room_video_runtime import RoomVideoRuntimeService
+from app.realtime.runtime_snapshot import RoomRuntimeSnapshotStore
 
 
 # setup_realtime 会把 realtime 运行时组件挂到 FastAPI app.state 上
@@ -23,3 +24,4 @@ def test_setup_realtime_registers_runtime_services_on_app_state() -> None:
         app.state.realtime_room_video_runtime_service,
         RoomVideoRuntimeService,
     )
+    assert isinstance(app.state.realtime_runtime_snapshot_store, RoomRuntimeSnapshotStore)
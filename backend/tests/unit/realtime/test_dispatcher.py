@@ -1,7 +1,10 @@
+import json
 from types import SimpleNamespace
 
+import pytest
+
 from app.core.exceptions import BadRequestError
-from app.realtime.constants import WsCommandAction, WsErrorCode
+from app.realtime.constants import WsCommandAction, WsEncoding, WsErrorCode
 from app.realtime.handlers.dispatcher import RealtimeMessageHandler
 from app.realtime.manager import WsConnection
 from app.realtime.room_presence import RoomPresenceService
@@ -11,9 +14,13 @@ from app.realtime.room_video_runtime import RoomVideoRuntimeService
 class FakeWebSocket:
     def __init__(self) -> None:
         self.sent_json: list[dict] = []
+        self.sent_bytes: list[bytes] = []
+
+    async def send_text(self, data: str) -> None:
+        self.sent_json.append(json.loads(data))
 
-    async def send_json(self, payload: dict) -> None:
-        self.sent_json.append(payload)
+    async def send_bytes(self, data: bytes) -> None:
+        self.sent_bytes.append(data)
 
 
 # 认证消息会分发给 AuthHandler 并返回新的连接对象
@@ -171,6 +178,46 @@ async def test_dispatcher_returns_invalid_payload_error_for_malformed_message()
     assert "errors" in websocket.sent_json[0]["payload"]["details"]
 
 
+# msgpack 连接收到的 ack 与错误消息同样按协商编码以二进制帧发送
+async def test_dispatcher_replies_in_connection_encoding(monkeypatch) -> None:
+    msgpack = pytest.importorskip("msgpack")
+    websocket = FakeWebSocket()
+    handler = RealtimeMessageHandler(
+        presence_service=RoomPresenceService(),
+        video_runtime_service=RoomVideoRuntimeService(),
+    )
+    connection = WsConnection(
+        connection_id="conn-msgpack",
+        user_id=5,
+        websocket=websocket,
+        encoding=WsEncoding.MSGPACK,
+    )
+
+    async def fake_dispatch_command(**kwargs):  # noqa: ANN001
+        return {"ok": True}
+
+    monkeypatch.setattr(handler, "_dispatch_command", fake_dispatch_command)
+
+    for payload in [
+        {"request_id": "req-4", "action": "room_enter", "data": {"room_id": 1}},
+        {"request_id": "req-5"},
+    ]:
+        await handler.handle(
+            db=object(),
+            manager=object(),
+            publisher=object(),
+            websocket=websocket,
+            connection=connection,
+            raw_message={"type": "command", "payload": payload},
+        )
+
+    assert websocket.sent_json == []
+    frames = [msgpack.unpackb(frame) for frame in websocket.sent_bytes]
+    assert [frame["type"] for frame in frames] == ["ack", "error"]
+    assert frames[0]["payload"] == {"request_id": "req-4", "data": {"ok": True}}
+    assert frames[1]["payload"]["code"] == WsErrorCode.INVALID_PAYLOAD
+
+
 # _dispatch_command 会把房间命令路由给 RoomCommandHandler
 async def test_dispatcher_routes_room_actions_to_room_handler(monkeypatch) -> None:
     handler = RealtimeMessageHandler(
@@ -1,16 +1,24 @@
+import json
+
 import pytest
 
 from app.core.exceptions import BadRequestError
-from app.realtime.handlers.heartbeat import HeartbeatHandler
+from app.realtime.constants import WsEncoding
+from app.realtime.handlers.heartbeat import HeartbeatHandler, is_ping_message
 from app.realtime.protocol import build_pong_message
 
 
 class FakeWebSocket:
     def __init__(self) -> None:
-        self.sent_json: list[dict] = []
+        self.sent_text: list[str] = []
+
+        self.sent_bytes: list[bytes] = []
 
-    async def send_json(self, payload: dict) -> None:
-        self.sent_json.append(payload)
+    async def send_text(self, data: str) -> None:
+        self.sent_text.append(data)
+
+    async def send_bytes(self, data: bytes) -> None:
+        self.sent_bytes.append(data)
 
 
 # HeartbeatHandler 在收到 ping 时会返回标准 pong 响应
@@ -22,7 +30,26 @@ async def test_heartbeat_handler_replies_with_pong_for_ping() -> None:
         payload={"action": "ping"},
     )
 
-    assert websocket.sent_json == [build_pong_message().model_dump(mode="json")]
+    assert [json.loads(data) for data in websocket.sent_text] == [
+        build_pong_message().model_dump(mode="json")
+    ]
+
+
+# msgpack 连接的 pong 以二进制帧发送
+async def test_heartbeat_handler_replies_in_connection_encoding() -> None:
+    msgpack = pytest.importorskip("msgpack")
+    websocket = FakeWebSocket()
+
+    await HeartbeatHandler().handle(
+        websocket=websocket,
+        payload={"action": "ping"},
+        encoding=WsEncoding.MSGPACK,
+    )
+
+    assert websocket.sent_text == []
+    assert [msgpack.unpackb(frame) for frame in websocket.sent_bytes] == [
+        build_pong_message().model_dump(mode="json")
+    ]
 
 
 # HeartbeatHandler 在收到非 ping 动作时会抛出业务错误
@@ -36,3 +63,13 @@ async def test_heartbeat_handler_rejects_non_ping_action() -> None:
         )
 
     assert exc_info.value.message == "Client heartbeat action must be ping"
+
+
+# 只有标准 ping 帧会走快速路径，带多余字段或非 ping 的帧仍交给完整校验
+def test_is_ping_message_only_matches_canonical_ping() -> None:
+    assert is_ping_message({"type": "heartbeat", "payload": {"action": "ping"}})
+    assert is_ping_message({"v": 1, "type": "heartbeat", "payload": {"action": "ping"}})
+    assert not is_ping_message({"type": "heartbeat", "payload": {"action": "pong"}})
+    assert not is_ping_message({"type": "heartbeat", "payload": {"action": "ping"}, "x": 1})
+    assert not is_ping_message({"v": 2, "type": "heartbeat", "payload": {"action": "ping"}})
+    assert not is_ping_message(["heartbeat"])
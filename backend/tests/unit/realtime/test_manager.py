@@ -1,5 +1,10 @@
+import json
+
+import pytest
+
+from app.realtime import codec
 from app.realtime.channels import room_channel, user_channel
-from app.realtime.constants import WsEventType
+from app.realtime.constants import WsEncoding, WsEventType
 from app.realtime.manager import RealtimeManager
 from app.realtime.protocol import build_event_message
 
@@ -8,15 +13,22 @@ class FakeWebSocket:
     def __init__(self, *, fail_send: bool = False) -> None:
         self.fail_send = fail_send
         self.sent_json: list[dict] = []
+        self.sent_bytes: list[bytes] = []
         self.closed = False
 
-    async def send_json(self, payload: dict) -> None:
+    async def send_text(self, data: str) -> None:
+        if self.fail_send:
+            raise RuntimeError("send failed")
+        self.sent_json.append(json.loads(data))
+
+    async def send_bytes(self, data: bytes) -> None:
         if self.fail_send:
             raise RuntimeError("send failed")
-        self.sent_json.append(payload)
+        self.sent_bytes.append(data)
 
-    async def close(self) -> None:
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
         self.closed = True
+        self.close_code = code
 
 
 # register_connection 会注册连接并自动订阅用户频道
@@ -113,3 +125,59 @@ async def test_publish_sends_message_to_subscribed_connections_except_excluded_o
 
     assert len(websocket1.sent_json) == 1
     assert websocket2.sent_json == []
+
+
+# close_idle_connections 只关闭超过空闲时限的连接，并释放其订阅
+async def test_close_idle_connections_closes_only_stale_connections() -> None:
+    manager = RealtimeManager()
+    idle_websocket = FakeWebSocket()
+    active_websocket = FakeWebSocket()
+    idle_connection = await manager.register_connection(user_id=21, websocket=idle_websocket)
+    active_connection = await manager.register_connection(user_id=22, websocket=active_websocket)
+    await manager.subscribe(
+        connection_id=idle_connection.connection_id,
+        channel=room_channel(5),
+    )
+    idle_connection.last_seen_at -= 120
+
+    closed_count = await manager.close_idle_connections(idle_timeout_seconds=60)
+
+    assert closed_count == 1
+    assert idle_websocket.closed is True
+    assert idle_websocket.close_code == 1001
+    assert active_websocket.closed is False
+    assert idle_connection.connection_id not in manager.connections
+    assert room_channel(5) not in manager.channel_connections
+    assert active_connection.connection_id in manager.connections
+
+
+# publish 按连接协商的编码发送：json 连接收文本帧，msgpack 连接收二进制帧
+async def test_publish_encodes_frames_per_connection_encoding() -> None:
+    msgpack = pytest.importorskip("msgpack")
+    manager = RealtimeManager()
+    json_websocket = FakeWebSocket()
+    msgpack_websocket = FakeWebSocket()
+    json_connection = await manager.register_connection(user_id=31, websocket=json_websocket)
+    msgpack_connection = await manager.register_connection(
+        user_id=32,
+        websocket=msgpack_websocket,
+        encoding=WsEncoding.MSGPACK,
+    )
+    channel = room_channel(6)
+    await manager.subscribe(connection_id=json_connection.connection_id, channel=channel)
+    await manager.subscribe(connection_id=msgpack_connection.connection_id, channel=channel)
+    message = build_event_message(event=WsEventType.ROOM_USER_PRESENCE, data={"room_id": 6})
+
+    await manager.publish(channel=channel, message=message)
+
+    expected = message.model_dump(mode="json")
+    assert json_websocket.sent_json == [expected]
+    assert [msgpack.unpackb(frame) for frame in msgpack_websocket.sent_bytes] == [expected]
+
+
+# 未安装 msgpack 时协商结果回退为 json
+def test_resolve_encoding_falls_back_to_json_without_msgpack(monkeypatch) -> None:
+    monkeypatch.setattr(codec, "msgpack", None)
+
+    assert codec.resolve_encoding(WsEncoding.MSGPACK) == WsEncoding.JSON
+    assert codec.resolve_encoding(WsEncoding.JSON) == WsEncoding.JSON
@@ -1,13 +1,26 @@
+import asyncio
+import contextvars
 from datetime import UTC, datetime
 
 from app.modules.messages.schemas import MessageContentOut, MessageResponse, TextSegmentOut
-from app.modules.rooms.constants import RoomVideoSourceType
-from app.realtime.constants import PlaybackStatusType, WsEventType
+from app.modules.rooms.constants import (
+    RoomActiveSyncPermission,
+    RoomJoinAuditMode,
+    RoomRole,
+    RoomSyncPolicy,
+    RoomVideoSourceType,
+    RoomVisibility,
+)
+from app.modules.rooms.membership.schemas import RoomMemberResponse
+from app.modules.rooms.room.schemas import RoomResponse
+from app.modules.rooms.settings.schemas import RoomSettingsResponse
+from app.realtime.constants import PlaybackStatusType, RoomMembersChangeType, WsEventType
 from app.realtime.publisher import RealtimePublisher
 from app.realtime.state import (
     PlaybackState,
     PresenceState,
     RoomVideoSourceState,
+    UserResourceStatesDeltaState,
     UserResourceStatesState,
 )
 
@@ -43,6 +56,20 @@ async def test_publish_presence_broadcasts_presence_event() -> None:
     assert call["message"].payload["data"] == {"room_id": 8, "present_user_ids": [1, 2]}
 
 
+# publish_notifications 会向每个用户频道各发布一条通知信号
+async def test_publish_notifications_signals_each_user_channel() -> None:
+    manager = RecordingManager()
+    publisher = RealtimePublisher(manager)
+
+    await publisher.publish_notifications(user_ids=[3, 4, 5])
+
+    assert sorted(call["channel"].target_id for call in manager.publish_calls) == ["3", "4", "5"]
+    assert all(
+        call["message"].payload["event"] == WsEventType.NOTIFICATION
+        for call in manager.publish_calls
+    )
+
+
 # publish_session_closed 会向指定连接单播会话关闭事件
 async def test_publish_session_sends_session_event_to_single_connection() -> None:
     manager = RecordingManager()
@@ -133,4 +160,187 @@ async def test_publish_user_resource_states_broadcasts_resource_state_event() ->
     assert len(manager.publish_calls) == 1
     call = manager.publish_calls[0]
     assert call["message"].payload["event"] == WsEventType.USER_RESOURCE_STATES
-    assert call["message"].payload["data"] == {"room_id": 13, "user_resource_states": []}
+    assert call["message"].payload["data"] == {
+        "room_id": 13,
+        "seq": 0,
+        "user_resource_states": [],
+    }
+
+
+# publish_user_resource_states_delta 只广播变化的用户和序号
+async def test_publish_user_resource_states_delta_broadcasts_delta_event() -> None:
+    manager = RecordingManager()
+    publisher = RealtimePublisher(manager)
+    delta = UserResourceStatesDeltaState(room_id=14, seq=3, removed_user_ids=[7])
+
+    await publisher.publish_user_resource_states_delta(user_resource_states_delta=delta)
+
+    call = manager.publish_calls[0]
+    assert call["message"].payload["event"] == WsEventType.USER_RESOURCE_STATES_DELTA
+    assert call["message"].payload["data"] == {
+        "room_id": 14,
+        "seq": 3,
+        "upserted": [],
+        "removed_user_ids": [7],
+    }
+
+
+# 房间资料、设置和成员事件会携带数据，并共享同一个按房间递增的版本号
+async def test_publish_room_events_carry_data_and_room_version() -> None:
+    manager = RecordingManager()
+    publisher = RealtimePublisher(manager)
+    room = RoomResponse(
+        id=14,
+        name="Movie Night",
+        owner_id=1,
+        visibility=RoomVisibility.PUBLIC,
+        join_audit_mode=RoomJoinAuditMode.MANUAL_REVIEW,
+    )
+    room_settings = RoomSettingsResponse(
+        room_id=14,
+        selected_room_video_source_type=RoomVideoSourceType.EXTERNAL_URL,
+        sync_policy=RoomSyncPolicy.AUTO_SYNC,
+        active_sync_permission=RoomActiveSyncPermission.ALL_MEMBERS,
+        seek_auto_pause=True,
+        stall_min_duration_ms=500,
+        ready_min_duration_ms=1000,
+        stall_flap_penalty_ms=1000,
+    )
+    member = RoomMemberResponse(room_id=14, user_id=2, joined_at=None, role=RoomRole.MANAGER)
+
+    await publisher.publish_room_info(room=room)
+    await publisher.publish_room_settings(room_settings=room_settings)
+    await publisher.publish_room_members(
+        room_id=14,
+        change_type=RoomMembersChangeType.ROLE_CHANGED,
+        user_id=2,
+        member=member,
+    )
+    await publisher.publish_room_members(
+        room_id=14,
+        change_type=RoomMembersChangeType.REMOVED,
+        user_id=3,
+    )
+
+    payloads = [call["message"].payload for call in manager.publish_calls]
+    assert [payload["event"] for payload in payloads] == [
+        WsEventType.ROOM_INFO,
+        WsEventType.ROOM_SETTINGS,
+        WsEventType.ROOM_MEMBERS,
+        WsEventType.ROOM_MEMBERS,
+    ]
+    assert [payload["data"]["version"] for payload in payloads] == [1, 2, 3, 4]
+    assert payloads[0]["data"]["room"]["name"] == "Movie Night"
+    assert payloads[1]["data"]["settings"]["seek_auto_pause"] is True
+    assert payloads[2]["data"]["member"]["role"] == RoomRole.MANAGER
+    assert payloads[3]["data"] == {
+        "room_id": 14,
+        "version": 4,
+        "change_type": RoomMembersChangeType.REMOVED,
+        "user_id": 3,
+        "member": None,
+    }
+    assert publisher.get_room_version(14) == 4
+
+    publisher.clear_room_version(14)
+    assert publisher.get_room_version(14) == 0
+
+
+def _playback(*, room_id: int, position_seconds: float, status=PlaybackStatusType.PAUSED) -> PlaybackState:
+    return PlaybackState(
+        room_id=room_id,
+        status=status,
+        position_seconds=position_seconds,
+        anchor_ts_ms=1000,
+        playback_rate=1.0,
+    )
+
+
+# 合并窗口内连续 seek 只在窗口结束时广播最后一次；窗口内出现过 seek 时即使最后是 play 也按 seek 广播
+async def test_publish_playback_coalesced_broadcasts_leading_and_latest_settled_state() -> None:
+    manager = RecordingManager()
+    publisher = RealtimePublisher(manager)
+    publisher.playback_coalesce_window_seconds = 0.01
+
+    await publisher.publish_playback_coalesced(
+        event=WsEventType.PLAYBACK_SEEK,
+        playback=_playback(room_id=21, position_seconds=1.0),
+    )
+    for position_seconds in (2.0, 3.0, 4.0):
+        await publisher.publish_playback_coalesced(
+            event=WsEventType.PLAYBACK_SEEK,
+            playback=_playback(room_id=21, position_seconds=position_seconds),
+        )
+    await publisher.publish_playback_coalesced(
+        event=WsEventType.PLAYBACK_PLAY,
+        playback=_playback(
+            room_id=21,
+            position_seconds=4.0,
+            status=PlaybackStatusType.PLAYING,
+        ),
+    )
+    await publisher._playback_window_tasks[21]
+
+    payloads = [call["message"].payload for call in manager.publish_calls]
+    assert [payload["event"] for payload in payloads] == [
+        WsEventType.PLAYBACK_SEEK,
+        WsEventType.PLAYBACK_SEEK,
+    ]
+    assert payloads[0]["data"]["position_seconds"] == 1.0
+    assert payloads[1]["data"]["position_seconds"] == 4.0
+    assert payloads[1]["data"]["status"] == PlaybackStatusType.PLAYING
+    assert 21 not in publisher._playback_window_tasks
+
+
+# 直接广播的播放状态会作废窗口内尚未发出的合并事件
+async def test_direct_playback_publish_discards_pending_coalesced_event() -> None:
+    manager = RecordingManager()
+    publisher = RealtimePublisher(manager)
+    publisher.playback_coalesce_window_seconds = 0.01
+
+    await publisher.publish_playback_coalesced(
+        event=WsEventType.PLAYBACK_SEEK,
+        playback=_playback(room_id=22, position_seconds=1.0),
+    )
+    await publisher.publish_playback_coalesced(
+        event=WsEventType.PLAYBACK_SEEK,
+        playback=_playback(room_id=22, position_seconds=2.0),
+    )
+    await publisher.publish_playback_pause(playback=_playback(room_id=22, position_seconds=9.0))
+    await asyncio.wait_for(publisher._playback_window_tasks[22], timeout=1)
+
+    positions = [
+        call["message"].payload["data"]["position_seconds"]
+        for call in manager.publish_calls
+    ]
+    assert positions == [1.0, 9.0]
+
+
+# 合并窗口任务不继承首个命令的 contextvars，窗口末尾的广播不会带上首个请求的上下文
+async def test_playback_window_does_not_inherit_first_command_context() -> None:
+    request_marker: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+        "request_marker",
+        default=None,
+    )
+    seen: list[str | None] = []
+
+    class MarkerRecordingManager(RecordingManager):
+        async def publish(self, **kwargs) -> None:
+            seen.append(request_marker.get())
+            await super().publish(**kwargs)
+
+    publisher = RealtimePublisher(MarkerRecordingManager())
+    publisher.playback_coalesce_window_seconds = 0.01
+
+    request_marker.set("request-1")
+    await publisher.publish_playback_coalesced(
+        event=WsEventType.PLAYBACK_SEEK,
+        playback=_playback(room_id=23, position_seconds=1.0),
+    )
+    await publisher.publish_playback_coalesced(
+        event=WsEventType.PLAYBACK_SEEK,
+        playback=_playback(room_id=23, position_seconds=2.0),
+    )
+    await asyncio.wait_for(publisher._playback_window_tasks[23], timeout=1)
+
+    assert seen == ["request-1", None]
@@ -4,7 +4,7 @@ from app.realtime.room_presence import RoomPresenceService
 
 
 class FakeWebSocket:
-    async def send_json(self, payload: dict) -> None:
+    async def send_text(self, data: str) -> None:
         return None
 
     async def close(self) -> None:
@@ -1,3 +1,6 @@
+import asyncio
+import contextvars
+
 import pytest
 
 from app.core.exceptions import BadRequestError
@@ -7,7 +10,11 @@ from app.realtime.constants import (
     PlaybackStatusType,
     ResourceHealthStatusType,
 )
-from app.realtime.room_video_runtime import RoomVideoRuntimeService
+from app.realtime.room_video_runtime import (
+    RoomVideoRuntimeService,
+    StallHysteresisPolicy,
+    UserResourceStatusReport,
+)
 
 
 # 设置房间视频源后会重置播放状态和用户资源健康状态
@@ -212,3 +219,298 @@ async def test_manual_play_is_rejected_while_someone_is_stalling_in_auto_sync_mo
             anchor_ts_ms=1100,
             sync_policy=RoomSyncPolicy.AUTO_SYNC,
         )
+
+
+# 资源状态上报和离开只产出单个用户的增量，序号逐次递增并与完整快照对齐
+async def test_user_resource_state_changes_produce_sequenced_deltas() -> None:
+    service = RoomVideoRuntimeService()
+    room_id = 209
+
+    await service.set_room_video_source(
+        room_id=room_id,
+        source_type=RoomVideoSourceType.EXTERNAL_URL,
+        external_url="https://example.com/video.mp4",
+    )
+    first = await service.report_user_resource_status(
+        room_id=room_id,
+        user_id=1,
+        status=ResourceHealthStatusType.READY,
+        reported_at_ms=1000,
+        sync_policy=RoomSyncPolicy.DISABLED,
+    )
+    second = await service.report_user_resource_status(
+        room_id=room_id,
+        user_id=2,
+        status=ResourceHealthStatusType.READY,
+        reported_at_ms=1001,
+        sync_policy=RoomSyncPolicy.DISABLED,
+    )
+
+    assert [item.user_id for item in second.user_resource_states_delta.upserted] == [2]
+    assert second.user_resource_states_delta.seq == first.user_resource_states_delta.seq + 1
+
+    exit_result = await service.handle_room_session_exit(
+        room_id=room_id,
+        user_id=1,
+        sync_policy=RoomSyncPolicy.DISABLED,
+        room_empty=False,
+    )
+    assert exit_result.user_resource_states_delta.removed_user_ids == [1]
+    assert exit_result.user_resource_states_delta.seq == second.user_resource_states_delta.seq + 1
+
+    unchanged = await service.handle_room_session_exit(
+        room_id=room_id,
+        user_id=99,
+        sync_policy=RoomSyncPolicy.DISABLED,
+        room_empty=False,
+    )
+    assert unchanged.user_resource_states_delta is None
+
+    snapshot = await service.get_user_resource_states(room_id=room_id)
+    assert snapshot.seq == exit_result.user_resource_states_delta.seq
+    assert [item.user_id for item in snapshot.user_resource_states] == [2]
+
+
+# 聚合窗口内多个用户的上报只产出一次更新；窗口内卡顿又恢复的用户不会触发自动暂停
+async def test_resource_status_window_batches_reports_into_single_update() -> None:
+    service = RoomVideoRuntimeService()
+    service.resource_status_window_seconds = 0.01
+    room_id = 210
+    updates = []
+
+    async def on_update(*, result) -> None:  # noqa: ANN001
+        updates.append(result)
+
+    await service.set_room_video_source(
+        room_id=room_id,
+        source_type=RoomVideoSourceType.EXTERNAL_URL,
+        external_url="https://example.com/video.mp4",
+    )
+    await service.play(
+        room_id=room_id,
+        position_seconds=0.0,
+        anchor_ts_ms=1000,
+        sync_policy=RoomSyncPolicy.AUTO_SYNC,
+        playback_rate=1.0,
+    )
+
+    for user_id, status, reported_at_ms in (
+        (1, ResourceHealthStatusType.STALLING, 1100),
+        (2, ResourceHealthStatusType.READY, 1101),
+        (1, ResourceHealthStatusType.READY, 1102),
+    ):
+        await service.submit_user_resource_status(
+            room_id=room_id,
+            report=UserResourceStatusReport(
+                user_id=user_id,
+                status=status,
+                reported_at_ms=reported_at_ms,
+            ),
+            sync_policy=RoomSyncPolicy.AUTO_SYNC,
+            on_update=on_update,
+        )
+
+    assert updates == []
+    await asyncio.sleep(0.05)
+
+    assert len(updates) == 1
+    delta = updates[0].user_resource_states_delta
+    assert [(item.user_id, item.status) for item in delta.upserted] == [
+        (1, ResourceHealthStatusType.READY),
+        (2, ResourceHealthStatusType.READY),
+    ]
+    assert updates[0].auto_action is None
+    playback = await service.get_playback(room_id=room_id)
+    assert playback.status == PlaybackStatusType.PLAYING
+
+
+
+# 聚合窗口任务不继承首个上报的 contextvars，窗口结束时的更新回调拿不到首个请求的上下文
+async def test_resource_status_window_does_not_inherit_first_report_context() -> None:
+    service = RoomVideoRuntimeService()
+    service.resource_status_window_seconds = 0.01
+    room_id = 213
+    request_marker: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+        "request_marker",
+        default=None,
+    )
+    seen: list[str | None] = []
+
+    async def on_update(*, result) -> None:  # noqa: ANN001, ARG001
+        seen.append(request_marker.get())
+
+    await _start_playing_room(service, room_id)
+    request_marker.set("request-1")
+    await service.submit_user_resource_status(
+        room_id=room_id,
+        report=UserResourceStatusReport(
+            user_id=1,
+            status=ResourceHealthStatusType.READY,
+            reported_at_ms=1100,
+        ),
+        sync_policy=RoomSyncPolicy.AUTO_SYNC,
+        on_update=on_update,
+    )
+    await asyncio.wait_for(service._resource_status_window_tasks[room_id], timeout=1)
+
+    assert seen == [None]
+
+async def _start_playing_room(service: RoomVideoRuntimeService, room_id: int) -> None:
+    await service.set_room_video_source(
+        room_id=room_id,
+        source_type=RoomVideoSourceType.EXTERNAL_URL,
+        external_url="https://example.com/video.mp4",
+    )
+    await service.play(
+        room_id=room_id,
+        position_seconds=0.0,
+        anchor_ts_ms=1000,
+        sync_policy=RoomSyncPolicy.AUTO_SYNC,
+        playback_rate=1.0,
+    )
+
+
+# 短于最小卡顿时长的卡顿不会暂停房间；持续卡顿由计时器到点触发一次自动暂停
+async def test_stall_hysteresis_pauses_only_after_min_stall_duration() -> None:
+    service = RoomVideoRuntimeService()
+    room_id = 211
+    hysteresis = StallHysteresisPolicy(min_stall_ms=30)
+    updates = []
+
+    async def on_update(*, result) -> None:  # noqa: ANN001
+        updates.append(result)
+
+    async def report(status: ResourceHealthStatusType):
+        return await service.report_user_resource_statuses(
+            room_id=room_id,
+            reports=[UserResourceStatusReport(user_id=1, status=status, reported_at_ms=1)],
+            sync_policy=RoomSyncPolicy.AUTO_SYNC,
+            stall_hysteresis=hysteresis,
+            on_update=on_update,
+        )
+
+    await _start_playing_room(service, room_id)
+
+    assert (await report(ResourceHealthStatusType.STALLING)).auto_action is None
+    assert (await report(ResourceHealthStatusType.READY)).auto_action is None
+    await asyncio.sleep(0.06)
+    assert updates == []
+
+    assert (await report(ResourceHealthStatusType.STALLING)).auto_action is None
+    await asyncio.sleep(0.06)
+
+    assert len(updates) == 1
+    assert updates[0].user_resource_states_delta is None
+    assert updates[0].auto_action == AutoPlaybackAction.PAUSE
+    assert (await service.get_playback(room_id=room_id)).status == PlaybackStatusType.PAUSED
+
+
+
+# 卡顿计时器任务不继承安排它的上报的 contextvars，到点触发的自动暂停回调拿不到该请求的上下文
+async def test_stall_evaluation_does_not_inherit_report_context() -> None:
+    service = RoomVideoRuntimeService()
+    room_id = 214
+    request_marker: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+        "request_marker",
+        default=None,
+    )
+    seen: list[str | None] = []
+
+    async def on_update(*, result) -> None:  # noqa: ANN001, ARG001
+        seen.append(request_marker.get())
+
+    await _start_playing_room(service, room_id)
+    request_marker.set("request-1")
+    result = await service.report_user_resource_statuses(
+        room_id=room_id,
+        reports=[
+            UserResourceStatusReport(
+                user_id=1,
+                status=ResourceHealthStatusType.STALLING,
+                reported_at_ms=1,
+            )
+        ],
+        sync_policy=RoomSyncPolicy.AUTO_SYNC,
+        stall_hysteresis=StallHysteresisPolicy(min_stall_ms=10),
+        on_update=on_update,
+    )
+    assert result.auto_action is None
+    await asyncio.wait_for(service._stall_evaluation_tasks[room_id], timeout=1)
+
+    assert seen == [None]
+
+# 恢复期内再次卡顿的用户会累计抖动惩罚，自动续播要等到延长后的恢复期结束
+async def test_stall_flap_penalty_extends_ready_duration_before_auto_resume() -> None:
+    service = RoomVideoRuntimeService()
+    room_id = 212
+    hysteresis = StallHysteresisPolicy(min_ready_ms=30, flap_penalty_ms=60)
+    updates = []
+
+    async def on_update(*, result) -> None:  # noqa: ANN001
+        updates.append(result)
+
+    async def report(status: ResourceHealthStatusType):
+        return await service.report_user_resource_statuses(
+            room_id=room_id,
+            reports=[UserResourceStatusReport(user_id=1, status=status, reported_at_ms=1)],
+            sync_policy=RoomSyncPolicy.AUTO_SYNC,
+            stall_hysteresis=hysteresis,
+            on_update=on_update,
+        )
+
+    await _start_playing_room(service, room_id)
+
+    assert (await report(ResourceHealthStatusType.STALLING)).auto_action == AutoPlaybackAction.PAUSE
+    assert (await report(ResourceHealthStatusType.READY)).auto_action is None
+    assert (await report(ResourceHealthStatusType.STALLING)).auto_action is None
+    assert (await report(ResourceHealthStatusType.READY)).auto_action is None
+
+    await asyncio.sleep(0.05)
+    assert updates == []
+
+    await asyncio.sleep(0.1)
+    assert [update.auto_action for update in updates] == [AutoPlaybackAction.PLAY]
+    assert (await service.get_playback(room_id=room_id)).status == PlaybackStatusType.PLAYING
+
+
+# 房间快照在一次加锁内生成并按版本缓存，状态变化后版本递增并重新序列化
+async def test_room_snapshot_is_cached_until_next_mutation() -> None:
+    service = RoomVideoRuntimeService()
+    room_id = 213
+
+    empty = await service.get_room_snapshot(room_id=room_id)
+    assert empty["runtime_version"] == 0
+    assert empty["playback"] is None
+    assert empty["user_resource_states"]["user_resource_states"] == []
+
+    await service.set_room_video_source(
+        room_id=room_id,
+        source_type=RoomVideoSourceType.EXTERNAL_URL,
+        external_url="https://example.com/video.mp4",
+        anchor_ts_ms=1000,
+    )
+    await service.report_user_resource_status(
+        room_id=room_id,
+        user_id=1,
+        status=ResourceHealthStatusType.READY,
+        reported_at_ms=1000,
+        sync_policy=RoomSyncPolicy.DISABLED,
+    )
+
+    first = await service.get_room_snapshot(room_id=room_id)
+    second = await service.get_room_snapshot(room_id=room_id)
+    assert first == second
+    assert first["playback"] is second["playback"]
+    assert first["user_resource_states"]["seq"] == 2
+
+    await service.seek(
+        room_id=room_id,
+        position_seconds=42.0,
+        anchor_ts_ms=2000,
+        sync_policy=RoomSyncPolicy.DISABLED,
+    )
+
+    after_seek = await service.get_room_snapshot(room_id=room_id)
+    assert after_seek["runtime_version"] > first["runtime_version"]
+    assert after_seek["playback"]["position_seconds"] == 42.0
+    assert first["playback"]["position_seconds"] == 0.0
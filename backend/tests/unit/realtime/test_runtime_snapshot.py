@@ -0,0 +1,226 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from fastapi import WebSocketDisconnect
+
+from app.modules.rooms.constants import RoomSyncPolicy, RoomVideoSourceType
+from app.realtime import runtime_snapshot
+from app.realtime.constants import PlaybackHoldReason, PlaybackStatusType, ResourceHealthStatusType
+from app.realtime.manager import RealtimeManager
+from app.realtime.publisher import RealtimePublisher
+from app.realtime.room_presence import RoomPresenceService
+from app.realtime.room_video_runtime import RoomVideoRuntimeService, now_ms
+from app.realtime.runtime_snapshot import RoomRuntimeSnapshotStore
+from app.realtime.ws_router import websocket_endpoint
+
+
+def _build_store(snapshot_path) -> RoomRuntimeSnapshotStore:  # noqa: ANN001
+    return RoomRuntimeSnapshotStore(
+        video_runtime_service=RoomVideoRuntimeService(),
+        presence_service=RoomPresenceService(),
+        snapshot_path=snapshot_path,
+    )
+
+
+# 快照写入后新进程恢复视频源、暂停原因，并把播放位置按锚点外推到恢复时刻
+async def test_restore_extrapolates_playing_position_and_keeps_hold_reason(tmp_path) -> None:
+    snapshot_path = tmp_path / "realtime_runtime.json"
+    store = _build_store(snapshot_path)
+    runtime = store.video_runtime_service
+
+    await runtime.set_room_video_source(
+        room_id=1,
+        source_type=RoomVideoSourceType.EXTERNAL_URL,
+        external_url="https://example.com/a.mp4",
+    )
+    await runtime.play(
+        room_id=1,
+        position_seconds=10.0,
+        anchor_ts_ms=now_ms() - 5000,
+        sync_policy=RoomSyncPolicy.AUTO_SYNC,
+    )
+    await runtime.report_user_resource_status(
+        room_id=1,
+        user_id=7,
+        status=ResourceHealthStatusType.READY,
+        reported_at_ms=1,
+        sync_policy=RoomSyncPolicy.AUTO_SYNC,
+    )
+    await runtime.set_room_video_source(
+        room_id=2,
+        source_type=RoomVideoSourceType.EXTERNAL_URL,
+        external_url="https://example.com/b.mp4",
+    )
+    await runtime.pause(
+        room_id=2,
+        position_seconds=33.0,
+        anchor_ts_ms=1000,
+        sync_policy=RoomSyncPolicy.AUTO_SYNC,
+    )
+    await store.stop()
+
+    restarted = _build_store(snapshot_path)
+    assert await restarted.restore() == 2
+
+    playing = await restarted.video_runtime_service.get_playback(room_id=1)
+    assert playing.status == PlaybackStatusType.PLAYING
+    assert 14.9 <= playing.position_seconds <= 16.0
+    assert playing.anchor_ts_ms >= now_ms() - 1000
+
+    paused = await restarted.video_runtime_service.get_playback(room_id=2)
+    assert paused.position_seconds == 33.0
+    assert paused.anchor_ts_ms == 1000
+    assert (
+        restarted.video_runtime_service._room_states[2].playback_hold_reason
+        == PlaybackHoldReason.MANUAL
+    )
+
+    resource_states = await restarted.video_runtime_service.get_user_resource_states(room_id=1)
+    assert resource_states.user_resource_states == []
+
+
+# 过期、损坏或结构不对的快照不会被恢复
+async def test_restore_skips_expired_and_unreadable_snapshots(monkeypatch, tmp_path) -> None:
+    snapshot_path = tmp_path / "realtime_runtime.json"
+    snapshot_path.write_text(
+        json.dumps(
+            {
+                "version": runtime_snapshot.SNAPSHOT_FORMAT_VERSION,
+                "saved_at_ms": now_ms() - 10_000,
+                "rooms": [],
+            }
+        ),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(
+        runtime_snapshot.settings,
+        "realtime_runtime_snapshot_max_age_seconds",
+        5,
+    )
+
+    assert await _build_store(snapshot_path).restore() == 0
+
+    # 非法 JSON、根节点不是对象、缺少字段都按冷启动处理，不抛出到启动流程
+    for body in [
+        "{not json",
+        "[]",
+        json.dumps({"version": runtime_snapshot.SNAPSHOT_FORMAT_VERSION, "rooms": []}),
+        json.dumps(
+            {
+                "version": runtime_snapshot.SNAPSHOT_FORMAT_VERSION,
+                "saved_at_ms": now_ms(),
+                "rooms": {},
+            }
+        ),
+    ]:
+        snapshot_path.write_text(body, encoding="utf-8")
+        assert await _build_store(snapshot_path).restore() == 0
+
+
+# 恢复后无人重新进入的房间超过宽限期会被清理，有人在线的房间转为正常运行时
+async def test_unclaimed_restored_rooms_are_pruned_after_grace(tmp_path) -> None:
+    store = _build_store(tmp_path / "realtime_runtime.json")
+    runtime = store.video_runtime_service
+    room_video_source = {
+        "source_type": "external_url",
+        "external_url": "https://example.com/a.mp4",
+        "file_hash": None,
+    }
+    await runtime.restore_room_states(
+        [
+            {
+                "room_id": room_id,
+                "room_video_source": {"room_id": room_id, **room_video_source},
+                "playback": None,
+                "playback_hold_reason": "none",
+            }
+            for room_id in (1, 2)
+        ],
+        at_ms=1000,
+    )
+
+    pruned = await runtime.prune_unclaimed_rooms(
+        active_room_ids={2},
+        unclaimed_before_ms=2000,
+    )
+
+    assert pruned == [1]
+    assert runtime.count_rooms() == 1
+    assert runtime._room_states[2].unclaimed_since_ms is None
+
+
+class _SessionContext:
+    async def __aenter__(self):
+        return SimpleNamespace()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class _ClosingWebSocket:
+    def __init__(self, app) -> None:  # noqa: ANN001
+        self.app = app
+        self.accept = AsyncMock()
+        self.close = AsyncMock()
+        self._messages: list = [{"type": "auth"}, WebSocketDisconnect(code=1012)]
+
+    async def receive_json(self):
+        item = self._messages.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+# 优雅停机时 uvicorn 先以 1012 断开连接再执行 lifespan 关闭，最后一次快照仍要保留房间播放状态
+async def test_shutdown_after_disconnect_cleanup_keeps_playing_room(monkeypatch, tmp_path) -> None:
+    snapshot_path = tmp_path / "realtime_runtime.json"
+    store = _build_store(snapshot_path)
+    runtime = store.video_runtime_service
+    manager = RealtimeManager()
+    app = SimpleNamespace(
+        state=SimpleNamespace(
+            realtime_manager=manager,
+            realtime_publisher=RealtimePublisher(manager),
+            realtime_room_presence_service=store.presence_service,
+            realtime_room_video_runtime_service=runtime,
+        )
+    )
+    ws = _ClosingWebSocket(app)
+    connection = await manager.register_connection(user_id=7, websocket=ws)
+    await store.presence_service.enter_room(manager=manager, connection=connection, room_id=1)
+    await runtime.set_room_video_source(
+        room_id=1,
+        source_type=RoomVideoSourceType.EXTERNAL_URL,
+        external_url="https://example.com/a.mp4",
+    )
+    await runtime.play(
+        room_id=1,
+        position_seconds=10.0,
+        anchor_ts_ms=now_ms() - 5000,
+        sync_policy=RoomSyncPolicy.AUTO_SYNC,
+    )
+
+    class _AuthenticatedHandler:
+        def __init__(self, **kwargs) -> None:
+            pass
+
+        async def handle(self, **kwargs):
+            return connection
+
+    monkeypatch.setattr("app.realtime.ws_router.RealtimeMessageHandler", _AuthenticatedHandler)
+    monkeypatch.setattr("app.realtime.ws_router.AsyncSessionLocal", lambda: _SessionContext())
+    monkeypatch.setattr(
+        "app.realtime.ws_router.RoomSettingsService",
+        lambda: SimpleNamespace(find_room_settings_by_room_id=AsyncMock(return_value=None)),
+    )
+
+    await websocket_endpoint(ws)
+    assert await store.presence_service.get_active_room_ids() == set()
+    await store.stop()
+
+    restarted = _build_store(snapshot_path)
+    assert await restarted.restore() == 1
+    playing = await restarted.video_runtime_service.get_playback(room_id=1)
+    assert playing.status == PlaybackStatusType.PLAYING
+    assert 14.9 <= playing.position_seconds <= 16.0
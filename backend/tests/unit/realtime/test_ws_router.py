@@ -69,7 +69,7 @@ async def test_websocket_endpoint_disconnect_cleanup_publishes_presence(monkeypa
     )
     presence = SimpleNamespace(room_id=42, present_user_ids={1, 2})
     publisher = SimpleNamespace(
-        publish_user_resource_states=AsyncMock(),
+        publish_user_resource_states_delta=AsyncMock(),
         publish_playback_play=AsyncMock(),
         publish_room_user_presence=AsyncMock(),
     )
@@ -80,7 +80,7 @@ async def test_websocket_endpoint_disconnect_cleanup_publishes_presence(monkeypa
     )
     session_exit_result = SimpleNamespace(
         room_cleared=False,
-        user_resource_states={"states": []},
+        user_resource_states_delta={"states": []},
         auto_action="pause",
         auto_playback=None,
     )
@@ -123,7 +123,57 @@ async def test_websocket_endpoint_disconnect_cleanup_publishes_presence(monkeypa
     ws.accept.assert_awaited_once()
     presence_service.handle_disconnect.assert_awaited_once_with(connection=connection)
     manager.disconnect.assert_awaited_once_with(connection.connection_id)
-    publisher.publish_user_resource_states.assert_awaited_once_with(
-        user_resource_states={"states": []}
+    publisher.publish_user_resource_states_delta.assert_awaited_once_with(
+        user_resource_states_delta={"states": []}
     )
     publisher.publish_room_user_presence.assert_awaited_once_with(presence=presence)
+
+
+# 验证已认证连接的标准 ping 直接回复预编码 pong，不进入分发器，并刷新 last_seen_at。
+async def test_websocket_endpoint_answers_ping_without_dispatcher(monkeypatch) -> None:
+    connection = WsConnection(
+        connection_id="conn-ping",
+        user_id=8,
+        websocket=SimpleNamespace(),
+        last_seen_at=0.0,
+    )
+    manager = SimpleNamespace(disconnect=AsyncMock())
+    presence_service = SimpleNamespace(handle_disconnect=AsyncMock(return_value=None))
+    app = SimpleNamespace(
+        state=SimpleNamespace(
+            realtime_manager=manager,
+            realtime_publisher=SimpleNamespace(),
+            realtime_room_presence_service=presence_service,
+            realtime_room_video_runtime_service=SimpleNamespace(),
+        )
+    )
+    ws = _FakeWebSocket(
+        app=app,
+        messages=[
+            {"type": "auth"},
+            {"type": "heartbeat", "payload": {"action": "ping"}},
+            WebSocketDisconnect(),
+        ],
+    )
+    ws.send_text = AsyncMock()
+    handled_messages: list[dict] = []
+
+    class _FakeHandler:
+        def __init__(self, **kwargs):
+            pass
+
+        async def handle(self, **kwargs):
+            handled_messages.append(kwargs["raw_message"])
+            return connection
+
+    monkeypatch.setattr("app.realtime.ws_router.RealtimeMessageHandler", _FakeHandler)
+    monkeypatch.setattr("app.realtime.ws_router.AsyncSessionLocal", lambda: _DummySessionContext())
+    monkeypatch.setattr("app.realtime.ws_router.RoomSettingsService", lambda: SimpleNamespace())
+
+    await websocket_endpoint(ws)
+
+    assert handled_messages == [{"type": "auth"}]
+    ws.send_text.assert_awaited_once()
+    assert '"pong"' in ws.send_text.await_args.args[0]
+    assert connection.last_seen_at > 0.0
+    manager.disconnect.assert_awaited_once_with("conn-ping")
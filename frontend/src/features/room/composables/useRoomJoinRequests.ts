@@ -140,6 +140,11 @@ export function useRoomJoinRequests(options: UseRoomJoinRequestsOptions) {
     }
   }
 
+  function dropRoomRequestsForUser(userId: number) {
+    roomJoinRequests.value = roomJoinRequests.value.filter((request) =>
+      (request.source === "apply" ? request.initiator_user_id : request.target_user_id) !== userId);
+  }
+
   function resetRoomRequestsState() {
     roomJoinRequests.value = [];
     requestsLoaded.value = false;
@@ -157,6 +162,7 @@ export function useRoomJoinRequests(options: UseRoomJoinRequestsOptions) {
     isRequestActionLoading,
     approveRequest,
     rejectRequest,
+    dropRoomRequestsForUser,
     resetRoomRequestsState,
   };
 }
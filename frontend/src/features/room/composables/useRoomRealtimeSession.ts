@@ -7,10 +7,14 @@ import {
   leaveRoomRealtime,
   type RoomRealtimePlaybackState,
   type RoomRealtimePresenceState,
+  type RoomRealtimeRoomInfo,
+  type RoomRealtimeRoomMembersChange,
+  type RoomRealtimeRoomSettings,
   type RoomRealtimeSessionClosed,
   type RoomRealtimeSnapshot,
   type RoomRealtimeResourceStatus,
   type RoomRealtimeUserResourceState,
+  type RoomRealtimeUserResourceStatesDelta,
   type RoomRealtimeUserResourceStatesState,
   type RoomRealtimeVideoSourceState,
 } from "@/infra/realtime/roomRealtime";
@@ -20,6 +24,10 @@ import { useMessagesStore } from "@/stores/messages.store";
 
 type UseRoomRealtimeSessionOptions = {
   roomId: Ref<number>;
+  applyRoomInfo: (payload: RoomRealtimeRoomInfo) => void;
+  applyRoomSettings: (payload: RoomRealtimeRoomSettings) => void;
+  applyRoomMembersChange: (payload: RoomRealtimeRoomMembersChange) => void;
+  // Full HTTP refetches, only used when a room_version gap is detected.
   refreshRoom: () => void | Promise<void>;
   refreshRoomMembers: () => void | Promise<void>;
   refreshRoomRequests: () => void | Promise<void>;
@@ -72,10 +80,10 @@ function normalizeRealtimeResourceStatus(status: unknown): RoomRealtimeResourceS
   return null;
 }
 
-function normalizeUserResourceStates(state: RoomRealtimeUserResourceStatesState | null | undefined) {
-  if (!Array.isArray(state?.user_resource_states)) return [];
+function normalizeUserResourceStateItems(items: unknown) {
+  if (!Array.isArray(items)) return [];
 
-  return state.user_resource_states.flatMap((item): RoomRealtimeUserResourceState[] => {
+  return items.flatMap((item): RoomRealtimeUserResourceState[] => {
     const status = normalizeRealtimeResourceStatus(item?.status);
     if (
       typeof item?.room_id !== "number" ||
@@ -89,6 +97,10 @@ function normalizeUserResourceStates(state: RoomRealtimeUserResourceStatesState
   });
 }
 
+function normalizeUserResourceStates(state: RoomRealtimeUserResourceStatesState | null | undefined) {
+  return normalizeUserResourceStateItems(state?.user_resource_states);
+}
+
 export function useRoomRealtimeSession(options: UseRoomRealtimeSessionOptions) {
   const auth = useAuthStore();
   const messagesStore = useMessagesStore();
@@ -108,6 +120,10 @@ export function useRoomRealtimeSession(options: UseRoomRealtimeSessionOptions) {
   let enteredRoomId: number | null = null;
   let enteringRoomId: number | null = null;
   let enterAttempt = 0;
+  // Sequence of the last applied user_resource_states snapshot/delta; null until a snapshot arrives.
+  let userResourceStatesSeq: number | null = null;
+  // Last applied room_info/room_settings/room_members version; null until room_enter returns.
+  let roomDataVersion: number | null = null;
 
   async function ensureConnectionReady() {
     auth.syncTokensFromStorage();
@@ -138,6 +154,7 @@ export function useRoomRealtimeSession(options: UseRoomRealtimeSessionOptions) {
 
       enteredRoomId = roomId;
       isRealtimeActive.value = true;
+      roomDataVersion = typeof snapshot.room_version === "number" ? snapshot.room_version : null;
       presentUserIds.value = normalizePresentUserIds(snapshot);
       hasPresenceSnapshot.value = true;
       roomVideoSource.value = snapshot.room_video_source ?? null;
@@ -149,7 +166,7 @@ export function useRoomRealtimeSession(options: UseRoomRealtimeSessionOptions) {
       roomPlaybackEvent.value = snapshot.playback
         ? { action: "snapshot", state: snapshot.playback }
         : null;
-      userResourceStates.value = normalizeUserResourceStates(snapshot.user_resource_states);
+      applyUserResourceStatesSnapshot(snapshot.user_resource_states);
     } catch (error) {
       if (attempt !== enterAttempt) return;
       isRealtimeActive.value = false;
@@ -175,6 +192,8 @@ export function useRoomRealtimeSession(options: UseRoomRealtimeSessionOptions) {
     roomPlayback.value = null;
     roomPlaybackEvent.value = null;
     userResourceStates.value = [];
+    userResourceStatesSeq = null;
+    roomDataVersion = null;
 
     if (wsClient.connectionStatus !== "ready") return;
 
@@ -185,10 +204,45 @@ export function useRoomRealtimeSession(options: UseRoomRealtimeSessionOptions) {
     }
   }
 
-  function refreshIfCurrentRoom(payload: unknown, refresh: () => void | Promise<void>) {
+  function resyncRoomData() {
+    void options.refreshRoom();
+    void options.refreshRoomSettings();
+    void options.refreshRoomMembers();
+    void options.refreshRoomRequests();
+  }
+
+  function acceptRoomDataVersion(payload: { version?: unknown } | null | undefined) {
+    const version = payload?.version;
+    if (typeof version === "number" && roomDataVersion !== null && version === roomDataVersion + 1) {
+      roomDataVersion = version;
+      return true;
+    }
+
+    // A gap, a restarted counter or no baseline yet: refetch everything over HTTP once.
+    roomDataVersion = typeof version === "number" ? version : null;
+    resyncRoomData();
+    return false;
+  }
+
+  function handleRoomInfo(payload: RoomRealtimeRoomInfo) {
+    const roomId = options.roomId.value;
+    if (!roomId || !isCurrentRoomPayload(payload, roomId)) return;
+    if (!acceptRoomDataVersion(payload) || !payload.room) return;
+    options.applyRoomInfo(payload);
+  }
+
+  function handleRoomSettings(payload: RoomRealtimeRoomSettings) {
+    const roomId = options.roomId.value;
+    if (!roomId || !isCurrentRoomPayload(payload, roomId)) return;
+    if (!acceptRoomDataVersion(payload) || !payload.settings) return;
+    options.applyRoomSettings(payload);
+  }
+
+  function handleRoomMembersChange(payload: RoomRealtimeRoomMembersChange) {
     const roomId = options.roomId.value;
     if (!roomId || !isCurrentRoomPayload(payload, roomId)) return;
-    void refresh();
+    if (!acceptRoomDataVersion(payload)) return;
+    options.applyRoomMembersChange(payload);
   }
 
   function handlePresence(payload: RoomRealtimePresenceState) {
@@ -246,7 +300,7 @@ export function useRoomRealtimeSession(options: UseRoomRealtimeSessionOptions) {
 
     roomVideoSource.value = response.room_video_source ?? null;
     roomPlayback.value = response.playback ?? null;
-    userResourceStates.value = normalizeUserResourceStates(response.user_resource_states);
+    applyUserResourceStatesSnapshot(response.user_resource_states);
 
     if (shouldUpdateState) {
       roomVideoSourceEvent.value = {
@@ -270,7 +324,35 @@ export function useRoomRealtimeSession(options: UseRoomRealtimeSessionOptions) {
         payload,
       });
     }
-    userResourceStates.value = normalizeUserResourceStates(payload);
+    applyUserResourceStatesSnapshot(payload);
+  }
+
+  function applyUserResourceStatesSnapshot(state: RoomRealtimeUserResourceStatesState | null | undefined) {
+    userResourceStates.value = normalizeUserResourceStates(state);
+    userResourceStatesSeq = typeof state?.seq === "number" ? state.seq : null;
+  }
+
+  function handleUserResourceStatesDelta(payload: RoomRealtimeUserResourceStatesDelta) {
+    if (!isCurrentRoomPayload(payload, options.roomId.value)) return;
+    if (typeof payload?.seq !== "number" || userResourceStatesSeq === null) return;
+    // Deltas already covered by the current snapshot are stale.
+    if (payload.seq <= userResourceStatesSeq) return;
+    if (payload.seq !== userResourceStatesSeq + 1) {
+      // A delta was missed: resync from a full snapshot.
+      userResourceStatesSeq = null;
+      void fetchVideoRuntimeSnapshot({ updateState: false }).catch(() => undefined);
+      return;
+    }
+
+    const byUserId = new Map(userResourceStates.value.map((item) => [item.user_id, item]));
+    for (const userId of payload.removed_user_ids ?? []) {
+      byUserId.delete(userId);
+    }
+    for (const item of normalizeUserResourceStateItems(payload.upserted)) {
+      byUserId.set(item.user_id, item);
+    }
+    userResourceStates.value = [...byUserId.values()].sort((a, b) => a.user_id - b.user_id);
+    userResourceStatesSeq = payload.seq;
   }
 
   function handleSessionClosed(payload: RoomRealtimeSessionClosed) {
@@ -284,23 +366,16 @@ export function useRoomRealtimeSession(options: UseRoomRealtimeSessionOptions) {
     roomPlayback.value = null;
     roomPlaybackEvent.value = null;
     userResourceStates.value = [];
+    userResourceStatesSeq = null;
+    roomDataVersion = null;
     options.onSessionClosed?.(payload);
   }
 
   function bindEvents() {
     stopEventSubscriptions = [
-      wsClient.onEvent("room_info", (payload) => {
-        refreshIfCurrentRoom(payload, options.refreshRoom);
-      }),
-      wsClient.onEvent("room_settings", (payload) => {
-        refreshIfCurrentRoom(payload, options.refreshRoomSettings);
-      }),
-      wsClient.onEvent("room_members", (payload) => {
-        refreshIfCurrentRoom(payload, () => {
-          void options.refreshRoomMembers();
-          void options.refreshRoomRequests();
-        });
-      }),
+      wsClient.onEvent<RoomRealtimeRoomInfo>("room_info", handleRoomInfo),
+      wsClient.onEvent<RoomRealtimeRoomSettings>("room_settings", handleRoomSettings),
+      wsClient.onEvent<RoomRealtimeRoomMembersChange>("room_members", handleRoomMembersChange),
       wsClient.onEvent<RoomRealtimePresenceState>("room_user_presence", handlePresence),
       wsClient.onEvent<MessageResponse>("message", handleMessage),
       wsClient.onEvent<RoomRealtimeVideoSourceState>("room_video_source_set", handleRoomVideoSource),
@@ -314,6 +389,10 @@ export function useRoomRealtimeSession(options: UseRoomRealtimeSessionOptions) {
         handlePlayback("playback_seek", payload);
       }),
       wsClient.onEvent<RoomRealtimeUserResourceStatesState>("user_resource_states", handleUserResourceStates),
+      wsClient.onEvent<RoomRealtimeUserResourceStatesDelta>(
+        "user_resource_states_delta",
+        handleUserResourceStatesDelta,
+      ),
       wsClient.onEvent<RoomRealtimeSessionClosed>("session_closed", handleSessionClosed),
     ];
   }
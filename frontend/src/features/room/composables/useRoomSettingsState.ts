@@ -103,6 +103,16 @@ export function useRoomSettingsState(options: UseRoomSettingsStateOptions) {
     }
   }
 
+  function applyRoomSettings(settings: RoomSettings) {
+    if (settings.room_id !== options.roomId.value || options.currentUserRole.value === "unknown") {
+      return;
+    }
+
+    roomSettings.value = settings;
+    entitiesStore.upsertRoomSettings(settings);
+    roomSettingsLoaded.value = true;
+  }
+
   async function handleSaveRoomSettings(payload: RoomSettingsSavePayload) {
     if (!options.room.value || !options.roomId.value || roomSettingsSaving.value) return;
 
@@ -202,6 +212,7 @@ export function useRoomSettingsState(options: UseRoomSettingsStateOptions) {
     loadLocalSyncStrategy,
     resetRoomSettingsState,
     fetchRoomSettings,
+    applyRoomSettings,
     handleSaveRoomSettings,
   };
 }
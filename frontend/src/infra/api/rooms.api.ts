@@ -105,6 +105,9 @@ export type RoomSettings = {
   sync_policy: RoomSyncPolicy;
   active_sync_permission: RoomActiveSyncPermission;
   seek_auto_pause: boolean;
+  stall_min_duration_ms: number;
+  ready_min_duration_ms: number;
+  stall_flap_penalty_ms: number;
 };
 
 export type RoomSettingsPatchPayload = {
@@ -112,9 +115,12 @@ export type RoomSettingsPatchPayload = {
   sync_policy?: RoomSyncPolicy | null;
   active_sync_permission?: RoomActiveSyncPermission | null;
   seek_auto_pause?: boolean | null;
+  stall_min_duration_ms?: number | null;
+  ready_min_duration_ms?: number | null;
+  stall_flap_penalty_ms?: number | null;
 };
 
-type RoomResponse = {
+export type RoomResponse = {
   id: number;
   name: string;
   owner_id: number;
@@ -146,7 +152,7 @@ type UserRoomSummaryListResponse = {
   total_pages: number;
 };
 
-function mapRoomResponse(room: RoomResponse): Room {
+export function mapRoomResponse(room: RoomResponse): Room {
   return {
     id: room.id,
     name: room.name,
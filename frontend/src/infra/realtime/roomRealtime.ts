@@ -1,5 +1,10 @@
 import wsClient from "@/infra/realtime/wsClient";
-import type { RoomVideoSourceType } from "@/infra/api/rooms.api";
+import type {
+  RoomMember,
+  RoomResponse,
+  RoomSettings,
+  RoomVideoSourceType,
+} from "@/infra/api/rooms.api";
 
 export type RoomRealtimeResourceStatus = "ready" | "stalling" | "error";
 export type RoomRealtimePlaybackStatus = "playing" | "paused";
@@ -31,9 +36,17 @@ export type RoomRealtimeUserResourceState = {
 
 export type RoomRealtimeUserResourceStatesState = {
   room_id: number;
+  seq?: number;
   user_resource_states: RoomRealtimeUserResourceState[];
 };
 
+export type RoomRealtimeUserResourceStatesDelta = {
+  room_id: number;
+  seq: number;
+  upserted: RoomRealtimeUserResourceState[];
+  removed_user_ids: number[];
+};
+
 export type RoomRealtimePresenceState = {
   room_id: number;
   present_user_ids: number[];
@@ -41,12 +54,37 @@ export type RoomRealtimePresenceState = {
 
 export type RoomRealtimeSnapshot = {
   room_id: number;
+  room_version?: number;
+  runtime_version: number;
   present_user_ids: number[];
   room_video_source: RoomRealtimeVideoSourceState | null;
   playback: RoomRealtimePlaybackState | null;
   user_resource_states: RoomRealtimeUserResourceStatesState | null;
 };
 
+// room_info / room_settings / room_members share one per-room version counter.
+export type RoomRealtimeRoomInfo = {
+  room_id: number;
+  version: number;
+  room: RoomResponse;
+};
+
+export type RoomRealtimeRoomSettings = {
+  room_id: number;
+  version: number;
+  settings: RoomSettings;
+};
+
+export type RoomRealtimeRoomMembersChangeType = "added" | "removed" | "role_changed";
+
+export type RoomRealtimeRoomMembersChange = {
+  room_id: number;
+  version: number;
+  change_type: RoomRealtimeRoomMembersChangeType;
+  user_id: number;
+  member: RoomMember | null;
+};
+
 export type RoomRealtimeSessionClosed = {
   room_id: number;
   reason: "entered_elsewhere" | "left_room" | "removed_from_room" | "room_deleted";
@@ -95,17 +133,13 @@ export type RoomRealtimePlaybackResponse = {
   playback?: RoomRealtimePlaybackState | null;
 };
 
-export type RoomRealtimeResourceStatusResponse = {
-  user_resource_states?: RoomRealtimeUserResourceStatesState | null;
-  playback?: RoomRealtimePlaybackState | null;
-  auto_action?: "playback_pause" | "playback_play" | null;
-};
-
 export type RoomRealtimePresenceGetResponse = {
   presence?: RoomRealtimePresenceState | null;
 };
 
 export type RoomRealtimeVideoRuntimeGetResponse = {
+  room_id?: number;
+  runtime_version?: number;
   room_video_source?: RoomRealtimeVideoSourceState | null;
   playback?: RoomRealtimePlaybackState | null;
   user_resource_states?: RoomRealtimeUserResourceStatesState | null;
@@ -157,8 +191,5 @@ export function sendRoomRealtimePlaybackSeek(payload: RoomRealtimePlaybackSeekPa
 }
 
 export function sendRoomRealtimeUserResourceStatus(payload: RoomRealtimeResourceStatusPayload) {
-  return wsClient.command<RoomRealtimeResourceStatusResponse>(
-    "user_resource_status",
-    payload,
-  );
+  return wsClient.command<void>("user_resource_status", payload);
 }
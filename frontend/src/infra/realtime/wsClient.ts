@@ -23,7 +23,8 @@ export type WSEventName =
   | "playback_play"
   | "playback_seek"
   | "room_video_source_set"
-  | "user_resource_states";
+  | "user_resource_states"
+  | "user_resource_states_delta";
 
 export type WSErrorCode =
   | "unauthorized"